@@ -72,9 +72,13 @@ def create_app(config_name=None):
             from app.models.initial_data import init_basic_data
             init_basic_data()
         
+        # 加载已入库内容哈希的过滤器（招投标入库前的精确去重）
+        from app.services.content_hash_index import content_hash_index
+        content_hash_index.load()
+        
         # 启动任务调度器
         from app.services.task_scheduler import start_scheduler
-        start_scheduler()
+        start_scheduler(app)
     
     @app.before_request
     def before_request():
@@ -12,6 +12,7 @@ from flask import request, current_app
 from datetime import datetime
 from app.api import bp
 from app.services.crawler_manager import crawler_manager
+from app.services.page_archive import page_archive
 from app.utils.response import success_response, error_response
 
 @bp.route('/crawler/tasks', methods=['GET'])
@@ -170,4 +171,87 @@ def crawler_health():
 
     except Exception as e:
         current_app.logger.error(f'爬虫健康检查失败: {str(e)}')
-        return error_response('爬虫系统异常', 500)
\ No newline at end of file
+        return error_response('爬虫系统异常', 500)
+
+@bp.route('/crawler/archive/stats', methods=['GET'])
+def get_archive_stats():
+    """获取原始页面归档统计"""
+    
+    try:
+        return success_response(page_archive.get_stats())
+        
+    except Exception as e:
+        current_app.logger.error(f'获取页面归档统计失败: {str(e)}')
+        return error_response('获取页面归档统计失败', 500)
+
+@bp.route('/crawler/archive/snapshots', methods=['GET'])
+def get_archive_snapshots():
+    """获取页面的归档记录，指定content_hash时返回页面内容（用于调试提取规则）"""
+    
+    url = request.args.get('url')
+    if not url:
+        return error_response('页面URL不能为空', 400)
+    
+    try:
+        snapshots = page_archive.get_snapshots(url, limit=request.args.get('limit', 20, type=int))
+        
+        content_hash = request.args.get('content_hash')
+        html_content = None
+        if content_hash:
+            snapshot = next((s for s in snapshots if s['content_hash'] == content_hash), None)
+            if not snapshot:
+                return error_response('归档记录不存在', 404)
+            html_content = page_archive.decode(snapshot)
+        
+        for snapshot in snapshots:
+            snapshot['fetched_at'] = snapshot['fetched_at'].isoformat()
+        
+        return success_response({
+            'url': url,
+            'snapshots': snapshots,
+            'html_content': html_content
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f'获取页面归档记录失败: {str(e)}')
+        return error_response('获取页面归档记录失败', 500)
+
+@bp.route('/crawler/archive/replay', methods=['POST'])
+def replay_archive_extraction():
+    """使用当前提取规则重新提取归档页面（不访问医院网站，不写入数据库）"""
+    
+    data = request.get_json() or {}
+    
+    try:
+        since = datetime.fromisoformat(data['since']) if data.get('since') else None
+        until = datetime.fromisoformat(data['until']) if data.get('until') else None
+    except ValueError:
+        return error_response('时间格式无效', 400)
+    
+    try:
+        pages = []
+        tenders_found = 0
+        for snapshot, tenders in page_archive.replay_extraction(
+            since=since,
+            until=until,
+            url_prefix=data.get('url_prefix'),
+            latest_only=data.get('latest_only', True)
+        ):
+            tenders_found += len(tenders)
+            pages.append({
+                'url': snapshot['url'],
+                'fetched_at': snapshot['fetched_at'].isoformat(),
+                'content_hash': snapshot['content_hash'],
+                'tenders_count': len(tenders),
+                'tenders': tenders if data.get('include_tenders') else None
+            })
+        
+        return success_response({
+            'pages_count': len(pages),
+            'tenders_found': tenders_found,
+            'pages': pages
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f'回放页面提取失败: {str(e)}')
+        return error_response('回放页面提取失败', 500)
\ No newline at end of file
@@ -22,7 +22,9 @@ import hashlib
 from app.api import bp
 from app.models import Hospital, HospitalAlias, Region, TenderRecord
 from app import db
-from app.services.crawler_service import verify_website
+from app.services.content_hash_index import content_hash_index
+from app.services.crawler_service import verify_website, verify_websites
+from app.services.near_duplicate_index import near_duplicate_index
 from app.utils.response import success_response, error_response
 
 @bp.route('/hospitals', methods=['GET'])
@@ -248,6 +250,10 @@ def delete_hospital(hospital_id):
         db.session.delete(hospital)
         db.session.commit()
         
+        # 近似重复索引和已确认的内容哈希可能包含已删除的招投标记录
+        near_duplicate_index.reset()
+        content_hash_index.clear_known()
+        
         return success_response({
             'message': '医院删除成功'
         })
@@ -292,6 +298,72 @@ def verify_hospital_website(hospital_id):
         current_app.logger.error(f'验证医院官网失败: {str(e)}')
         return error_response('验证医院官网失败', 500)
 
+@bp.route('/hospitals/verify/batch', methods=['POST'])
+def batch_verify_hospital_websites():
+    """批量验证医院官网"""
+    
+    data = request.get_json() or {}
+    hospital_ids = data.get('hospital_ids') or []
+    concurrency = data.get('concurrency')
+    
+    if not hospital_ids:
+        return error_response('医院ID列表不能为空', 400)
+    
+    if concurrency is not None:
+        try:
+            concurrency = int(concurrency)
+        except (TypeError, ValueError):
+            return error_response('并发数必须是整数', 400)
+        
+        if concurrency < 1:
+            return error_response('并发数必须大于0', 400)
+    
+    hospitals = Hospital.query.filter(
+        Hospital.id.in_(hospital_ids),
+        Hospital.website_url.isnot(None)
+    ).all()
+    
+    if not hospitals:
+        return error_response('没有可验证的医院官网', 400)
+    
+    try:
+        # 并发验证所有官网
+        verification_results = verify_websites(
+            [hospital.website_url for hospital in hospitals],
+            concurrency=concurrency
+        )
+        
+        now = datetime.utcnow()
+        results = []
+        for hospital, verification_result in zip(hospitals, verification_results):
+            hospital.verified = verification_result['is_valid']
+            hospital.verification_date = now
+            hospital.last_scan_time = now
+            
+            if verification_result['is_valid']:
+                hospital.scan_success_count += 1
+            else:
+                hospital.scan_failed_count += 1
+            
+            results.append({
+                'hospital_id': hospital.id,
+                'verification': verification_result
+            })
+        
+        db.session.commit()
+        
+        return success_response({
+            'results': results,
+            'total_count': len(results),
+            'valid_count': sum(1 for r in verification_results if r['is_valid']),
+            'message': '医院官网批量验证完成'
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f'批量验证医院官网失败: {str(e)}')
+        return error_response('批量验证医院官网失败', 500)
+
 @bp.route('/hospitals/statistics', methods=['GET'])
 def get_hospital_statistics():
     """获取医院统计信息"""
@@ -1,7 +1,7 @@
 """
 招投标数据API
 
-提供招投标信息查询、导出等功能接口。
+提供招投标信息查询、近似重复报告、导出等功能接口。
 
 作者：MiniMax Agent
 版本：v1.0
@@ -14,6 +14,7 @@ from datetime import datetime, timedelta
 from app.api import bp
 from app.models import TenderRecord, Hospital, Region
 from app import db
+from app.services.content_deduplicator import content_deduplicator
 from app.utils.response import success_response, error_response
 
 @bp.route('/tenders', methods=['GET'])
@@ -199,6 +200,68 @@ def get_tender_statistics():
         current_app.logger.error(f'获取招投标统计信息失败: {str(e)}')
         return error_response('获取统计信息失败', 500)
 
+@bp.route('/tenders/near-duplicates', methods=['GET'])
+def get_near_duplicate_report():
+    """获取近似重复招投标报告（按内容相似度聚类）"""
+    
+    days = min(request.args.get('days', 30, type=int), 365)
+    threshold = request.args.get('threshold', 0.9, type=float)
+    metric = request.args.get('metric', 'jaccard')
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    
+    if metric not in ('jaccard', 'cosine'):
+        return error_response('不支持的相似度类型，支持的类型: jaccard, cosine', 400)
+    
+    if not 0 < threshold <= 1:
+        return error_response('相似度阈值必须在0到1之间', 400)
+    
+    try:
+        start_date = datetime.now() - timedelta(days=days)
+        tenders = db.session.query(
+            TenderRecord.id, TenderRecord.hospital_id, TenderRecord.title,
+            TenderRecord.content, TenderRecord.publish_date
+        ).filter(
+            TenderRecord.publish_date >= start_date
+        ).order_by(TenderRecord.id).all()
+        
+        # 整批计算两两相似度并按连通分量分组
+        groups = content_deduplicator.find_similar_groups(
+            [tender.content or tender.title for tender in tenders],
+            min_similarity=threshold,
+            metric=metric
+        )
+        
+        group_list = []
+        for group in groups[:limit]:
+            group_list.append({
+                'size': len(group['indices']),
+                'max_similarity': round(group['max_similarity'], 4),
+                'min_similarity': round(group['min_similarity'], 4),
+                'tenders': [{
+                    'id': tenders[i].id,
+                    'hospital_id': tenders[i].hospital_id,
+                    'title': tenders[i].title,
+                    'publish_date': tenders[i].publish_date.isoformat() if tenders[i].publish_date else None
+                } for i in group['indices']]
+            })
+        
+        return success_response({
+            'period': {
+                'start': start_date.isoformat(),
+                'end': datetime.now().isoformat()
+            },
+            'metric': metric,
+            'threshold': threshold,
+            'total_tenders': len(tenders),
+            'duplicate_tenders': sum(len(group['indices']) for group in groups),
+            'total_groups': len(groups),
+            'groups': group_list
+        })
+        
+    except Exception as e:
+        current_app.logger.error(f'获取近似重复报告失败: {str(e)}')
+        return error_response('获取近似重复报告失败', 500)
+
 @bp.route('/tenders/export', methods=['POST'])
 def export_tenders():
     """导出招投标数据"""
@@ -12,7 +12,7 @@
 from datetime import datetime
 from sqlalchemy import (
     Column, Integer, String, Text, DateTime, Boolean, Enum, 
-    Numeric, ForeignKey, Index, UniqueConstraint, TIMESTAMP
+    Numeric, Float, LargeBinary, ForeignKey, Index, UniqueConstraint, TIMESTAMP
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
@@ -151,6 +151,9 @@ class Hospital(db.Model):
     # 关系
     aliases = relationship('HospitalAlias', backref='hospital', lazy='dynamic', cascade='all, delete-orphan')
     tender_records = relationship('TenderRecord', backref='hospital', lazy='dynamic', cascade='all, delete-orphan')
+    tender_columns = relationship('TenderColumn', backref='hospital', lazy='dynamic', cascade='all, delete-orphan')
+    extraction_templates = relationship('ExtractionTemplate', backref='hospital', lazy='dynamic',
+                                        cascade='all, delete-orphan')
     
     # 索引
     __table_args__ = (
@@ -299,6 +302,10 @@ class TenderRecord(db.Model):
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
     updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    # 关系（SQLite默认不启用外键约束，签名随记录一起由ORM删除）
+    signature = relationship('TenderSignature', foreign_keys='TenderSignature.tender_id', uselist=False,
+                             cascade='all, delete-orphan')
+    
     # 索引
     __table_args__ = (
         Index('idx_tenders_hospital_date', 'hospital_id', 'publish_date'),
@@ -459,4 +466,212 @@ class Settings(db.Model):
             'is_encrypted': self.is_encrypted,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class PageFetchState(db.Model):
+    """页面抓取状态表（条件请求缓存）"""
+    
+    __tablename__ = 'page_fetch_states'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String(500), unique=True, nullable=False, comment='页面URL')
+    
+    # 条件请求校验信息
+    etag = Column(String(200), comment='ETag')
+    last_modified = Column(String(100), comment='Last-Modified')
+    body_hash = Column(String(64), comment='响应体哈希')
+    status_code = Column(Integer, comment='最后响应状态码')
+    
+    # 页面指纹（去除模板、时间戳和计数器后的HTML哈希）
+    html_hash = Column(String(64), comment='规范化HTML哈希')
+    extract_ms = Column(Integer, comment='最近一次解析提取耗时（毫秒）')
+    
+    # 统计信息
+    fetch_count = Column(Integer, default=0, comment='抓取次数')
+    not_modified_count = Column(Integer, default=0, comment='未变更次数')
+    html_unchanged_count = Column(Integer, default=0, comment='指纹未变更次数')
+    
+    # 时间信息
+    last_fetched_at = Column(TIMESTAMP, comment='最后抓取时间')
+    last_changed_at = Column(TIMESTAMP, comment='最后变更时间')
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PageFetchState {self.url}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'url': self.url,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'body_hash': self.body_hash,
+            'status_code': self.status_code,
+            'html_hash': self.html_hash,
+            'extract_ms': self.extract_ms,
+            'fetch_count': self.fetch_count,
+            'not_modified_count': self.not_modified_count,
+            'html_unchanged_count': self.html_unchanged_count,
+            'last_fetched_at': self.last_fetched_at.isoformat() if self.last_fetched_at else None,
+            'last_changed_at': self.last_changed_at.isoformat() if self.last_changed_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class TenderColumn(db.Model):
+    """招投标栏目表（从医院首页发现的栏目）"""
+    
+    __tablename__ = 'tender_columns'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hospital_id = Column(Integer, ForeignKey('hospitals.id', ondelete='CASCADE'), nullable=False, comment='医院ID')
+    url = Column(String(500), nullable=False, comment='栏目URL')
+    title = Column(String(200), comment='栏目名称')
+    section = Column(String(50), comment='栏目类型')
+    source = Column(String(20), comment='发现来源（navigation/content）')
+    is_active = Column(Boolean, default=True, comment='是否扫描')
+    
+    # 扫描统计
+    item_count = Column(Integer, default=0, comment='最近一次解析首页的招投标条数')
+    total_new_items = Column(Integer, default=0, comment='累计新增招投标数')
+    success_count = Column(Integer, default=0, comment='成功扫描次数')
+    failure_count = Column(Integer, default=0, comment='连续失败次数')
+    
+    # 时间信息
+    last_discovered_at = Column(TIMESTAMP, comment='最后一次在首页发现的时间')
+    last_success_at = Column(TIMESTAMP, comment='最后成功扫描时间')
+    last_failure_at = Column(TIMESTAMP, comment='最后失败时间')
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # 索引和约束
+    __table_args__ = (
+        UniqueConstraint('hospital_id', 'url', name='uq_tender_column_url'),
+        Index('idx_tender_columns_hospital', 'hospital_id', 'is_active'),
+    )
+    
+    def __repr__(self):
+        return f'<TenderColumn {self.title}({self.url})>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'hospital_id': self.hospital_id,
+            'url': self.url,
+            'title': self.title,
+            'section': self.section,
+            'source': self.source,
+            'is_active': self.is_active,
+            'item_count': self.item_count,
+            'total_new_items': self.total_new_items,
+            'success_count': self.success_count,
+            'failure_count': self.failure_count,
+            'last_discovered_at': self.last_discovered_at.isoformat() if self.last_discovered_at else None,
+            'last_success_at': self.last_success_at.isoformat() if self.last_success_at else None,
+            'last_failure_at': self.last_failure_at.isoformat() if self.last_failure_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ExtractionTemplate(db.Model):
+    """招投标提取模板表（按医院栏目学习的列表结构）"""
+    
+    __tablename__ = 'extraction_templates'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    hospital_id = Column(Integer, ForeignKey('hospitals.id', ondelete='CASCADE'), nullable=False, comment='医院ID')
+    column_url = Column(String(500), nullable=False, comment='栏目首页URL')
+    section = Column(String(50), comment='栏目类型')
+    
+    # 列表结构
+    container_tag = Column(String(20), nullable=False, comment='选择器起始元素的标签名（用于局部解析）')
+    item_selector = Column(String(300), nullable=False, comment='列表条目的CSS选择器')
+    strategy = Column(String(20), default='list', comment='条目解析方式（list/table/content）')
+    item_count = Column(Integer, default=0, comment='学习时的条目数')
+    
+    # 匹配统计
+    match_count = Column(Integer, default=0, comment='命中次数')
+    miss_count = Column(Integer, default=0, comment='连续未命中次数')
+    is_active = Column(Boolean, default=True, comment='是否启用')
+    last_matched_at = Column(TIMESTAMP, comment='最后命中时间')
+    
+    # 时间戳
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # 索引和约束
+    __table_args__ = (
+        UniqueConstraint('hospital_id', 'column_url', name='uq_extraction_template_column'),
+        Index('idx_extraction_templates_hospital', 'hospital_id', 'is_active'),
+    )
+    
+    def __repr__(self):
+        return f'<ExtractionTemplate {self.column_url}: {self.item_selector}>'
+    
+    def to_template(self):
+        """转换为提取器使用的模板字典"""
+        return {
+            'container_tag': self.container_tag,
+            'item_selector': self.item_selector,
+            'strategy': self.strategy or 'list',
+            'item_count': self.item_count or 0,
+        }
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'hospital_id': self.hospital_id,
+            'column_url': self.column_url,
+            'section': self.section,
+            'container_tag': self.container_tag,
+            'item_selector': self.item_selector,
+            'strategy': self.strategy,
+            'item_count': self.item_count,
+            'match_count': self.match_count,
+            'miss_count': self.miss_count,
+            'is_active': self.is_active,
+            'last_matched_at': self.last_matched_at.isoformat() if self.last_matched_at else None,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class TenderSignature(db.Model):
+    """招投标近似重复签名表（MinHash签名及规范记录）"""
+    
+    __tablename__ = 'tender_signatures'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tender_id = Column(Integer, ForeignKey('tender_records.id', ondelete='CASCADE'), nullable=False,
+                       comment='招投标记录ID')
+    
+    # 近似重复关联
+    canonical_id = Column(Integer, ForeignKey('tender_records.id', ondelete='SET NULL'),
+                          comment='近似重复时对应的规范记录ID')
+    similarity = Column(Float, comment='与规范记录的估计相似度')
+    
+    # 签名
+    num_perm = Column(Integer, nullable=False, comment='签名长度')
+    signature = Column(LargeBinary, nullable=False, comment='MinHash签名（uint32数组）')
+    
+    # 时间戳
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    
+    # 索引和约束
+    __table_args__ = (
+        UniqueConstraint('tender_id', name='uq_tender_signature_tender'),
+        Index('idx_tender_signatures_canonical', 'canonical_id'),
+    )
+    
+    def __repr__(self):
+        return f'<TenderSignature {self.tender_id} -> {self.canonical_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'tender_id': self.tender_id,
+            'canonical_id': self.canonical_id,
+            'similarity': self.similarity,
+            'num_perm': self.num_perm,
+            'created_at': self.created_at.isoformat() if self.created_at else None
         }
\ No newline at end of file
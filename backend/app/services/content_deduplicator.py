@@ -4,6 +4,9 @@
 提供内容去重和相似度检测功能，包括：
 - SHA256哈希去重
 - 文本相似度计算
+- 批量去重的MinHash/LSH候选索引（只对可能相似的候选计算完整相似度）
+- 按内容哈希缓存的文本分析结果（预处理文本、词集合、指纹），LRU淘汰，每个文本只分词一次
+- 稀疏矩阵批量相似度（一批文本两两之间的Jaccard/余弦相似度）和近似重复聚类
 - 内容增量更新
 - 重复内容管理
 
@@ -14,11 +17,33 @@
 
 import hashlib
 import re
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from collections import OrderedDict
+from typing import Collection, Iterable, List, Dict, Any, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from difflib import SequenceMatcher
 import jieba
 import logging
+import numpy as np
+import scipy.sparse as sp
+
+from app.utils.minhash import LSHIndex, MinHasher
+from app.utils.similarity_matrix import TokenMatrix, connected_groups, cosine_similarity, jaccard_similarity
+
+class TextAnalysis:
+    """单个文本的分析结果"""
+    
+    def __init__(self, processed: str, tokens: List[str]):
+        self.processed = processed  # 预处理后的文本
+        self.words: Set[str] = set(tokens)  # 预处理文本的词集合
+        self.fingerprint = ''.join(sorted(word for word in tokens if len(word) >= 2)[:20])
+        self.raw_words: Optional[Set[str]] = None  # 原始文本的词集合（变更检测使用，按需计算）
+        self.signature: Optional[np.ndarray] = None  # 词集合的MinHash签名（按需计算）
+    
+    @property
+    def is_empty(self) -> bool:
+        """预处理后没有有效文本（与任何文本的相似度都为0）"""
+        return not self.processed or not self.words
 
 class ContentDeduplicator:
     """内容去重服务"""
@@ -32,8 +57,21 @@ class ContentDeduplicator:
             'similarity_threshold': 0.8,  # 相似度阈值
             'min_content_length': 10,  # 最小内容长度
             'cleanup_expired_days': 30,  # 清理过期记录的天数
+            'candidate_method': 'matrix',  # 批量去重候选筛选：matrix（稀疏矩阵Jaccard）、lsh、none（逐一比较）
+            'lsh_threshold': 0.8,  # LSH候选索引面向的词集合Jaccard相似度
+            'lsh_num_perm': 128,  # MinHash签名长度
+            'lsh_recall': 0.99,  # 词集合Jaccard达到lsh_threshold的文档对成为候选的概率
+            'lsh_min_estimate': 0.5,  # 签名估计的Jaccard低于该值的候选不再精确比较
+            'analysis_cache_size': 5000,  # 文本分析结果缓存的最大条目数
         }
         
+        self.minhasher = MinHasher(num_perm=self.config['lsh_num_perm'])
+        
+        # 文本分析结果缓存（键为原始文本的哈希）
+        self._analysis_cache: 'OrderedDict[bytes, TextAnalysis]' = OrderedDict()
+        self._analysis_lock = threading.Lock()
+        self.analysis_stats = {'hits': 0, 'misses': 0}
+        
         # 内容处理配置
         self.text_preprocessing = {
             'remove_html_tags': True,
@@ -73,13 +111,13 @@ class ContentDeduplicator:
         
         return content_hash
     
-    def is_duplicate_content(self, content_hash: str, existing_hashes: List[str]) -> bool:
+    def is_duplicate_content(self, content_hash: str, existing_hashes: Collection[str]) -> bool:
         """
         检查内容是否重复
         
         Args:
             content_hash: 新内容的哈希值
-            existing_hashes: 已存在的内容哈希列表
+            existing_hashes: 已存在的内容哈希集合（传入列表时为线性查找）
             
         Returns:
             是否为重复内容
@@ -97,19 +135,19 @@ class ContentDeduplicator:
         Returns:
             相似度分数 (0-1)
         """
-        # 预处理文本
-        processed_text1 = self._preprocess_text(text1)
-        processed_text2 = self._preprocess_text(text2)
+        # 预处理并分词（使用缓存的分析结果）
+        analysis1 = self.analyze_text(text1)
+        analysis2 = self.analyze_text(text2)
         
-        if not processed_text1 or not processed_text2:
+        if not analysis1.processed or not analysis2.processed:
             return 0.0
         
         # 方法1: 基于序列匹配的相似度
-        similarity1 = SequenceMatcher(None, processed_text1, processed_text2).ratio()
+        similarity1 = SequenceMatcher(None, analysis1.processed, analysis2.processed).ratio()
         
         # 方法2: 基于词汇匹配的相似度
-        words1 = set(jieba.lcut(processed_text1))
-        words2 = set(jieba.lcut(processed_text2))
+        words1 = analysis1.words
+        words2 = analysis2.words
         
         if not words1 or not words2:
             return 0.0
@@ -185,26 +223,46 @@ class ContentDeduplicator:
         seen_hashes = set()
         similar_groups = []
         
-        for tender in tenders:
+        # 已保留招投标的文本和分析结果，候选筛选只返回可能相似的已保留文本
+        kept_texts: List[str] = []
+        kept_analyses: List[TextAnalysis] = []
+        kept_positions: Dict[int, int] = {}
+        contents = [tender.get('content', '') or tender.get('title', '') for tender in tenders]
+        neighbors = self._batch_neighbors(contents) if self.config['candidate_method'] == 'matrix' else None
+        candidate_index = self._new_candidate_index()
+        
+        for position, tender in enumerate(tenders):
             title = tender.get('title', '')
-            content = tender.get('content', '') or title
+            content = contents[position]
             date = tender.get('publish_date', '')
             
             # 计算内容哈希
             content_hash = self.calculate_content_hash(content, title, date)
             
             # 检查是否重复
-            if self.is_duplicate_content(content_hash, list(seen_hashes)):
+            if self.is_duplicate_content(content_hash, seen_hashes):
                 statistics['duplicates_removed'] += 1
                 continue
             
             # 检查是否与已有内容相似
-            existing_texts = [t.get('content', '') or t.get('title', '') for t in deduplicated_tenders]
+            analysis = self.analyze_text(content)
+            if neighbors is not None:
+                matches = [kept_positions[j] for j in neighbors[position] if j in kept_positions]
+                candidates = self._filter_candidates(analysis, kept_analyses, matches)
+            elif candidate_index is not None:
+                matches = [] if analysis.is_empty else candidate_index.query_similar(
+                    self._get_signature(analysis), self.config['lsh_min_estimate']
+                )
+                candidates = self._filter_candidates(analysis, kept_analyses, matches)
+            else:
+                candidates = range(len(kept_texts))
             similar_contents = self.find_similar_contents(
                 content, 
-                [{'content': text} for text in existing_texts]
+                [{'content': kept_texts[i]} for i in candidates]
             )
             
+            kept = False
+            
             if similar_contents:
                 # 找到相似内容，进行合并处理
                 most_similar = similar_contents[0]
@@ -218,11 +276,20 @@ class ContentDeduplicator:
                 # 选择内容更丰富的版本
                 if len(content) > len(most_similar['content']):
                     deduplicated_tenders.append(tender)
+                    kept = True
                 # 否则跳过新内容，保留已有的
             else:
                 # 不相似，添加到结果中
                 deduplicated_tenders.append(tender)
                 seen_hashes.add(content_hash)
+                kept = True
+            
+            if kept:
+                if candidate_index is not None and not analysis.is_empty:
+                    candidate_index.insert(len(kept_texts), self._get_signature(analysis))
+                kept_positions[position] = len(kept_texts)
+                kept_texts.append(content)
+                kept_analyses.append(analysis)
         
         statistics['unique_count'] = len(deduplicated_tenders)
         statistics['duplicate_groups'] = similar_groups
@@ -234,6 +301,170 @@ class ContentDeduplicator:
         
         return deduplicated_tenders, statistics
     
+    def _new_candidate_index(self) -> Optional[LSHIndex]:
+        """
+        创建批量去重的LSH候选索引，候选筛选方式不是lsh时返回None
+        
+        转载、更正等近似重复的词集合Jaccard通常在0.8以上。词集合Jaccard低于lsh_threshold、
+        但序列相似度极高的文档对成为候选的概率随Jaccard降低而下降（如0.6时约为0.6）。
+        """
+        if self.config['candidate_method'] != 'lsh':
+            return None
+        
+        return LSHIndex(self.config['lsh_threshold'], num_perm=self.config['lsh_num_perm'],
+                        recall=self.config['lsh_recall'])
+    
+    def _batch_neighbors(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        用稀疏矩阵一次计算整批文本两两之间的词集合Jaccard，返回每个文本可能相似的文本下标
+        
+        综合相似度达到阈值t时Jaccard至少为2t-1，Jaccard低于该值的文本对不可能相似；
+        矩阵按单精度计算，下限略微放宽，候选再由_filter_candidates精确筛选，结果与逐一比较一致。
+        """
+        min_jaccard = 2 * self.config['similarity_threshold'] - 1 - 1e-6
+        similarity = self.calculate_similarity_matrix(texts, min_similarity=min_jaccard)
+        return np.split(similarity.indices, similarity.indptr[1:-1])
+    
+    def calculate_similarity_matrix(self, texts: List[str], metric: str = 'jaccard',
+                                    min_similarity: float = 0.0, top_k: int = None) -> sp.csr_matrix:
+        """
+        批量计算文本两两之间的词集合相似度（预处理和分词与calculate_text_similarity一致）
+        
+        Args:
+            texts: 文本列表
+            metric: jaccard（词集合Jaccard）或cosine（TF-IDF余弦）
+            min_similarity: 只保留不低于该值的相似度
+            top_k: 每个文本最多保留的相似文本数，None表示不限制
+        
+        Returns:
+            文本数×文本数的稀疏矩阵，对角线、没有共同词及预处理后为空的文本对为0
+        """
+        if metric not in ('jaccard', 'cosine'):
+            raise ValueError(f'不支持的相似度类型: {metric}')
+        
+        analyses = [self.analyze_text(text) for text in texts]
+        matrix = TokenMatrix(() if analysis.is_empty else analysis.words for analysis in analyses)
+        
+        similarity = jaccard_similarity if metric == 'jaccard' else cosine_similarity
+        return similarity(matrix, min_similarity=min_similarity, top_k=top_k)
+    
+    def find_similar_groups(self, texts: List[str], min_similarity: float = None,
+                            metric: str = 'jaccard') -> List[Dict[str, Any]]:
+        """
+        近似重复聚类：相似度达到min_similarity的文本对之间连边，按连通分量分组
+        
+        Args:
+            texts: 文本列表
+            min_similarity: 相似度下限，默认使用similarity_threshold
+            metric: jaccard或cosine
+            
+        Returns:
+            分组列表（按组大小降序），每组包含indices（文本下标）、max_similarity和min_similarity
+            （组内相连文本对的最高、最低相似度）
+        """
+        if min_similarity is None:
+            min_similarity = self.config['similarity_threshold']
+        
+        similarity = self.calculate_similarity_matrix(texts, metric=metric, min_similarity=min_similarity)
+        
+        groups = []
+        for indices in connected_groups(similarity):
+            values = similarity[indices][:, indices].data
+            groups.append({
+                'indices': indices,
+                'max_similarity': float(values.max()),
+                'min_similarity': float(values.min()),
+            })
+        
+        return groups
+    
+    def analyze_text(self, text: str) -> TextAnalysis:
+        """
+        预处理文本并分词，结果按原始文本的哈希缓存
+        
+        同一文本无论参与多少次比较都只预处理和分词一次；缓存超过analysis_cache_size时
+        淘汰最久未使用的条目。
+        
+        Args:
+            text: 原始文本
+        
+        Returns:
+            文本分析结果（调用方不应修改）
+        """
+        text = text or ''
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        
+        with self._analysis_lock:
+            analysis = self._analysis_cache.get(key)
+            if analysis is not None:
+                self._analysis_cache.move_to_end(key)
+                self.analysis_stats['hits'] += 1
+                return analysis
+            self.analysis_stats['misses'] += 1
+        
+        processed = self._preprocess_text(text)
+        analysis = TextAnalysis(processed, jieba.lcut(processed))
+        
+        with self._analysis_lock:
+            self._analysis_cache[key] = analysis
+            self._analysis_cache.move_to_end(key)
+            while len(self._analysis_cache) > self.config['analysis_cache_size']:
+                self._analysis_cache.popitem(last=False)
+        
+        return analysis
+    
+    def clear_analysis_cache(self):
+        """清空文本分析结果缓存"""
+        with self._analysis_lock:
+            self._analysis_cache.clear()
+            self.analysis_stats = {'hits': 0, 'misses': 0}
+    
+    def _get_signature(self, analysis: TextAnalysis) -> np.ndarray:
+        """词集合的MinHash签名（首次使用时计算并保存在分析结果中）"""
+        if analysis.signature is None:
+            analysis.signature = self.minhasher.signature(analysis.words)
+        return analysis.signature
+    
+    def get_minhash_signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        计算文本词集合的MinHash签名（与批量去重的预处理和分词一致）
+        
+        Returns:
+            签名，预处理后没有有效文本时返回None
+        """
+        analysis = self.analyze_text(text)
+        return None if analysis.is_empty else self._get_signature(analysis)
+    
+    def _filter_candidates(self, analysis: TextAnalysis, kept_analyses: List[TextAnalysis],
+                           matches: Iterable[int]) -> List[int]:
+        """
+        筛选需要计算完整相似度的已保留文本
+        
+        matches为稀疏矩阵批量计算或LSH索引（按签名估计的Jaccard）筛出的候选，再用相似度上界过滤
+        （不改变相似度判断结果）：综合相似度为序列相似度与词集合Jaccard的平均值，阈值为t时
+        Jaccard至少为2t-1；序列相似度再用SequenceMatcher.quick_ratio（不小于ratio）代替，
+        上界低于阈值的候选不可能相似。
+        
+        Returns:
+            按保留顺序排列的候选下标
+        """
+        if analysis.is_empty:
+            return []
+        
+        processed, words = analysis.processed, analysis.words
+        threshold = self.config['similarity_threshold']
+        
+        candidates = []
+        for i in sorted(matches):
+            other = kept_analyses[i]
+            jaccard = len(words & other.words) / len(words | other.words)
+            if (1 + jaccard) / 2 < threshold:
+                continue
+            if (SequenceMatcher(None, processed, other.processed).quick_ratio() + jaccard) / 2 >= threshold:
+                candidates.append(i)
+        
+        return candidates
+    
     def detect_content_changes(self, old_content: str, new_content: str) -> Dict[str, Any]:
         """
         检测内容变更
@@ -270,8 +501,8 @@ class ContentDeduplicator:
             change_detection['change_ratio'] = change_ratio
             
             # 简单分析变更类型
-            old_words = set(jieba.lcut(old_content))
-            new_words = set(jieba.lcut(new_content))
+            old_words = self._get_raw_words(old_content)
+            new_words = self._get_raw_words(new_content)
             
             added_words = new_words - old_words
             removed_words = old_words - new_words
@@ -292,6 +523,13 @@ class ContentDeduplicator:
         
         return change_detection
     
+    def _get_raw_words(self, text: str) -> Set[str]:
+        """原始文本（未预处理）的词集合（首次使用时计算并保存在分析结果中）"""
+        analysis = self.analyze_text(text)
+        if analysis.raw_words is None:
+            analysis.raw_words = set(jieba.lcut(text))
+        return analysis.raw_words
+    
     def cleanup_expired_records(self, records: List[Dict[str, Any]], 
                               date_field: str = 'created_at') -> List[Dict[str, Any]]:
         """
@@ -390,20 +628,8 @@ class ContentDeduplicator:
         Returns:
             内容指纹字符串
         """
-        # 预处理内容
-        processed = self._preprocess_text(content)
-        
-        # 提取关键词作为指纹
-        words = jieba.lcut(processed)
-        
-        # 过滤短词和停用词
-        words = [word for word in words if len(word) >= 2]
-        
-        # 排序并连接
-        words.sort()
-        fingerprint = ''.join(words[:20])  # 取前20个词作为指纹
-        
-        return fingerprint
+        # 预处理后的词过滤短词、排序并取前20个词作为指纹（使用缓存的分析结果）
+        return self.analyze_text(content).fingerprint
 
 # 创建全局内容去重服务实例
 content_deduplicator = ContentDeduplicator()
\ No newline at end of file
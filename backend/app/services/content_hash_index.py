@@ -0,0 +1,203 @@
+"""
+招投标内容哈希索引
+
+在tender_records.content_hash唯一约束之前做精确去重，包括：
+- 覆盖所有已入库内容哈希的布隆过滤器，持久化到文件，启动时加载
+- 加载和保存时按记录ID同步此后入库的哈希（其他进程写入的记录）
+- 已确认入库的哈希集合：再次出现时直接判为重复，不访问数据库
+  （按数据库会话记录本事务中确认的哈希，回滚时只移除这些哈希）
+- 将待入库哈希分为已确认重复、一定是新的和可能已存在三组，只有最后一组需要查询数据库确认
+- 从数据库重建（文件缺失、损坏或元素数超过容量时）
+
+布隆过滤器不会把已入库的哈希判为新的，误判只会让新哈希多一次数据库确认。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import os
+import threading
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlalchemy import event
+
+from app import db
+from app.models import TenderRecord
+from app.utils.bloom_filter import BloomFilter
+from config import Config
+
+class ContentHashIndex:
+    """招投标内容哈希索引"""
+    
+    CONFIRMED_KEY = 'content_hash_confirmed'  # 会话info中本事务确认的哈希的键
+    
+    def __init__(self, path: str):
+        self.logger = logging.getLogger(__name__)
+        
+        self.path = path
+        self.config = {
+            'error_rate': 0.001,       # 布隆过滤器误判率
+            'min_capacity': 100000,    # 布隆过滤器最小容量
+            'capacity_factor': 2,      # 重建时容量为已入库记录数的倍数
+            'sync_overlap': 1000,      # 同步时回看的记录ID数（并发事务的ID不一定按提交顺序出现）
+            'batch_size': 5000,        # 从数据库读取哈希时每批的记录数
+            'known_max_size': 200000,  # 已确认入库哈希集合的最大元素数（超过后清空）
+        }
+        
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._known: Set[str] = set()
+        
+        # 确认时可能看到本会话尚未提交的记录，回滚后这些哈希不再确认入库
+        event.listen(db.session, 'after_commit', self._commit_confirmed)
+        event.listen(db.session, 'after_transaction_end', self._discard_confirmed)
+    
+    @property
+    def loaded(self) -> bool:
+        return self._bloom is not None
+    
+    def load(self):
+        """加载过滤器文件并同步此后入库的哈希，文件不可用时从数据库重建（已加载时跳过）"""
+        with self._lock:
+            if self._bloom is not None:
+                return
+            
+            bloom = self._read_file()
+            if bloom is None or bloom.is_full:
+                self._rebuild()
+                return
+            
+            self._bloom = bloom
+            self._sync()
+            self.logger.info(f"内容哈希过滤器加载完成: {len(bloom)}条哈希")
+    
+    def rebuild(self):
+        """从数据库重建过滤器并保存"""
+        with self._lock:
+            self._rebuild()
+    
+    def save(self):
+        """同步此后入库的哈希并保存过滤器文件（元素数超过容量时重建）"""
+        with self._lock:
+            if self._bloom is None:
+                return
+            
+            self._sync()
+            if self._bloom.is_full:
+                self._rebuild()
+                return
+            
+            self._write_file()
+    
+    def add(self, content_hash: str):
+        """
+        加入新写入的哈希
+        
+        只加入布隆过滤器：所在事务回滚时只会多一次数据库确认，不会把未入库的公告判为重复。
+        """
+        self.load()
+        with self._lock:
+            self._bloom.add(content_hash)
+    
+    def classify(self, hashes: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        划分待入库的哈希（其余哈希一定未入库）
+        
+        Returns:
+            (已确认入库的哈希, 可能已入库、需要查询数据库确认的哈希)
+        """
+        self.load()
+        
+        known, probable = set(), set()
+        with self._lock:
+            bloom = self._bloom
+            for content_hash in hashes:
+                if content_hash in self._known:
+                    known.add(content_hash)
+                elif content_hash in bloom:
+                    probable.add(content_hash)
+        return known, probable
+    
+    def mark_existing(self, hashes: Iterable[str]):
+        """记录经数据库确认已入库的哈希（当前会话回滚时移除）"""
+        hashes = set(hashes)
+        db.session.info.setdefault(self.CONFIRMED_KEY, set()).update(hashes)
+        with self._lock:
+            if len(self._known) >= self.config['known_max_size']:
+                self._known.clear()
+            self._known.update(hashes)
+    
+    def _commit_confirmed(self, session):
+        """会话提交后本事务确认的哈希不再需要跟踪"""
+        session.info.pop(self.CONFIRMED_KEY, None)
+    
+    def _discard_confirmed(self, session, transaction):
+        """
+        事务未提交就结束（回滚或关闭会话）时移除本事务确认的哈希
+        
+        提交时已由_commit_confirmed取出，其中其他会话已提交的哈希只会多一次数据库确认。
+        """
+        if transaction.parent is not None:
+            return
+        
+        confirmed = session.info.pop(self.CONFIRMED_KEY, None)
+        if confirmed:
+            with self._lock:
+                self._known -= confirmed
+    
+    def clear_known(self):
+        """清空已确认入库的哈希（删除招投标记录后调用）"""
+        with self._lock:
+            self._known.clear()
+    
+    def _rebuild(self):
+        total = TenderRecord.query.count()
+        capacity = max(self.config['min_capacity'], total * self.config['capacity_factor'])
+        self._bloom = BloomFilter(capacity, self.config['error_rate'])
+        self._sync(full=True)
+        self._write_file()
+        self.logger.info(f"内容哈希过滤器重建完成: {len(self._bloom)}条哈希, 容量={capacity}")
+    
+    def _sync(self, full: bool = False):
+        """加入记录ID大于已同步ID（减去回看范围）的哈希"""
+        bloom = self._bloom
+        last_id = 0 if full else max(0, bloom.extra - self.config['sync_overlap'])
+        
+        while True:
+            rows = db.session.query(TenderRecord.id, TenderRecord.content_hash).filter(
+                TenderRecord.id > last_id
+            ).order_by(TenderRecord.id).limit(self.config['batch_size']).all()
+            if not rows:
+                break
+            
+            bloom.update(content_hash for _, content_hash in rows)
+            last_id = rows[-1][0]
+        
+        bloom.extra = max(bloom.extra, last_id)
+    
+    def _read_file(self) -> Optional[BloomFilter]:
+        if not os.path.exists(self.path):
+            return None
+        
+        try:
+            with open(self.path, 'rb') as f:
+                return BloomFilter.from_bytes(f.read())
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"内容哈希过滤器文件不可用，将从数据库重建: {str(e)}")
+            return None
+    
+    def _write_file(self):
+        """先写临时文件再重命名，避免并发写入或中断产生残缺文件"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(self._bloom.to_bytes())
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"保存内容哈希过滤器失败: {str(e)}")
+
+# 创建全局内容哈希索引实例
+content_hash_index = ContentHashIndex(Config.CRAWLER_CONFIG['CONTENT_HASH_FILTER_PATH'])
@@ -6,6 +6,7 @@
 - 域名验证
 - SSL证书检查
 - robots.txt检查
+- 首页流式读取（字节上限、提前终止）
 - 网页内容分析
 - 网站可信度评分
 
@@ -14,18 +15,64 @@
 日期：2025-11-18
 """
 
+import asyncio
 import requests
 import hashlib
 import ssl
 import socket
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from urllib.parse import urlparse, urljoin
-from urllib import robotparser
 import re
-from bs4 import BeautifulSoup
 import logging
 from datetime import datetime
 import time
 import random
+from config import Config
+from app.services.politeness_scheduler import politeness_scheduler, HostDispatchQueue
+from app.services.robots_cache import robots_cache
+from app.services.http_client import http_client
+from app.services.page_archive import page_archive
+from app.utils.html_parser import make_soup
+from app.utils.keyword_matcher import KeywordMatcher
+
+class PageMarkerScanner:
+    """
+    流式读取首页时检测内容分析所需的标记
+    
+    标题、描述、导航和页脚都已出现时即可停止读取，
+    剩余部分（通常是大段脚本或内联图片）不影响评分。
+    """
+    
+    # 标记组 -> 任一出现即满足的字节串（小写）
+    MARKERS = {
+        'title': (b'</title',),
+        'description': (b'name="description"', b"name='description'", b'name=description'),
+        'structure': (b'<nav', b'<header'),
+        'footer': (b'</footer',),
+    }
+    # 读到</head>后，head中的标记即使未出现也不会再出现
+    HEAD_MARKERS = ('title', 'description')
+    HEAD_END = b'</head'
+    
+    def __init__(self):
+        self.pending = set(self.MARKERS)
+        self._overlap = max(len(m) for group in self.MARKERS.values() for m in group) - 1
+        self._tail = b''
+    
+    def __call__(self, chunk: bytes) -> bool:
+        """处理一个数据块，所有标记都已出现时返回True"""
+        window = self._tail + chunk.lower()
+        self._tail = window[-self._overlap:]
+        
+        for name in list(self.pending):
+            if any(marker in window for marker in self.MARKERS[name]):
+                self.pending.discard(name)
+        
+        if self.HEAD_END in window:
+            self.pending.difference_update(self.HEAD_MARKERS)
+        
+        return not self.pending
 
 class CrawlerService:
     """爬虫服务类"""
@@ -36,36 +83,45 @@ class CrawlerService:
             'timeout': 30,
             'max_retries': 3,
             'delay_range': (1, 5),
+            'batch_concurrency': 20,  # 批量验证默认并发数
+            'check_workers': 32,      # 验证子检查（robots、证书）线程数
+            'max_page_bytes': Config.CRAWLER_CONFIG['MAX_PAGE_BYTES'],  # 首页最多读取的字节数
+            'early_stop': True,       # 内容分析所需标记都已出现时停止读取
+            'html_parser': Config.CRAWLER_CONFIG['HTML_PARSER'],  # HTML解析器
             'user_agents': [
                 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             ]
         }
+        
+        # 医院相关关键词
+        self.hospital_keywords = [
+            '医院', '医疗', '医护', '门诊', '住院', '手术', '医生', '护士',
+            '科室', '急诊', '体检', '挂号', '医保', '药品', '治疗',
+            'hospital', 'medical', 'clinic', 'healthcare', 'doctor'
+        ]
+        self.hospital_matcher = KeywordMatcher(self.hospital_keywords, ignore_case=True)
+        self.title_matcher = KeywordMatcher(['医院', '医疗', 'hospital', 'medical'], ignore_case=True)
+        
+        # 与页面请求并行执行的子检查
+        self._check_executor = ThreadPoolExecutor(
+            max_workers=self.config['check_workers'],
+            thread_name_prefix='verify-check'
+        )
     
-    def verify_website(self, url):
+    def verify_website(self, url, apply_delay=True):
         """
         验证网站URL并返回详细的验证结果
         
         Args:
             url: 网站URL
+            apply_delay: 是否等待主机的礼貌访问间隔（批量验证时由分派队列控制）
         
         Returns:
             dict: 验证结果
         """
-        result = {
-            'is_valid': False,
-            'url': url,
-            'domain': None,
-            'http_status': None,
-            'response_time': None,
-            'ssl_valid': False,
-            'robots_txt_ok': False,
-            'content_score': 0,
-            'hospital_indicators': [],
-            'verification_score': 0,
-            'errors': []
-        }
+        result = self._new_result(url)
         
         try:
             start_time = time.time()
@@ -79,25 +135,38 @@ class CrawlerService:
             result['domain'] = parsed_url['domain']
             result['url'] = parsed_url['url']
             
-            # 2. HTTP请求
-            response = self._make_request(parsed_url['url'])
+            # 2. robots.txt检查与页面请求并行执行
+            robots_future = self._check_executor.submit(self._check_robots_txt, parsed_url['url'])
+            
+            # 3. HTTP请求
+            response = self._make_request(parsed_url['url'], apply_delay=apply_delay)
             if not response:
                 result['errors'].append('无法访问网站')
                 return result
             
             result['http_status'] = response.status_code
             result['response_time'] = round((time.time() - start_time) * 1000, 2)
-            
-            # 3. SSL证书检查
-            result['ssl_valid'] = self._check_ssl_certificate(parsed_url['domain'])
-            
-            # 4. robots.txt检查
-            result['robots_txt_ok'] = self._check_robots_txt(parsed_url['url'])
+            result['content_truncated'] = response.truncated
+            page_archive.archive_response(response)
+            
+            # 4. SSL证书检查：优先使用页面请求所用TLS连接的证书，
+            #    仅当最终页面不是HTTPS时才单独握手，且与内容分析并行
+            ssl_future = None
+            peer_certificate = getattr(response, 'peer_certificate', None)
+            if peer_certificate:
+                result['ssl_valid'], result['ssl_info'] = self._describe_certificate(peer_certificate)
+            elif not http_client.proxy_url:
+                # 经代理抓取时直连握手检查的不是代理所访问的站点，跳过
+                ssl_future = self._check_executor.submit(self._check_ssl_certificate, parsed_url['domain'])
             
             # 5. 内容分析
             content_analysis = self._analyze_content(response)
             result.update(content_analysis)
             
+            if ssl_future:
+                result['ssl_valid'], result['ssl_info'] = ssl_future.result()
+            result['robots_txt_ok'] = robots_future.result()
+            
             # 6. 计算总体评分
             result['verification_score'] = self._calculate_verification_score(result)
             result['is_valid'] = result['verification_score'] >= 60
@@ -108,6 +177,84 @@ class CrawlerService:
         
         return result
     
+    def verify_websites(self, urls, concurrency=None):
+        """
+        批量并发验证网站URL
+        
+        多个网站同时验证，由礼貌访问调度器按主机就绪时间分派，
+        同一主机的请求之间保持间隔，不同主机之间互不等待。
+        
+        Args:
+            urls: 网站URL列表
+            concurrency: 最大并发数，默认使用batch_concurrency配置
+        
+        Returns:
+            list: 验证结果列表，顺序与输入一致，格式同verify_website
+        """
+        urls = list(urls)
+        if not urls:
+            return []
+        
+        if concurrency is None:
+            concurrency = self.config['batch_concurrency']
+        concurrency = max(1, min(int(concurrency), len(urls)))
+        
+        return asyncio.run(self._verify_websites_async(urls, concurrency))
+    
+    async def _verify_websites_async(self, urls, concurrency):
+        """批量验证的异步实现"""
+        loop = asyncio.get_running_loop()
+        results = [None] * len(urls)
+        
+        # 按主机就绪时间分派，同一主机的请求之间保持礼貌间隔
+        dispatch_queue = HostDispatchQueue(politeness_scheduler)
+        for index, url in enumerate(urls):
+            dispatch_queue.push(url, index)
+        
+        async def worker():
+            while True:
+                dispatched = dispatch_queue.pop()
+                if dispatched is None:
+                    return
+                
+                index, wait_time = dispatched
+                if wait_time > 0:
+                    await asyncio.sleep(wait_time)
+                
+                url = urls[index]
+                try:
+                    results[index] = await loop.run_in_executor(
+                        executor, partial(self.verify_website, url, apply_delay=False)
+                    )
+                except Exception as e:
+                    self.logger.error(f'批量验证出错 {url}: {str(e)}')
+                    results[index] = self._new_result(url)
+                    results[index]['errors'].append(f'验证过程出错: {str(e)}')
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='verify') as executor:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        
+        self.logger.info(f'批量验证完成: 共 {len(urls)} 个网站, 并发数 {concurrency}')
+        return results
+    
+    def _new_result(self, url):
+        """创建初始的验证结果（未通过验证）"""
+        return {
+            'is_valid': False,
+            'url': url,
+            'domain': None,
+            'http_status': None,
+            'response_time': None,
+            'ssl_valid': False,
+            'ssl_info': None,
+            'content_truncated': False,
+            'robots_txt_ok': False,
+            'content_score': 0,
+            'hospital_indicators': [],
+            'verification_score': 0,
+            'errors': []
+        }
+    
     def _parse_and_normalize_url(self, url):
         """解析和标准化URL"""
         try:
@@ -129,27 +276,33 @@ class CrawlerService:
             self.logger.error(f'URL解析失败: {str(e)}')
             return None
     
-    def _make_request(self, url):
+    def _make_request(self, url, apply_delay=True):
         """发起HTTP请求"""
         try:
+            # 仅在连续访问同一主机时等待
+            if apply_delay:
+                politeness_scheduler.wait(url)
+            
             headers = {
                 'User-Agent': random.choice(self.config['user_agents']),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
                 'Upgrade-Insecure-Requests': '1'
             }
             
-            response = requests.get(
+            # 共享连接池，HTTPS响应中附带对端证书
+            response = http_client.get(
                 url,
                 headers=headers,
                 timeout=self.config['timeout'],
+                stream=True,
                 allow_redirects=True
             )
             
-            # 添加随机延迟
-            time.sleep(random.uniform(*self.config['delay_range']))
+            # 流式读取，限制字节数并在分析所需内容读完后提前停止
+            http_client.read_body(
+                response,
+                max_bytes=self.config['max_page_bytes'],
+                stop_when=PageMarkerScanner() if self.config['early_stop'] else None
+            )
             
             return response
             
@@ -158,29 +311,59 @@ class CrawlerService:
             return None
     
     def _check_ssl_certificate(self, domain):
-        """检查SSL证书"""
+        """检查SSL证书（页面请求未经过HTTPS时使用）"""
         try:
             context = ssl.create_default_context()
             with socket.create_connection((domain, 443), timeout=10) as sock:
                 with context.wrap_socket(sock, server_hostname=domain) as ssock:
-                    cert = ssock.getpeercert()
-                    # 简单的证书有效期检查
-                    return True
+                    return self._describe_certificate(ssock.getpeercert())
         except Exception:
-            return False
+            return False, None
+    
+    def _describe_certificate(self, cert):
+        """
+        提取证书的有效期和签发者信息
+        
+        Args:
+            cert: SSLSocket.getpeercert()返回的证书字典（已通过校验）
+        
+        Returns:
+            tuple: (证书是否有效, 证书信息)
+        """
+        if not cert:
+            return False, None
+        
+        info = {
+            'issuer': None,
+            'not_before': None,
+            'not_after': None,
+            'days_remaining': None
+        }
+        
+        # 签发者
+        issuer = dict(item[0] for item in cert.get('issuer', ()) if item)
+        info['issuer'] = issuer.get('organizationName') or issuer.get('commonName')
+        
+        # 有效期
+        now = time.time()
+        valid = True
+        if cert.get('notBefore'):
+            not_before = ssl.cert_time_to_seconds(cert['notBefore'])
+            info['not_before'] = datetime.utcfromtimestamp(not_before).isoformat()
+            valid = valid and not_before <= now
+        if cert.get('notAfter'):
+            not_after = ssl.cert_time_to_seconds(cert['notAfter'])
+            info['not_after'] = datetime.utcfromtimestamp(not_after).isoformat()
+            info['days_remaining'] = int((not_after - now) // 86400)
+            valid = valid and not_after > now
+        
+        return valid, info
     
     def _check_robots_txt(self, url):
         """检查robots.txt"""
         try:
-            parsed = urlparse(url)
-            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-            
-            rp = robotparser.RobotFileParser()
-            rp.set_url(robots_url)
-            rp.read()
-            
-            # 检查是否可以抓取当前页面
-            return rp.can_fetch('*', url)
+            # 同一主机的robots.txt在缓存有效期内只下载一次
+            return robots_cache.can_fetch(url, default=False)
         except Exception:
             return False
     
@@ -196,7 +379,7 @@ class CrawlerService:
         
         try:
             # 解析HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = make_soup(response.content, self.config['html_parser'])
             
             # 提取页面标题
             title_tag = soup.find('title')
@@ -208,19 +391,13 @@ class CrawlerService:
             if desc_meta:
                 result['page_description'] = desc_meta.get('content', '').strip()
             
-            # 医院相关关键词
-            hospital_keywords = [
-                '医院', '医疗', '医护', '门诊', '住院', '手术', '医生', '护士',
-                '科室', '急诊', '体检', '挂号', '医保', '药品', '治疗',
-                'hospital', 'medical', 'clinic', 'healthcare', 'doctor'
-            ]
-            
             # 获取页面文本内容
             page_text = soup.get_text().lower()
             
-            # 检查关键词出现情况
-            for keyword in hospital_keywords:
-                count = page_text.count(keyword.lower())
+            # 检查关键词出现情况（一次扫描统计所有关键词）
+            keyword_counts = self.hospital_matcher.count(page_text)
+            for keyword in self.hospital_matcher.keywords:
+                count = keyword_counts.get(keyword, 0)
                 if count > 0:
                     result['hospital_keywords'].append({
                         'keyword': keyword,
@@ -232,8 +409,7 @@ class CrawlerService:
             
             # 标题中有医院相关关键词 (+20分)
             if result['page_title']:
-                title_lower = result['page_title'].lower()
-                if any(kw in title_lower for kw in ['医院', '医疗', 'hospital', 'medical']):
+                if self.title_matcher.search(result['page_title']):
                     content_score += 20
             
             # 页面文本中医院关键词数量
@@ -322,6 +498,19 @@ def verify_website(url):
     """
     return crawler_service.verify_website(url)
 
+def verify_websites(urls, concurrency=None):
+    """
+    批量验证网站URL的快捷函数
+    
+    Args:
+        urls: 网站URL列表
+        concurrency: 最大并发数
+    
+    Returns:
+        list: 验证结果列表
+    """
+    return crawler_service.verify_websites(urls, concurrency)
+
 def search_hospitals_websites(hospital_name, region_name=None, max_results=10):
     """
     搜索医院官网的函数（需要集成搜索引擎API）
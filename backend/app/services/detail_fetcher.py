@@ -0,0 +1,214 @@
+"""
+招投标详情页抓取
+
+列表页通常只有公告标题，本模块抓取新公告的详情页补全字段，包括：
+- 只抓取尚未入库的公告，抓取量与新增公告数成正比
+- 全局并发上限和按主机的并发上限
+- 按主机分派：只把访问间隔已到且有空闲名额的主机的详情页交给线程池，
+  抓取线程不会因等待某个主机而阻塞其他医院的详情页
+- 通过TenderExtractor抓取，共用HTTP连接池、robots.txt检查和同一主机的访问间隔
+- 详情页正文提取预算、截止日期和发布日期，合并到列表页的招投标信息
+  （只补全缺失字段，不改变内容哈希）
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import Config
+from app.services.politeness_scheduler import politeness_scheduler
+
+class DetailFetcher:
+    """招投标详情页抓取器"""
+    
+    def __init__(self, max_workers: int = 16, per_host: int = 2):
+        """
+        Args:
+            max_workers: 同时抓取的详情页总数
+            per_host: 同一主机同时抓取的详情页数
+        """
+        self.logger = logging.getLogger(__name__)
+        
+        self.config = {
+            'max_workers': max_workers,
+            'per_host': per_host,
+        }
+        
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pending: Dict[str, Deque[Tuple[str, Future]]] = {}  # 主机 -> 待抓取的(URL, Future)
+        self._active: Dict[str, int] = {}  # 主机 -> 正在抓取的详情页数
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+    
+    def submit(self, url: str) -> Future:
+        """
+        加入待抓取的详情页
+        
+        Returns:
+            结果为详情页字段（见fetch_detail）的Future
+        """
+        future = Future()
+        host = politeness_scheduler.host_key(url)
+        with self._condition:
+            self._pending.setdefault(host, deque()).append((url, future))
+            
+            if self._dispatcher is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.config['max_workers'],
+                    thread_name_prefix='detail-fetcher'
+                )
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name='detail-dispatcher', daemon=True
+                )
+                self._dispatcher.start()
+            
+            self._condition.notify_all()
+        return future
+    
+    def _dispatch_loop(self):
+        """
+        分派线程：只把访问间隔已到且未达到并发上限的主机的详情页交给线程池
+        
+        抓取线程不会等待繁忙的主机，其他主机有待抓取的详情页时照常抓取。
+        """
+        with self._condition:
+            while self._dispatcher is threading.current_thread():
+                timeout = None
+                for host in list(self._pending):
+                    if self._active.get(host, 0) >= self.config['per_host']:
+                        continue
+                    
+                    items = self._pending[host]
+                    url, future = items[0]
+                    wait_time = politeness_scheduler.ready_in(url)
+                    if wait_time > 0:
+                        timeout = wait_time if timeout is None else min(timeout, wait_time)
+                        continue
+                    
+                    items.popleft()
+                    if not items:
+                        del self._pending[host]
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    
+                    # 其他抓取可能刚刚预约了该主机，此时在抓取线程中等待（通常为0）
+                    wait_time = politeness_scheduler.reserve(url)
+                    self._active[host] = self._active.get(host, 0) + 1
+                    self._executor.submit(self._run, host, url, future, wait_time)
+                    
+                    # 同一主机可能还有空闲名额，下一轮重新检查
+                    timeout = 0
+                
+                if timeout != 0:
+                    self._condition.wait(timeout)
+    
+    def _run(self, host: str, url: str, future: Future, wait_time: float):
+        """在抓取线程中抓取详情页，完成后释放主机的并发名额"""
+        try:
+            if wait_time > 0:
+                time.sleep(wait_time)
+            future.set_result(self.fetch_detail(url, apply_delay=False))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._condition:
+                self._active[host] -= 1
+                if not self._active[host]:
+                    del self._active[host]
+                self._condition.notify_all()
+    
+    def fetch_detail(self, url: str, apply_delay: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        抓取并解析一个详情页
+        
+        Args:
+            url: 详情页URL
+            apply_delay: 是否等待主机的礼貌访问间隔（由分派线程预约访问时段时为False）
+        
+        Returns:
+            详情页字段（见TenderExtractor.extract_detail），抓取失败时返回None
+        """
+        from app.services.tender_extractor import tender_extractor
+        
+        response = tender_extractor.fetch_response(url, apply_delay=apply_delay)
+        if response is None:
+            return None
+        
+        return tender_extractor.extract_detail(response.text, url)
+    
+    def enrich(self, tenders: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        抓取招投标信息的详情页并合并字段（同一详情页只抓取一次）
+        
+        Args:
+            tenders: 带detail_url的招投标信息列表（原地更新）
+        
+        Returns:
+            包含fetched（成功抓取的详情页数）、failed（失败数）的统计
+        """
+        counts = {'fetched': 0, 'failed': 0}
+        
+        tenders_by_url: Dict[str, List[Dict[str, Any]]] = {}
+        for tender in tenders:
+            if tender.get('detail_url'):
+                tenders_by_url.setdefault(tender['detail_url'], []).append(tender)
+        if not tenders_by_url:
+            return counts
+        
+        futures = {url: self.submit(url) for url in tenders_by_url}
+        
+        for url, future in futures.items():
+            try:
+                detail = future.result()
+            except Exception as e:
+                self.logger.error(f"解析详情页失败 {url}: {str(e)}")
+                detail = None
+            
+            if not detail:
+                counts['failed'] += 1
+                continue
+            
+            counts['fetched'] += 1
+            for tender in tenders_by_url[url]:
+                self.merge(tender, detail)
+        
+        return counts
+    
+    @staticmethod
+    def merge(tender: Dict[str, Any], detail: Dict[str, Any]):
+        """详情页字段合并到招投标信息：补全缺失的日期和预算，正文替换列表页摘要"""
+        for field in ('publish_date', 'deadline_date', 'budget_amount'):
+            if tender.get(field) is None and detail.get(field) is not None:
+                tender[field] = detail[field]
+        
+        if detail.get('content') and len(detail['content']) > len(tender.get('content') or ''):
+            tender['content'] = detail['content']
+    
+    def shutdown(self, wait: bool = False):
+        """关闭分派线程和抓取线程池，取消尚未开始的抓取（下次使用时重新创建）"""
+        with self._condition:
+            executor, self._executor = self._executor, None
+            self._dispatcher = None
+            pending = [future for items in self._pending.values() for _, future in items]
+            self._pending.clear()
+            self._condition.notify_all()
+        
+        # 已交给线程池的抓取照常完成，保证其结果和主机名额都能返回
+        for future in pending:
+            future.cancel()
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+# 创建全局详情页抓取器实例
+detail_fetcher = DetailFetcher(
+    max_workers=Config.CRAWLER_CONFIG['DETAIL_CONCURRENCY'],
+    per_host=Config.CRAWLER_CONFIG['DETAIL_PER_HOST']
+)
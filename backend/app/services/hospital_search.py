@@ -16,11 +16,12 @@ import re
 import json
 import requests
 import time
-import random
 from typing import List, Dict, Optional, Tuple, Any
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 import logging
+from app.services.politeness_scheduler import politeness_scheduler
+from app.utils.keyword_matcher import KeywordMatcher
 
 class HospitalSearchService:
     """医院搜索服务类"""
@@ -46,6 +47,10 @@ class HospitalSearchService:
             '医院', '医疗', '诊所', '卫生院', '卫生站', 
             'hospital', 'medical', 'clinic', 'healthcare'
         ]
+        self.hospital_matcher = KeywordMatcher(self.hospital_keywords)
+        
+        # 医院官网域名特征
+        self.domain_matcher = KeywordMatcher(['hospital', 'medical', 'yy', 'cn'])
         
         # 排除的域名模式（第三方网站）
         self.exclude_domains = [
@@ -93,7 +98,11 @@ class HospitalSearchService:
         search_queries = self._build_search_queries(hospital_name, region_name)
         
         # 多渠道搜索
+        search_api_url = self.search_engines['duckduckgo']['api_url']
         for query in search_queries:
+            # 同一搜索引擎的连续查询之间保持间隔
+            politeness_scheduler.wait(search_api_url)
+            
             # 搜索引擎搜索
             search_results = self._search_via_search_engine(query)
             all_results.extend(search_results)
@@ -101,9 +110,6 @@ class HospitalSearchService:
             # 卫健委名录搜索
             health_results = self._search_health_commission(hospital_name, region_name)
             all_results.extend(health_results)
-            
-            # 添加延迟避免请求过于频繁
-            time.sleep(random.uniform(*self.config['delay_range']))
         
         # 去重和排序
         unique_results = self._deduplicate_results(all_results)
@@ -255,17 +261,17 @@ class HospitalSearchService:
                 score += 20
             
             # 医院关键词评分 (0-20分)
-            if any(keyword in title for keyword in self.hospital_keywords):
+            if self.hospital_matcher.search(title):
                 score += 20
             
             # 域名可信度评分 (0-20分)
             domain = result.get('domain', '')
-            if any(hospital_keyword in domain for hospital_keyword in ['hospital', 'medical', 'yy', 'cn']):
+            if self.domain_matcher.search(domain):
                 score += 15
             
             # 描述质量评分 (0-10分)
             description = result.get('description', '')
-            if any(keyword in description for keyword in self.hospital_keywords):
+            if self.hospital_matcher.search(description):
                 score += 10
             
             # 来源可信度评分 (0-10分)
@@ -320,10 +326,8 @@ class HospitalSearchService:
                 validation_result['recommendations'].append('建议使用医院官方域名')
             
             # 检查域名是否包含医院相关关键词
-            hospital_indicators = []
-            for keyword in self.hospital_keywords:
-                if keyword in domain:
-                    hospital_indicators.append(keyword)
+            found_keywords = self.hospital_matcher.find(domain)
+            hospital_indicators = [keyword for keyword in self.hospital_matcher.keywords if keyword in found_keywords]
             
             if hospital_indicators:
                 validation_result['score'] += 20
@@ -0,0 +1,303 @@
+"""
+爬虫HTTP客户端
+
+为所有抓取路径提供共享的连接池，包括：
+- 长连接复用（同一主机的首页、栏目页、详情页共用TCP+TLS连接）
+- 按主机限制连接数
+- 可选的HTTP/2多路复用（需安装httpx[http2]）
+- 根据已安装的解码库声明br/zstd压缩
+- HTTPS响应附带对端证书
+- 可选的统一HTTP代理（用于指向本地模拟站点集群）
+- 带字节上限和提前终止的流式读取
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import ssl
+import threading
+from typing import Callable, Dict, Optional, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.request import ACCEPT_ENCODING
+
+from config import Config
+
+try:
+    import httpx
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+except ImportError:
+    httpx = None
+
+def _to_requests_error(error: Exception) -> requests.RequestException:
+    """将httpx异常转换为requests异常（调用方只处理requests异常）"""
+    if isinstance(error, httpx.TimeoutException):
+        return requests.Timeout(str(error))
+    return requests.ConnectionError(str(error))
+
+class CertificateCapturingAdapter(HTTPAdapter):
+    """在响应中附带TLS连接的对端证书，避免为检查证书再建立一次连接"""
+    
+    def build_response(self, req, resp):
+        response = super().build_response(req, resp)
+        response.peer_certificate = self._get_peer_certificate(resp)
+        return response
+    
+    @staticmethod
+    def _get_peer_certificate(resp):
+        """从urllib3响应所属的连接中读取证书"""
+        try:
+            sock = getattr(getattr(resp, 'connection', None), 'sock', None)
+            if sock is None:
+                # 服务器要求关闭连接时，套接字已交由响应对象持有
+                fp = getattr(getattr(resp, '_fp', None), 'fp', None)
+                sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+            
+            if isinstance(sock, ssl.SSLSocket):
+                return sock.getpeercert()
+        except (ssl.SSLError, OSError, ValueError):
+            pass
+        return None
+
+class _HttpxRawStream:
+    """将httpx流式响应包装为requests可读取的raw对象"""
+    
+    def __init__(self, httpx_response, on_close=None):
+        self._response = httpx_response
+        self._on_close = on_close
+        self._closed = False
+    
+    def stream(self, chunk_size=None, decode_content=True):
+        try:
+            yield from self._response.iter_bytes(chunk_size)
+        except httpx.HTTPError as e:
+            raise _to_requests_error(e) from e
+        self.close()
+    
+    def read(self, amt=None, decode_content=True):
+        try:
+            return self._response.read()
+        except httpx.HTTPError as e:
+            raise _to_requests_error(e) from e
+    
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._response.close()
+            if self._on_close:
+                self._on_close()
+    
+    def release_conn(self):
+        self.close()
+
+class CrawlerHttpClient:
+    """爬虫HTTP客户端"""
+    
+    def __init__(self, pool_connections: int = 100, per_host_connections: int = 4,
+                 timeout: float = 30, http2: bool = False, proxy_url: str = None):
+        self.logger = logging.getLogger(__name__)
+        
+        self.config = {
+            'pool_connections': pool_connections,          # 缓存的主机连接池数量
+            'per_host_connections': per_host_connections,  # 每个主机的最大连接数
+            'timeout': timeout,                            # 默认请求超时（秒）
+            'http2': http2,                                # 是否启用HTTP/2
+            'proxy_url': proxy_url,                        # 所有请求经由的HTTP代理
+        }
+        
+        # 默认请求头，压缩格式取决于urllib3可用的解码库
+        self.default_headers = {
+            'User-Agent': Config.CRAWLER_CONFIG['USER_AGENTS'][0],
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': ACCEPT_ENCODING,
+            'Connection': 'keep-alive',
+        }
+        
+        # HTTP/1.1连接池：pool_block保证每个主机的连接数不超过上限
+        self.session = requests.Session()
+        self.session.headers.update(self.default_headers)
+        adapter = CertificateCapturingAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=per_host_connections,
+            pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if proxy_url:
+            self.session.proxies.update({'http': proxy_url, 'https': proxy_url})
+            self.session.trust_env = False
+        
+        # HTTP/2客户端：同一主机的请求在一个连接上多路复用
+        self._http2_client = None
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        if http2:
+            if httpx is None:
+                self.logger.warning("未安装httpx[http2]，HTTP/2已禁用")
+            else:
+                # HTTP/2不允许Connection等逐跳首部
+                http2_headers = {k: v for k, v in self.default_headers.items() if k != 'Connection'}
+                self._http2_client = httpx.Client(
+                    http2=True,
+                    headers=http2_headers,
+                    proxy=proxy_url,
+                    follow_redirects=True,
+                    limits=httpx.Limits(
+                        max_connections=pool_connections * per_host_connections,
+                        max_keepalive_connections=pool_connections
+                    )
+                )
+    
+    @property
+    def http2_enabled(self) -> bool:
+        return self._http2_client is not None
+    
+    @property
+    def proxy_url(self) -> Optional[str]:
+        return self.config['proxy_url']
+    
+    def get(self, url: str, headers: Dict[str, str] = None, timeout: float = None,
+            stream: bool = False, allow_redirects: bool = True, **kwargs) -> requests.Response:
+        """
+        发起GET请求
+        
+        Args:
+            url: 请求URL
+            headers: 额外的请求头
+            timeout: 超时时间（秒），默认使用客户端配置
+            stream: 是否流式读取响应体
+            allow_redirects: 是否跟随重定向
+        
+        Returns:
+            requests.Response对象，HTTPS响应带有peer_certificate属性
+        """
+        if timeout is None:
+            timeout = self.config['timeout']
+        
+        if self._http2_client is not None and url.startswith('https://'):
+            return self._get_http2(url, headers, timeout, stream, allow_redirects)
+        
+        return self.session.get(
+            url,
+            headers=headers,
+            timeout=timeout,
+            stream=stream,
+            allow_redirects=allow_redirects,
+            **kwargs
+        )
+    
+    def read_body(self, response: requests.Response, max_bytes: int = None,
+                  stop_when: Callable[[bytes], bool] = None, chunk_size: int = 16384) -> bytes:
+        """
+        流式读取响应体（需以stream=True发起请求）
+        
+        超过字节上限或stop_when返回True时停止读取并关闭连接，
+        读取到的内容写回response.content，response.truncated标记是否提前停止。
+        
+        Args:
+            response: 流式响应对象
+            max_bytes: 最多读取的字节数（解压后），None表示不限制
+            stop_when: 每读到一个数据块时调用，返回True时停止读取
+            chunk_size: 每次读取的块大小
+        
+        Returns:
+            读取到的响应体
+        """
+        chunks = []
+        total = 0
+        truncated = False
+        
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if max_bytes is not None and total + len(chunk) > max_bytes:
+                    chunks.append(chunk[:max_bytes - total])
+                    truncated = True
+                    break
+                
+                chunks.append(chunk)
+                total += len(chunk)
+                if stop_when is not None and stop_when(chunk):
+                    truncated = True
+                    break
+        finally:
+            # 未读完的连接无法复用，直接关闭以释放内存
+            response.close()
+        
+        body = b''.join(chunks)
+        response._content = body
+        response._content_consumed = True
+        response.truncated = truncated
+        return body
+    
+    def _get_http2(self, url: str, headers: Optional[Dict[str, str]], timeout: float,
+                   stream: bool, allow_redirects: bool) -> requests.Response:
+        """通过HTTP/2客户端请求，并转换为requests.Response"""
+        semaphore = self._get_host_semaphore(url)
+        semaphore.acquire()
+        
+        try:
+            request = self._http2_client.build_request('GET', url, headers=headers, timeout=timeout)
+            httpx_response = self._http2_client.send(request, stream=True, follow_redirects=allow_redirects)
+        except httpx.HTTPError as e:
+            semaphore.release()
+            raise _to_requests_error(e) from e
+        except Exception:
+            semaphore.release()
+            raise
+        
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.reason = httpx_response.reason_phrase
+        response.headers = CaseInsensitiveDict(httpx_response.headers.items())
+        response.url = str(httpx_response.url)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.peer_certificate = self._get_http2_peer_certificate(httpx_response)
+        response.raw = _HttpxRawStream(httpx_response, on_close=semaphore.release)
+        
+        if not stream:
+            try:
+                response._content = response.raw.read()
+            finally:
+                response.raw.close()
+        
+        return response
+    
+    @staticmethod
+    def _get_http2_peer_certificate(httpx_response) -> Optional[Dict[str, Any]]:
+        """读取HTTP/2连接的对端证书"""
+        try:
+            network_stream = httpx_response.extensions.get('network_stream')
+            ssl_object = network_stream.get_extra_info('ssl_object') if network_stream else None
+            return ssl_object.getpeercert() if ssl_object else None
+        except Exception:
+            return None
+    
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        """获取主机的并发请求信号量"""
+        host = requests.utils.urlparse(url).netloc.lower()
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.config['per_host_connections'])
+                self._host_semaphores[host] = semaphore
+            return semaphore
+    
+    def close(self):
+        """关闭所有连接"""
+        self.session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
+
+# 创建全局爬虫HTTP客户端实例
+http_client = CrawlerHttpClient(
+    pool_connections=Config.CRAWLER_CONFIG['POOL_CONNECTIONS'],
+    per_host_connections=Config.CRAWLER_CONFIG['PER_HOST_CONNECTIONS'],
+    timeout=Config.CRAWLER_CONFIG['REQUEST_TIMEOUT'],
+    http2=Config.CRAWLER_CONFIG['HTTP2_ENABLED'],
+    proxy_url=Config.CRAWLER_CONFIG['PROXY_URL']
+)
@@ -0,0 +1,246 @@
+"""
+招投标近似重复索引
+
+跨扫描批次检测近似重复公告（医院官网与省级平台转载、少量修改后重新发布），包括：
+- 持久化每条招投标记录的MinHash签名及其规范记录（tender_signatures表）
+- 内存中的分段LSH索引，首次使用时从数据库加载，查询不访问招投标记录表
+- 入库时将近似重复的记录关联到最早入库的规范记录
+- 未提交的签名按数据库会话暂存，提交后才加入共享索引，回滚时只丢弃该会话的签名
+- 为没有签名的历史记录补建签名并关联
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import TenderRecord, TenderSignature
+from app.services.content_deduplicator import content_deduplicator
+from app.utils.minhash import LSHIndex, MinHasher
+
+class NearDuplicateIndex:
+    """招投标近似重复索引"""
+    
+    PENDING_KEY = 'near_duplicate_pending'  # 会话info中待提交签名的键
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        
+        self.config = {
+            # 签名估计的词集合Jaccard达到该值视为近似重复（转载、少量修改通常在0.9以上；
+            # 同一医院同类公告套用相同模板，不同公告之间也常在0.75左右）
+            'similarity_threshold': 0.9,
+            'recall': 0.99,  # Jaccard达到阈值的记录成为候选的概率
+            'rebuild_batch_size': 1000,  # 补建签名时每批处理的记录数
+        }
+        
+        # 签名与批量去重使用同一组哈希函数
+        self.minhasher: MinHasher = content_deduplicator.minhasher
+        
+        self._lock = threading.Lock()
+        self._index: Optional[LSHIndex] = None
+        self._canonical_ids: Dict[int, int] = {}
+        
+        # 其他线程只能看到已提交记录的签名，某个医院回滚时不影响其他线程使用的索引
+        event.listen(db.session, 'after_commit', self._publish_pending)
+        event.listen(db.session, 'after_transaction_end', self._discard_pending)
+    
+    def __len__(self) -> int:
+        return len(self._index) if self._index is not None else 0
+    
+    def compute_signature(self, tender: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        计算招投标的MinHash签名（与批量去重相同，使用内容，无内容时使用标题）
+        
+        Returns:
+            签名，预处理后没有有效文本时返回None
+        """
+        text = tender.get('content') or tender.get('title') or ''
+        return content_deduplicator.get_minhash_signature(text)
+    
+    def load(self, force: bool = False):
+        """
+        从数据库加载签名并建立LSH索引（已加载时跳过）
+        
+        Args:
+            force: 是否丢弃内存中的索引重新加载
+        """
+        with self._lock:
+            if self._index is not None and not force:
+                return
+            
+            index = LSHIndex(self.config['similarity_threshold'], num_perm=self.minhasher.num_perm,
+                             recall=self.config['recall'])
+            canonical_ids = {}
+            
+            # 只加载仍存在的记录的签名，规范记录已删除时记录自身作为规范记录
+            # （未启用外键约束的数据库不会级联删除签名或清空canonical_id）
+            canonical = aliased(TenderRecord)
+            pending = self._get_pending()
+            pending_ids = pending[1] if pending is not None else {}
+            rows = db.session.query(
+                TenderSignature.tender_id, canonical.id, TenderSignature.signature
+            ).join(
+                TenderRecord, TenderRecord.id == TenderSignature.tender_id
+            ).outerjoin(
+                canonical, canonical.id == TenderSignature.canonical_id
+            ).filter(TenderSignature.num_perm == self.minhasher.num_perm)
+            for tender_id, canonical_id, data in rows.yield_per(self.config['rebuild_batch_size']):
+                # 当前会话未提交的签名在提交后加入
+                if tender_id in pending_ids:
+                    continue
+                index.insert(tender_id, np.frombuffer(data, dtype=np.uint32))
+                canonical_ids[tender_id] = canonical_id or tender_id
+            
+            self._index = index
+            self._canonical_ids = canonical_ids
+            self.logger.info(f"近似重复索引加载完成: {len(index)}条签名, "
+                             f"分段={index.bands}x{index.rows}")
+    
+    def reset(self):
+        """丢弃内存中的索引，下次使用时重新加载（删除招投标记录后调用）"""
+        with self._lock:
+            self._index = None
+            self._canonical_ids = {}
+    
+    def find(self, signature: np.ndarray) -> Optional[Tuple[int, float]]:
+        """
+        查找近似重复的已入库记录
+        
+        只比较LSH分桶中的候选签名，与记录总数无关。
+        
+        Returns:
+            (规范记录ID, 估计相似度)，没有近似重复时返回None
+        """
+        self.load()
+        threshold = self.config['similarity_threshold']
+        
+        candidates = []
+        with self._lock:
+            for tender_id, similarity in self._index.query_similar(signature, threshold).items():
+                candidates.append((self._canonical_ids[tender_id], similarity))
+        
+        # 当前会话已写入、尚未提交的记录
+        pending = self._get_pending()
+        if pending is not None:
+            pending_index, pending_canonical_ids = pending
+            for tender_id, similarity in pending_index.query_similar(signature, threshold).items():
+                candidates.append((pending_canonical_ids[tender_id], similarity))
+        
+        best = None
+        for canonical_id, similarity in candidates:
+            # 相似度相同时选择更早入库的规范记录
+            if best is None or (similarity, -canonical_id) > (best[1], -best[0]):
+                best = (canonical_id, similarity)
+        
+        return best
+    
+    def add(self, tender_id: int, signature: np.ndarray, canonical_id: int = None):
+        """将已写入记录的签名加入当前会话的待提交签名（会话提交后加入共享索引）"""
+        pending = self._get_pending(create=True)
+        pending_index, pending_canonical_ids = pending
+        pending_index.insert(tender_id, signature)
+        pending_canonical_ids[tender_id] = canonical_id or tender_id
+    
+    def _get_pending(self, create: bool = False) -> Optional[Tuple[LSHIndex, Dict[int, int]]]:
+        """当前数据库会话中已写入、尚未提交的签名（LSH索引, 记录ID -> 规范记录ID）"""
+        pending = db.session.info.get(self.PENDING_KEY)
+        if pending is None and create:
+            pending = db.session.info[self.PENDING_KEY] = (
+                LSHIndex(self.config['similarity_threshold'], num_perm=self.minhasher.num_perm,
+                         recall=self.config['recall']),
+                {}
+            )
+        return pending
+    
+    def _publish_pending(self, session):
+        """会话提交后将其签名加入共享索引"""
+        pending = session.info.pop(self.PENDING_KEY, None)
+        if pending is None:
+            return
+        
+        pending_index, pending_canonical_ids = pending
+        with self._lock:
+            # 索引已丢弃时下次使用会从数据库加载，其中已包含这些签名
+            if self._index is None:
+                return
+            for tender_id, canonical_id in pending_canonical_ids.items():
+                self._index.insert(tender_id, pending_index.get_signature(tender_id))
+                self._canonical_ids[tender_id] = canonical_id
+    
+    def _discard_pending(self, session, transaction):
+        """事务未提交就结束（回滚或关闭会话）时丢弃会话中未提交的签名（提交时已由_publish_pending取出）"""
+        if transaction.parent is None:
+            session.info.pop(self.PENDING_KEY, None)
+    
+    def link_records(self, pairs: List[Tuple[TenderRecord, Dict[str, Any]]]) -> int:
+        """
+        为刚写入（已flush）的招投标记录保存签名，并关联近似重复的规范记录
+        
+        Args:
+            pairs: (招投标记录, 提取结果)列表，按入库顺序排列
+        
+        Returns:
+            关联到规范记录的近似重复数
+        """
+        linked = 0
+        for record, tender in pairs:
+            signature = self.compute_signature(tender)
+            if signature is None:
+                continue
+            
+            match = self.find(signature)
+            canonical_id, similarity = match if match else (None, None)
+            
+            db.session.add(TenderSignature(
+                tender_id=record.id,
+                canonical_id=canonical_id,
+                similarity=similarity,
+                num_perm=self.minhasher.num_perm,
+                signature=signature.tobytes()
+            ))
+            self.add(record.id, signature, canonical_id)
+            
+            if canonical_id:
+                linked += 1
+        
+        return linked
+    
+    def rebuild(self) -> Dict[str, int]:
+        """
+        为没有签名的招投标记录补建签名并关联规范记录（按ID顺序，与入库顺序一致）
+        
+        Returns:
+            包含processed（补建数）和linked（关联到规范记录数）的字典
+        """
+        counts = {'processed': 0, 'linked': 0}
+        batch_size = self.config['rebuild_batch_size']
+        last_id = 0
+        
+        while True:
+            records = TenderRecord.query.filter(
+                TenderRecord.id > last_id,
+                ~TenderRecord.id.in_(db.session.query(TenderSignature.tender_id))
+            ).order_by(TenderRecord.id).limit(batch_size).all()
+            if not records:
+                break
+            
+            pairs = [(record, {'title': record.title, 'content': record.content}) for record in records]
+            counts['linked'] += self.link_records(pairs)
+            counts['processed'] += len(records)
+            last_id = records[-1].id
+            db.session.commit()
+        
+        self.logger.info(f"近似重复索引补建完成: 记录={counts['processed']}, 关联={counts['linked']}")
+        return counts
+
+# 创建全局近似重复索引实例
+near_duplicate_index = NearDuplicateIndex()
@@ -0,0 +1,449 @@
+"""
+原始页面归档
+
+将抓取到的HTML按内容哈希压缩存储到本地磁盘，供重新提取和调试使用，包括：
+- 按SHA-256内容寻址，相同内容只存储一份
+- zstd压缩，可使用基于已归档页面训练的字典（未安装zstandard时使用zlib）
+- 按URL和抓取时间建立的SQLite索引
+- 按时间范围回放页面并重新执行招投标提取
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+import requests
+
+from config import Config
+
+try:
+    import zstandard as zstd
+except ImportError:
+    zstd = None
+
+class PageArchive:
+    """原始页面归档"""
+    
+    INDEX_FILE = 'index.sqlite3'
+    
+    def __init__(self, archive_dir: str, compression_level: int = 3, enabled: bool = True):
+        self.logger = logging.getLogger(__name__)
+        
+        self.archive_dir = archive_dir
+        self.config = {
+            'enabled': enabled,                      # 是否归档抓取到的页面
+            'compression_level': compression_level,  # 压缩级别
+            'dict_size': 112640,                     # 训练字典大小（字节）
+            'dict_samples': 2000,                    # 训练字典的最大样本数
+            'batch_size': 500,                       # 回放时每次读取的索引行数
+        }
+        
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._local = threading.local()
+        self._dicts: Dict[int, Any] = {}
+        self._active_dict_id: Optional[int] = None
+    
+    @property
+    def blob_dir(self) -> str:
+        return os.path.join(self.archive_dir, 'blobs')
+    
+    @property
+    def dict_dir(self) -> str:
+        return os.path.join(self.archive_dir, 'dictionaries')
+    
+    @staticmethod
+    def compute_hash(content: bytes) -> str:
+        """计算页面内容哈希"""
+        return hashlib.sha256(content).hexdigest()
+    
+    def archive_response(self, response: requests.Response) -> Optional[str]:
+        """
+        归档抓取到的响应
+        
+        仅归档状态码为200且完整读取的HTML/文本页面，归档失败不影响抓取流程。
+        
+        Args:
+            response: requests响应对象
+        
+        Returns:
+            内容哈希，未归档时返回None
+        """
+        if not self.config['enabled'] or response.status_code != 200:
+            return None
+        if getattr(response, 'truncated', False):
+            return None
+        
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and not any(t in content_type for t in ('html', 'xml', 'text')):
+            return None
+        
+        try:
+            return self.store(
+                response.url,
+                response.content,
+                status_code=response.status_code,
+                content_type=content_type or None,
+                encoding=response.encoding
+            )
+        except (OSError, sqlite3.Error) as e:
+            self.logger.warning(f"页面归档失败 {response.url}: {str(e)}")
+            return None
+    
+    def store(self, url: str, content: bytes, status_code: int = 200, content_type: str = None,
+              encoding: str = None, fetched_at: datetime = None) -> str:
+        """
+        存储页面内容并记录一次抓取
+        
+        Args:
+            url: 页面URL
+            content: 响应体原始字节
+            status_code: HTTP状态码
+            content_type: Content-Type响应头
+            encoding: 响应头声明的字符集
+            fetched_at: 抓取时间，默认当前UTC时间
+        
+        Returns:
+            内容哈希
+        """
+        content_hash = self.compute_hash(content)
+        compressed_size = self._write_blob(content_hash, content)
+        
+        fetched_at = fetched_at or datetime.utcnow()
+        conn = self._get_connection()
+        with self._lock:
+            conn.execute(
+                'INSERT INTO snapshots (url, fetched_at, content_hash, status_code, content_type, '
+                'encoding, size, compressed_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, fetched_at.isoformat(), content_hash, status_code, content_type,
+                 encoding, len(content), compressed_size)
+            )
+            conn.commit()
+        
+        return content_hash
+    
+    def load(self, content_hash: str) -> Optional[bytes]:
+        """按内容哈希读取页面原始字节"""
+        for extension, decompress in (('.zst', self._decompress_zstd), ('.zz', zlib.decompress)):
+            path = self._blob_path(content_hash, extension)
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            return decompress(data)
+        return None
+    
+    def decode(self, snapshot: Dict[str, Any], content: bytes = None) -> str:
+        """
+        将归档的页面解码为文本
+        
+        与抓取时的response.text一致：优先使用响应头声明的字符集，否则按内容探测。
+        """
+        if content is None:
+            content = self.load(snapshot['content_hash'])
+        
+        response = requests.Response()
+        response._content = content or b''
+        response.encoding = snapshot.get('encoding')
+        return response.text
+    
+    def get_snapshots(self, url: str, limit: int = None) -> List[Dict[str, Any]]:
+        """获取URL的抓取记录，按抓取时间倒序"""
+        sql = 'SELECT * FROM snapshots WHERE url = ? ORDER BY fetched_at DESC'
+        params: Tuple = (url,)
+        if limit:
+            sql += ' LIMIT ?'
+            params += (limit,)
+        
+        conn = self._get_connection()
+        with self._lock:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._row_to_snapshot(row) for row in rows]
+    
+    def get_latest(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取URL最近一次抓取记录"""
+        snapshots = self.get_snapshots(url, limit=1)
+        return snapshots[0] if snapshots else None
+    
+    def iter_snapshots(self, since: datetime = None, until: datetime = None, url_prefix: str = None,
+                       latest_only: bool = False, with_content: bool = True) -> Iterator[Dict[str, Any]]:
+        """
+        按时间范围遍历归档页面
+        
+        Args:
+            since: 起始抓取时间（含）
+            until: 截止抓取时间（不含）
+            url_prefix: 仅遍历以此前缀开头的URL
+            latest_only: 每个URL只返回范围内最近一次抓取
+            with_content: 是否同时读取页面内容（content字段）
+        
+        Yields:
+            抓取记录字典
+        """
+        conditions = []
+        params: List[Any] = []
+        if since:
+            conditions.append('fetched_at >= ?')
+            params.append(since.isoformat())
+        if until:
+            conditions.append('fetched_at < ?')
+            params.append(until.isoformat())
+        if url_prefix:
+            conditions.append("url LIKE ? ESCAPE '\\'")
+            escaped = url_prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(escaped + '%')
+        
+        where = ' AND '.join(conditions) or '1'
+        if latest_only:
+            # SQLite中MAX()聚合时裸列取自最大值所在行
+            sql = (f'SELECT *, MAX(fetched_at) FROM snapshots WHERE {where} '
+                   f'GROUP BY url HAVING id > ? ORDER BY id LIMIT ?')
+        else:
+            sql = f'SELECT * FROM snapshots WHERE {where} AND id > ? ORDER BY id LIMIT ?'
+        
+        conn = self._get_connection()
+        last_id = 0
+        while True:
+            # 按主键分批读取，遍历期间不长时间占用连接
+            with self._lock:
+                rows = conn.execute(sql, params + [last_id, self.config['batch_size']]).fetchall()
+            if not rows:
+                return
+            
+            for row in rows:
+                snapshot = self._row_to_snapshot(row)
+                if with_content:
+                    snapshot['content'] = self.load(snapshot['content_hash'])
+                yield snapshot
+            last_id = rows[-1]['id']
+    
+    def replay_extraction(self, since: datetime = None, until: datetime = None, url_prefix: str = None,
+                          latest_only: bool = False, extractor=None) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        使用当前的提取规则重新提取归档页面
+        
+        同一URL的相同内容只提取一次。
+        
+        Args:
+            since: 起始抓取时间（含）
+            until: 截止抓取时间（不含）
+            url_prefix: 仅回放以此前缀开头的URL
+            latest_only: 每个URL只回放范围内最近一次抓取
+            extractor: 招投标提取器，默认使用全局实例
+        
+        Yields:
+            (抓取记录, 提取结果列表)
+        """
+        if extractor is None:
+            from app.services.tender_extractor import tender_extractor
+            extractor = tender_extractor
+        
+        seen = set()
+        for snapshot in self.iter_snapshots(since, until, url_prefix, latest_only):
+            key = (snapshot['url'], snapshot['content_hash'])
+            if key in seen or snapshot['content'] is None:
+                continue
+            seen.add(key)
+            
+            html_content = self.decode(snapshot, snapshot.pop('content'))
+            yield snapshot, extractor.extract_tender_info(html_content, snapshot['url'])
+    
+    def train_dictionary(self, sample_count: int = None, dict_size: int = None) -> Optional[int]:
+        """
+        使用已归档页面训练zstd字典，之后新归档的页面使用该字典压缩
+        
+        Args:
+            sample_count: 最大样本数
+            dict_size: 字典大小（字节）
+        
+        Returns:
+            字典ID，未安装zstandard或样本不足时返回None
+        """
+        if zstd is None:
+            self.logger.warning("未安装zstandard，无法训练压缩字典")
+            return None
+        
+        sample_count = sample_count or self.config['dict_samples']
+        dict_size = dict_size or self.config['dict_size']
+        
+        conn = self._get_connection()
+        with self._lock:
+            rows = conn.execute('SELECT DISTINCT content_hash FROM snapshots').fetchall()
+        
+        hashes = [row['content_hash'] for row in rows]
+        random.shuffle(hashes)
+        samples = [content for content in map(self.load, hashes[:sample_count]) if content]
+        if len(samples) < 10:
+            self.logger.warning(f"归档页面不足，无法训练压缩字典: {len(samples)}")
+            return None
+        
+        dictionary = zstd.train_dictionary(dict_size, samples)
+        dict_id = dictionary.dict_id()
+        
+        os.makedirs(self.dict_dir, exist_ok=True)
+        self._atomic_write(os.path.join(self.dict_dir, f'{dict_id}.dict'), dictionary.as_bytes())
+        
+        with self._lock:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('active_dict_id', ?)", (str(dict_id),))
+            conn.commit()
+            self._dicts[dict_id] = dictionary
+            self._active_dict_id = dict_id
+        
+        self.logger.info(f"压缩字典训练完成: id={dict_id}, 样本={len(samples)}")
+        return dict_id
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取归档统计信息"""
+        conn = self._get_connection()
+        with self._lock:
+            row = conn.execute(
+                'SELECT COUNT(*) AS snapshots, COUNT(DISTINCT url) AS urls, '
+                'COUNT(DISTINCT content_hash) AS blobs FROM snapshots'
+            ).fetchone()
+            sizes = conn.execute(
+                'SELECT COALESCE(SUM(size), 0) AS size, COALESCE(SUM(compressed_size), 0) AS compressed_size '
+                'FROM (SELECT size, compressed_size FROM snapshots GROUP BY content_hash)'
+            ).fetchone()
+        
+        return {
+            'snapshots': row['snapshots'],
+            'urls': row['urls'],
+            'blobs': row['blobs'],
+            'size': sizes['size'],
+            'compressed_size': sizes['compressed_size'],
+            'compression_ratio': round(sizes['size'] / sizes['compressed_size'], 2) if sizes['compressed_size'] else 0,
+            'compression': 'zstd' if zstd is not None else 'zlib',
+            'dict_id': self._active_dict_id,
+        }
+    
+    def close(self):
+        """关闭索引连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """打开索引数据库（首次使用时创建归档目录）"""
+        if self._conn is not None:
+            return self._conn
+        
+        with self._lock:
+            if self._conn is None:
+                os.makedirs(self.archive_dir, exist_ok=True)
+                conn = sqlite3.connect(os.path.join(self.archive_dir, self.INDEX_FILE), check_same_thread=False)
+                conn.row_factory = sqlite3.Row
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript('''
+                    CREATE TABLE IF NOT EXISTS snapshots (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        url TEXT NOT NULL,
+                        fetched_at TEXT NOT NULL,
+                        content_hash TEXT NOT NULL,
+                        status_code INTEGER,
+                        content_type TEXT,
+                        encoding TEXT,
+                        size INTEGER,
+                        compressed_size INTEGER
+                    );
+                    CREATE INDEX IF NOT EXISTS idx_snapshots_url_time ON snapshots (url, fetched_at);
+                    CREATE INDEX IF NOT EXISTS idx_snapshots_time ON snapshots (fetched_at);
+                    CREATE INDEX IF NOT EXISTS idx_snapshots_hash ON snapshots (content_hash);
+                    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                ''')
+                
+                row = conn.execute("SELECT value FROM meta WHERE key = 'active_dict_id'").fetchone()
+                self._active_dict_id = int(row['value']) if row and zstd is not None else None
+                self._conn = conn
+        
+        return self._conn
+    
+    @staticmethod
+    def _row_to_snapshot(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            'id': row['id'],
+            'url': row['url'],
+            'fetched_at': datetime.fromisoformat(row['fetched_at']),
+            'content_hash': row['content_hash'],
+            'status_code': row['status_code'],
+            'content_type': row['content_type'],
+            'encoding': row['encoding'],
+            'size': row['size'],
+            'compressed_size': row['compressed_size'],
+        }
+    
+    def _blob_path(self, content_hash: str, extension: str) -> str:
+        return os.path.join(self.blob_dir, content_hash[:2], content_hash + extension)
+    
+    def _write_blob(self, content_hash: str, content: bytes) -> int:
+        """写入压缩后的页面内容，已存在时直接返回其大小"""
+        for extension in ('.zst', '.zz'):
+            path = self._blob_path(content_hash, extension)
+            if os.path.exists(path):
+                return os.path.getsize(path)
+        
+        self._get_connection()
+        if zstd is not None:
+            data, extension = self._get_compressor().compress(content), '.zst'
+        else:
+            data, extension = zlib.compress(content, min(self.config['compression_level'], 9)), '.zz'
+        
+        path = self._blob_path(content_hash, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._atomic_write(path, data)
+        return len(data)
+    
+    @staticmethod
+    def _atomic_write(path: str, data: bytes):
+        """先写临时文件再重命名，避免并发写入或中断产生残缺文件"""
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def _get_compressor(self):
+        """获取当前线程的zstd压缩器（压缩器不是线程安全的）"""
+        dict_id = self._active_dict_id
+        compressor = getattr(self._local, 'compressor', None)
+        if compressor is None or getattr(self._local, 'dict_id', None) != dict_id:
+            dictionary = self._get_dictionary(dict_id) if dict_id else None
+            compressor = zstd.ZstdCompressor(level=self.config['compression_level'], dict_data=dictionary)
+            self._local.compressor = compressor
+            self._local.dict_id = dict_id
+        return compressor
+    
+    def _decompress_zstd(self, data: bytes) -> bytes:
+        """按帧头中的字典ID选择字典解压"""
+        if zstd is None:
+            raise RuntimeError('读取zstd归档需要安装zstandard')
+        
+        dict_id = zstd.get_frame_parameters(data).dict_id
+        dictionary = self._get_dictionary(dict_id) if dict_id else None
+        return zstd.ZstdDecompressor(dict_data=dictionary).decompress(data)
+    
+    def _get_dictionary(self, dict_id: int):
+        """加载压缩字典"""
+        dictionary = self._dicts.get(dict_id)
+        if dictionary is None:
+            with open(os.path.join(self.dict_dir, f'{dict_id}.dict'), 'rb') as f:
+                dictionary = zstd.ZstdCompressionDict(f.read())
+            self._dicts[dict_id] = dictionary
+        return dictionary
+
+# 创建全局页面归档实例
+page_archive = PageArchive(
+    archive_dir=Config.CRAWLER_CONFIG['PAGE_ARCHIVE_DIR'],
+    compression_level=Config.CRAWLER_CONFIG['PAGE_ARCHIVE_LEVEL'],
+    enabled=Config.CRAWLER_CONFIG['PAGE_ARCHIVE_ENABLED']
+)
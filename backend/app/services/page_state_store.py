@@ -0,0 +1,164 @@
+"""
+页面条件请求状态存储
+
+按URL持久化ETag、Last-Modified和响应体哈希，包括：
+- 生成If-None-Match/If-Modified-Since条件请求头
+- 记录304未变更响应
+- 根据响应体哈希判断内容是否变化
+- 根据规范化HTML指纹判断页面内容是否实质变化，记录解析提取耗时
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app import db
+from app.models import PageFetchState
+from app.utils.html_fingerprint import compute_html_hash
+
+class PageStateStore:
+    """页面条件请求状态存储"""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+    
+    @staticmethod
+    def compute_body_hash(content: bytes) -> str:
+        """计算响应体哈希"""
+        return hashlib.sha256(content or b'').hexdigest()
+    
+    @staticmethod
+    def compute_html_hash(html, encoding: Optional[str] = None) -> str:
+        """计算规范化HTML指纹（encoding为响应头声明的字符集）"""
+        return compute_html_hash(html, encoding)
+    
+    def get_state(self, url: str) -> Optional[PageFetchState]:
+        """获取页面的抓取状态"""
+        return PageFetchState.query.filter_by(url=url).first()
+    
+    def get_conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        生成条件请求头
+        
+        Args:
+            url: 页面URL
+        
+        Returns:
+            If-None-Match/If-Modified-Since请求头，无记录时为空字典
+        """
+        state = self.get_state(url)
+        headers = {}
+        
+        if state:
+            if state.etag:
+                headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                headers['If-Modified-Since'] = state.last_modified
+        
+        return headers
+    
+    def record_not_modified(self, url: str):
+        """记录304未变更响应"""
+        state = self.get_state(url)
+        if not state:
+            return
+        
+        state.status_code = 304
+        state.fetch_count = (state.fetch_count or 0) + 1
+        state.not_modified_count = (state.not_modified_count or 0) + 1
+        state.last_fetched_at = datetime.utcnow()
+    
+    def record_response(self, url: str, response, body_hash: str = None) -> bool:
+        """
+        记录完整响应的校验信息
+        
+        Args:
+            url: 页面URL
+            response: 响应对象
+            body_hash: 响应体哈希，为空时根据响应内容计算
+        
+        Returns:
+            响应体相对上次是否发生变化
+        """
+        if body_hash is None:
+            body_hash = self.compute_body_hash(response.content)
+        
+        now = datetime.utcnow()
+        state = self.get_state(url)
+        if not state:
+            state = PageFetchState(url=url, fetch_count=0, not_modified_count=0)
+            db.session.add(state)
+        
+        changed = state.body_hash != body_hash
+        
+        state.etag = response.headers.get('ETag')
+        state.last_modified = response.headers.get('Last-Modified')
+        state.status_code = response.status_code
+        state.fetch_count = (state.fetch_count or 0) + 1
+        state.last_fetched_at = now
+        
+        if changed:
+            state.body_hash = body_hash
+            state.last_changed_at = now
+        else:
+            state.not_modified_count = (state.not_modified_count or 0) + 1
+        
+        return changed
+    
+    def compare(self, url: str, body_hash: str, html_hash: str) -> Dict[str, Any]:
+        """
+        与上次抓取的结果比较（只读，不开启写事务，可在解析页面前调用）
+        
+        Args:
+            url: 页面URL
+            body_hash: 响应体哈希
+            html_hash: 规范化HTML哈希
+        
+        Returns:
+            包含body_changed、html_changed和上次解析提取耗时extract_ms的字典
+        """
+        state = self.get_state(url)
+        if not state:
+            return {'body_changed': True, 'html_changed': True, 'extract_ms': None}
+        
+        return {
+            'body_changed': state.body_hash != body_hash,
+            'html_changed': state.html_hash != html_hash,
+            'extract_ms': state.extract_ms,
+        }
+    
+    def record_html_hash(self, url: str, html_hash: str) -> bool:
+        """
+        记录页面指纹（需在record_response之后调用）
+        
+        Args:
+            url: 页面URL
+            html_hash: 规范化HTML哈希
+        
+        Returns:
+            指纹相对上次是否发生变化
+        """
+        state = self.get_state(url)
+        if not state:
+            return True
+        
+        if state.html_hash == html_hash:
+            state.html_unchanged_count = (state.html_unchanged_count or 0) + 1
+            return False
+        
+        state.html_hash = html_hash
+        return True
+    
+    def record_extract_time(self, url: str, elapsed_ms: int):
+        """记录页面解析提取耗时"""
+        state = self.get_state(url)
+        if state:
+            state.extract_ms = elapsed_ms
+
+# 创建全局页面状态存储实例
+page_state_store = PageStateStore()
@@ -0,0 +1,126 @@
+"""
+HTML解析进程池
+
+招投标提取是纯Python的CPU密集型工作，在线程中执行会受GIL限制。
+本模块将原始页面字节发送到多进程池中解析，包括：
+- 进程数默认等于CPU核数，首次使用时创建
+- 子进程中执行TenderExtractor的栏目列表页提取（有提取模板时只解析列表所在子树），
+  只返回招投标字典、下一页URL和提取模板
+- 抓取仍在线程中进行，等待解析结果时不占用GIL
+- 未启用或进程池异常时回退到当前进程解析
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from config import Config
+
+CHARSET_PATTERN = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+
+def declared_charset(content_type: Optional[str]) -> Optional[str]:
+    """响应头Content-Type中声明的字符集，未声明时返回None"""
+    match = CHARSET_PATTERN.search(content_type or '')
+    return match.group(1) if match else None
+
+def _extract_column_page(content: bytes, encoding: Optional[str], url: str, page_number: int,
+                         template: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """在子进程中解析列表页（未声明编码时由解析器按meta声明的字符集解码）"""
+    from app.services.tender_extractor import tender_extractor
+    
+    html_content = content
+    if encoding:
+        try:
+            html_content = content.decode(encoding, errors='replace')
+        except LookupError:
+            pass
+    return tender_extractor.extract_column_page(html_content, url, page_number, template)
+
+class ParsePool:
+    """HTML解析进程池"""
+    
+    def __init__(self, max_workers: int = 0):
+        """
+        Args:
+            max_workers: 进程数，0为CPU核数，1为在当前进程解析
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 1
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 调用方进程中有调度器线程和数据库连接，子进程不能直接fork
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context(method)
+                )
+                self.logger.info(f"解析进程池已启动: {self.max_workers} 个进程 ({method})")
+            return self._executor
+    
+    def submit(self, content: bytes, encoding: Optional[str], url: str, page_number: int = 1,
+               template: Dict[str, Any] = None) -> Future:
+        """
+        提交列表页解析任务
+        
+        Args:
+            content: 原始页面字节
+            encoding: 响应头声明的字符集（见declared_charset），未声明时为None
+            url: 列表页URL
+            page_number: 当前页码
+            template: 栏目的提取模板（见TenderExtractor.learn_template）
+        
+        Returns:
+            结果为TenderExtractor.extract_column_page返回字典的Future
+        """
+        if not self.enabled:
+            future = Future()
+            try:
+                future.set_result(_extract_column_page(content, encoding, url, page_number, template))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        
+        return self._get_executor().submit(_extract_column_page, content, encoding, url, page_number, template)
+    
+    def extract_column_page(self, content: bytes, encoding: Optional[str], url: str,
+                            page_number: int = 1, template: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        解析列表页并等待结果
+        
+        Returns:
+            包含tenders、next_url、template、template_matched的字典
+        """
+        try:
+            return self.submit(content, encoding, url, page_number, template).result()
+        except BrokenProcessPool as e:
+            self.logger.error(f"解析进程池异常，改为在当前进程解析: {str(e)}")
+            self.shutdown()
+            return _extract_column_page(content, encoding, url, page_number, template)
+    
+    def shutdown(self, wait: bool = False):
+        """关闭进程池（下次使用时重新创建）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+# 创建全局解析进程池实例
+parse_pool = ParsePool(max_workers=Config.CRAWLER_CONFIG['PARSE_WORKERS'])
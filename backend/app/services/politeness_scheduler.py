@@ -0,0 +1,191 @@
+"""
+礼貌访问调度器
+
+按主机维护下一次允许访问的时间，替代每次请求后的全局随机延迟，包括：
+- 同一主机的最小访问间隔（随机间隔或robots.txt的Crawl-delay）
+- 不同主机之间互不等待
+- 按主机就绪时间分派待抓取URL
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple, Any
+from urllib.parse import urlparse
+
+from config import Config
+
+class PolitenessScheduler:
+    """按主机的礼貌访问调度器"""
+    
+    def __init__(self, delay_range: Tuple[float, float] = (1, 5), max_crawl_delay: float = 60):
+        self.delay_range = delay_range
+        self.max_crawl_delay = max_crawl_delay
+        
+        self._lock = threading.Lock()
+        self._next_time: Dict[str, float] = {}  # 主机 -> 下一次允许访问的时间
+        self._crawl_delays: Dict[str, float] = {}  # 主机 -> robots.txt声明的Crawl-delay
+    
+    @staticmethod
+    def host_key(url: str) -> str:
+        """获取URL对应的主机标识"""
+        if not url:
+            return ''
+        if '://' not in url:
+            url = 'http://' + url
+        return urlparse(url).netloc.lower()
+    
+    def set_crawl_delay(self, url: str, delay: Optional[float]):
+        """
+        设置主机的Crawl-delay
+        
+        Args:
+            url: 主机下任意URL
+            delay: 延迟秒数，None表示清除
+        """
+        host = self.host_key(url)
+        with self._lock:
+            if delay is None:
+                self._crawl_delays.pop(host, None)
+            else:
+                self._crawl_delays[host] = min(float(delay), self.max_crawl_delay)
+    
+    def get_crawl_delay(self, url: str) -> Optional[float]:
+        """获取主机的Crawl-delay"""
+        with self._lock:
+            return self._crawl_delays.get(self.host_key(url))
+    
+    def _interval(self, host: str) -> float:
+        """计算同一主机两次请求之间的间隔（调用方需持有锁）"""
+        interval = random.uniform(*self.delay_range)
+        crawl_delay = self._crawl_delays.get(host)
+        if crawl_delay is not None:
+            interval = max(interval, crawl_delay)
+        return interval
+    
+    def ready_at(self, url: str) -> float:
+        """主机下一次允许访问的时间点（time.monotonic时钟）"""
+        host = self.host_key(url)
+        with self._lock:
+            return self._next_time.get(host, 0.0)
+    
+    def ready_in(self, url: str) -> float:
+        """主机还需等待多少秒才可访问（不占用访问时段）"""
+        return max(0.0, self.ready_at(url) - time.monotonic())
+    
+    def reserve(self, url: str) -> float:
+        """
+        为URL预约一个访问时段
+        
+        Args:
+            url: 待访问的URL
+        
+        Returns:
+            调用方在发起请求前需要等待的秒数
+        """
+        host = self.host_key(url)
+        with self._lock:
+            now = time.monotonic()
+            start_time = max(now, self._next_time.get(host, 0.0))
+            self._next_time[host] = start_time + self._interval(host)
+            return start_time - now
+    
+    def wait(self, url: str):
+        """阻塞直到可以访问该主机"""
+        wait_time = self.reserve(url)
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    async def wait_async(self, url: str):
+        """异步等待直到可以访问该主机"""
+        wait_time = self.reserve(url)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+    
+    def reset(self):
+        """清空所有主机的访问记录"""
+        with self._lock:
+            self._next_time.clear()
+            self._crawl_delays.clear()
+
+class HostDispatchQueue:
+    """
+    按主机就绪时间分派URL的队列
+    
+    每个主机内部保持先进先出，出队时优先返回最早就绪主机的URL，
+    并同时在调度器中为其预约访问时段。
+    """
+    
+    def __init__(self, scheduler: PolitenessScheduler = None):
+        self.scheduler = scheduler or politeness_scheduler
+        
+        self._lock = threading.Lock()
+        self._host_items: Dict[str, deque] = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._size = 0
+    
+    def __len__(self):
+        return self._size
+    
+    def push(self, url: str, item: Any = None):
+        """
+        加入待分派的URL
+        
+        Args:
+            url: 待访问的URL
+            item: 随URL返回的附加数据，默认为URL本身
+        """
+        host = self.scheduler.host_key(url)
+        with self._lock:
+            items = self._host_items.get(host)
+            if items is None:
+                items = self._host_items[host] = deque()
+                heapq.heappush(self._heap, (self.scheduler.ready_at(url), next(self._counter), host))
+            items.append((url, url if item is None else item))
+            self._size += 1
+    
+    def pop(self) -> Optional[Tuple[Any, float]]:
+        """
+        取出最早就绪主机的下一个URL
+        
+        Returns:
+            (附加数据, 需等待秒数)，队列为空时返回None
+        """
+        with self._lock:
+            while self._heap:
+                _, _, host = heapq.heappop(self._heap)
+                items = self._host_items.get(host)
+                if not items:
+                    self._host_items.pop(host, None)
+                    continue
+                
+                # 就绪时间可能已被其他请求推后，重新排队
+                url, item = items[0]
+                ready_at = self.scheduler.ready_at(url)
+                if self._heap and ready_at > self._heap[0][0]:
+                    heapq.heappush(self._heap, (ready_at, next(self._counter), host))
+                    continue
+                
+                items.popleft()
+                self._size -= 1
+                wait_time = self.scheduler.reserve(url)
+                if items:
+                    heapq.heappush(self._heap, (self.scheduler.ready_at(url), next(self._counter), host))
+                else:
+                    self._host_items.pop(host, None)
+                
+                return item, wait_time
+            
+            return None
+
+# 创建全局礼貌访问调度器实例
+politeness_scheduler = PolitenessScheduler(delay_range=Config.CRAWLER_CONFIG['DELAY_RANGE'])
@@ -0,0 +1,199 @@
+"""
+robots.txt缓存
+
+按协议+主机缓存解析后的robots.txt，供网站验证、爬虫和招投标提取共用，包括：
+- 带TTL的正向缓存
+- 404/403与超时等错误的负缓存
+- 按容量淘汰的LRU
+- can_fetch与Crawl-delay查询
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from urllib import robotparser
+from urllib.parse import urlparse
+
+import requests
+
+from config import Config
+from app.services.http_client import http_client
+from app.services.politeness_scheduler import politeness_scheduler
+
+class RobotsEntry:
+    """单个主机的robots.txt缓存条目"""
+    
+    # 条目状态
+    OK = 'ok'            # 成功获取并解析
+    MISSING = 'missing'  # 404等，视为全部允许
+    DENIED = 'denied'    # 401/403，视为全部禁止
+    ERROR = 'error'      # 超时、5xx等，结果未知
+    
+    def __init__(self, status: str, expires_at: float, parser: robotparser.RobotFileParser = None):
+        self.status = status
+        self.expires_at = expires_at
+        self.parser = parser
+    
+    def is_expired(self, now: float = None) -> bool:
+        return (now or time.monotonic()) >= self.expires_at
+
+class RobotsCache:
+    """robots.txt缓存"""
+    
+    def __init__(self, ttl: float = 86400, negative_ttl: float = 21600, error_ttl: float = 1800,
+                 max_entries: int = 10000, timeout: float = 10):
+        self.logger = logging.getLogger(__name__)
+        
+        self.config = {
+            'ttl': ttl,                      # 成功获取的缓存时间（秒）
+            'negative_ttl': negative_ttl,    # 404/403的缓存时间（秒）
+            'error_ttl': error_ttl,          # 超时和服务器错误的缓存时间（秒）
+            'max_entries': max_entries,      # 最大缓存主机数
+            'timeout': timeout,              # robots.txt请求超时（秒）
+        }
+        
+        self._entries: 'OrderedDict[str, RobotsEntry]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        
+        # 命中统计
+        self.stats = {'hits': 0, 'misses': 0, 'fetch_errors': 0}
+    
+    @staticmethod
+    def origin(url: str) -> str:
+        """获取URL的协议+主机"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme or 'http'}://{parsed.netloc.lower()}"
+    
+    def can_fetch(self, url: str, user_agent: str = '*', default: bool = True) -> bool:
+        """
+        检查robots.txt是否允许抓取该URL
+        
+        Args:
+            url: 待抓取的URL
+            user_agent: 爬虫标识
+            default: robots.txt无法获取（超时、服务器错误）时的返回值
+        
+        Returns:
+            是否允许抓取
+        """
+        entry = self.get_entry(url)
+        
+        if entry.status == RobotsEntry.OK:
+            return entry.parser.can_fetch(user_agent, url)
+        if entry.status == RobotsEntry.MISSING:
+            return True
+        if entry.status == RobotsEntry.DENIED:
+            return False
+        return default
+    
+    def crawl_delay(self, url: str, user_agent: str = '*') -> Optional[float]:
+        """获取robots.txt声明的Crawl-delay（秒）"""
+        entry = self.get_entry(url)
+        if entry.status != RobotsEntry.OK:
+            return None
+        
+        delay = entry.parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
+    
+    def get_entry(self, url: str) -> RobotsEntry:
+        """获取主机的缓存条目，过期或不存在时重新获取"""
+        origin = self.origin(url)
+        
+        entry = self._get_cached(origin)
+        if entry:
+            return entry
+        
+        # 同一主机只允许一个线程获取，其余线程等待结果
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(origin, threading.Lock())
+        
+        with fetch_lock:
+            entry = self._get_cached(origin, count_stats=False)
+            if entry:
+                return entry
+            
+            entry = self._fetch(origin)
+            self._store(origin, entry)
+        
+        with self._lock:
+            self._fetch_locks.pop(origin, None)
+        
+        return entry
+    
+    def invalidate(self, url: str = None):
+        """使指定主机或全部缓存失效"""
+        with self._lock:
+            if url is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self.origin(url), None)
+    
+    def _get_cached(self, origin: str, count_stats: bool = True) -> Optional[RobotsEntry]:
+        """读取未过期的缓存条目"""
+        with self._lock:
+            entry = self._entries.get(origin)
+            if entry and not entry.is_expired():
+                self._entries.move_to_end(origin)
+                if count_stats:
+                    self.stats['hits'] += 1
+                return entry
+            
+            if count_stats:
+                self.stats['misses'] += 1
+            return None
+    
+    def _store(self, origin: str, entry: RobotsEntry):
+        """写入缓存条目并按LRU淘汰"""
+        with self._lock:
+            self._entries[origin] = entry
+            self._entries.move_to_end(origin)
+            while len(self._entries) > self.config['max_entries']:
+                self._entries.popitem(last=False)
+    
+    def _fetch(self, origin: str) -> RobotsEntry:
+        """下载并解析robots.txt"""
+        robots_url = f"{origin}/robots.txt"
+        now = time.monotonic()
+        
+        try:
+            response = http_client.get(
+                robots_url,
+                timeout=self.config['timeout'],
+                allow_redirects=True
+            )
+        except requests.RequestException as e:
+            self.stats['fetch_errors'] += 1
+            self.logger.debug(f"获取robots.txt失败 {robots_url}: {str(e)}")
+            return RobotsEntry(RobotsEntry.ERROR, now + self.config['error_ttl'])
+        
+        # 与RobotFileParser.read保持一致的状态码处理
+        if response.status_code in (401, 403):
+            return RobotsEntry(RobotsEntry.DENIED, now + self.config['negative_ttl'])
+        if 400 <= response.status_code < 500:
+            return RobotsEntry(RobotsEntry.MISSING, now + self.config['negative_ttl'])
+        if response.status_code >= 500:
+            self.stats['fetch_errors'] += 1
+            return RobotsEntry(RobotsEntry.ERROR, now + self.config['error_ttl'])
+        
+        parser = robotparser.RobotFileParser(robots_url)
+        parser.parse(response.text.splitlines())
+        
+        # 同步Crawl-delay到礼貌访问调度器
+        politeness_scheduler.set_crawl_delay(origin, parser.crawl_delay('*'))
+        
+        return RobotsEntry(RobotsEntry.OK, now + self.config['ttl'], parser)
+
+# 创建全局robots.txt缓存实例
+robots_cache = RobotsCache(
+    ttl=Config.CRAWLER_CONFIG['ROBOTS_CACHE_TTL'],
+    negative_ttl=Config.CRAWLER_CONFIG['ROBOTS_NEGATIVE_TTL'],
+    error_ttl=Config.CRAWLER_CONFIG['ROBOTS_ERROR_TTL'],
+    max_entries=Config.CRAWLER_CONFIG['ROBOTS_CACHE_SIZE']
+)
@@ -52,6 +52,9 @@ class TaskScheduler:
             timezone='Asia/Shanghai'
         )
         
+        # 任务执行时使用的Flask应用（用于数据库访问）
+        self.app = None
+        
         # 任务状态跟踪
         self.task_status = {}
         self.task_lock = threading.Lock()
@@ -64,8 +67,16 @@ class TaskScheduler:
             'WEEKLY_REPORT': 'weekly_report'
         }
     
-    def start(self):
-        """启动调度器"""
+    def start(self, app=None):
+        """
+        启动调度器
+        
+        Args:
+            app: Flask应用，任务在其应用上下文中执行
+        """
+        if app is not None:
+            self.app = app
+        
         try:
             if not self.scheduler.running:
                 self.scheduler.start()
@@ -409,14 +420,13 @@ class TaskScheduler:
     
     def _perform_tender_monitoring(self) -> Dict[str, Any]:
         """执行实际的招投标监控逻辑"""
-        # 模拟执行结果
-        return {
-            'hospitals_scanned': 150,
-            'tenders_found': 25,
-            'new_tenders': 8,
-            'important_tenders': 2,
-            'execution_time': '00:05:30'
-        }
+        if self.app is None:
+            raise RuntimeError('调度器未绑定Flask应用，无法访问数据库')
+        
+        from app.services.tender_monitor import tender_monitor
+        
+        with self.app.app_context():
+            return tender_monitor.run()
     
     def _perform_hospital_scanning(self) -> Dict[str, Any]:
         """执行实际的医院扫描逻辑"""
@@ -476,9 +486,9 @@ class TaskScheduler:
 # 创建全局任务调度器实例
 task_scheduler = TaskScheduler()
 
-def start_scheduler():
+def start_scheduler(app=None):
     """启动调度器"""
-    task_scheduler.start()
+    task_scheduler.start(app)
 
 def stop_scheduler():
     """停止调度器"""
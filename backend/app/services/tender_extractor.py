@@ -5,6 +5,9 @@
 - 招投标栏目自动识别
 - HTML内容解析和结构化提取
 - 招投标信息字段抽取
+- 按栏目学习提取模板（列表条目选择器和条目解析方式），后续扫描只解析列表所在子树
+- 流式提取接口：找到即返回，按内容哈希流式去重
+- 列表条目详情链接和详情页正文字段提取
 - 内容去重和增量更新
 
 作者：MiniMax Agent
@@ -15,19 +18,44 @@
 import re
 import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple, Any
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup, Tag
+from itertools import chain
+from typing import List, Dict, Iterable, Iterator, Optional, Set, Tuple, Any
+from urllib.parse import urljoin, urlparse, parse_qsl, urlencode
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 import requests
 import logging
+import scipy.sparse as sp
+from config import Config
+from app.services.http_client import http_client
+from app.services.page_archive import page_archive
+from app.services.politeness_scheduler import politeness_scheduler
+from app.services.robots_cache import robots_cache
+from app.utils.dom_index import DomIndex
+from app.utils.field_extractor import field_extractor, normalize_date
+from app.utils.html_parser import make_soup
+from app.utils.keyword_matcher import KeywordMatcher
+from app.utils.similarity_matrix import TokenMatrix, jaccard_similarity
 
 class TenderExtractor:
     """招投标信息提取器"""
     
+    LIST_ITEM_TAGS = ['li', 'div', 'a']  # 列表中作为条目解析的元素
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
+        # 抓取配置
+        self.config = {
+            'timeout': Config.CRAWLER_CONFIG['REQUEST_TIMEOUT'],
+            'robots_txt_check': Config.CRAWLER_CONFIG['ROBOTS_TXT_CHECK'],
+            'max_page_bytes': Config.CRAWLER_CONFIG['MAX_PAGE_BYTES'],
+            'html_parser': Config.CRAWLER_CONFIG['HTML_PARSER'],
+            'template_min_items': 3,         # 学习模板要求的最少列表条目数
+            'template_min_link_ratio': 0.8,  # 条目中带链接的最低比例
+            'template_min_hit_ratio': 0.3,   # 条目中包含招投标关键词的最低比例
+            'detail_content_length': 5000,   # 详情页正文保留的最大字符数
+        }
+        
         # 招投标栏目识别关键词
         self.tender_keywords = [
             '招标', '采购', '中标', '投标', '竞标', '项目招标', '设备采购',
@@ -43,33 +71,6 @@ class TenderExtractor:
             r'.*?(项目|采购).*?/.*?',
         ]
         
-        # 内容提取正则表达式
-        self.content_patterns = {
-            'title': [
-                r'招标项目[:：]?\s*(.+?)(?:\r?\n|$)',
-                r'采购项目[:：]?\s*(.+?)(?:\r?\n|$)',
-                r'项目名称[:：]?\s*(.+?)(?:\r?\n|$)',
-                r'<h[1-6][^>]*>([^<]*(?:招标|采购|项目)[^<]*)</h[1-6]>',
-            ],
-            'date': [
-                r'(\d{4}[-年]\d{1,2}[-月]\d{1,2}[日]?)',
-                r'(\d{4}/\d{1,2}/\d{1,2})',
-                r'(\d{1,2}[-/\.]\d{1,2}[-/\.]\d{4})',
-                r'发布时间[:：]?\s*(\d{4}[-年]\d{1,2}[-月]\d{1,2}[日]?)',
-            ],
-            'budget': [
-                r'(\d+(?:\.\d+)?)\s*万元',
-                r'(\d+(?:\.\d+)?)\s*元',
-                r'预算[:：]?\s*(\d+(?:\.\d+)?)\s*(万元|元)',
-                r'(\d+(?:\.\d+)?)\s*万元\s*[及和至~～]\s*(\d+(?:\.\d+)?)\s*万元',
-            ],
-            'deadline': [
-                r'截止.*?[:：]?\s*(\d{4}[-年]\d{1,2}[-月]\d{1,2}[日]?)',
-                r'投标.*?[:：]?\s*(\d{4}[-年]\d{1,2}[-月]\d{1,2}[日]?)',
-                r'投标截止.*?[:：]?\s*(\d{4}[-年]\d{1,2}[-月]\d{1,2}[日]?)',
-            ]
-        }
-        
         # 内容分类关键词
         self.category_keywords = {
             'construction': ['建设', '工程', '装修', '基建', '施工'],
@@ -89,6 +90,40 @@ class TenderExtractor:
             'equipment': ['设备', '器械', '仪器'],
             'other': []
         }
+        
+        # 栏目类型关键词（按优先顺序）
+        self.section_keywords = {
+            '招标公告': ['招标', '投标'],
+            '采购公告': ['采购'],
+            '中标公示': ['中标', '结果'],
+            '更正公告': ['更正', '修改'],
+        }
+        
+        # 翻页链接文字
+        self.next_page_texts = {'下一页', '下页', '后一页', '下一頁', 'next', 'next page', '>', '>>', '›', '»'}
+        
+        # 翻页URL参数名（小写）
+        self.page_params = {'page', 'pageno', 'pagenum', 'pageindex', 'currentpage', 'curpage', 'pn', 'p'}
+        
+        # 常见CMS生成翻页的脚本调用：createPageHTML(总页数, 当前页(从0开始), "index", "html")
+        self.page_script_pattern = re.compile(
+            r'createPageHTML\(\s*(\d+)\s*,\s*(\d+)\s*,\s*["\'](\w+)["\']\s*,\s*["\'](\w+)["\']'
+        )
+        
+        # 导航菜单的class名称
+        self.menu_class_pattern = re.compile(r'nav|menu|header')
+        
+        # 可直接用于CSS选择器的id和class名称
+        self.css_identifier_pattern = re.compile(r'^-?[A-Za-z_][\w-]*$')
+        
+        # 关键词匹配器：一次扫描匹配所有关键词
+        self.tender_matcher = KeywordMatcher(self.tender_keywords)
+        self.category_matcher = KeywordMatcher.from_groups(self.category_keywords)
+        self.type_matcher = KeywordMatcher.from_groups(self.type_keywords)
+        self.section_matcher = KeywordMatcher.from_groups(self.section_keywords)
+        
+        # 字段提取引擎：一次扫描提取标题、日期、截止日期和预算
+        self.field_extractor = field_extractor
     
     def find_tender_columns(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
         """
@@ -102,9 +137,10 @@ class TenderExtractor:
             招投标栏目列表
         """
         tender_columns = []
+        index = DomIndex(soup, self.tender_matcher)
         
-        # 查找导航菜单中的招投标链接
-        nav_elements = soup.find_all(['nav', 'div', 'ul', 'ol'], class_=re.compile(r'nav|menu|header'))
+        # 查找导航菜单中的招投标链接（嵌套菜单的链接已包含在最外层菜单中）
+        nav_elements = index.outermost(soup.find_all(['nav', 'div', 'ul', 'ol'], class_=self.menu_class_pattern))
         for nav in nav_elements:
             links = nav.find_all('a', href=True)
             for link in links:
@@ -112,8 +148,7 @@ class TenderExtractor:
                 text = link.get_text(strip=True)
                 
                 # 检查链接文本和URL是否包含招投标关键词
-                if any(keyword in text or keyword in href.lower() 
-                      for keyword in self.tender_keywords):
+                if self.tender_matcher.search(text) or self.tender_matcher.search(href.lower()):
                     
                     # 构建完整URL
                     full_url = urljoin(base_url, href)
@@ -125,30 +160,25 @@ class TenderExtractor:
                         'source': 'navigation'
                     })
         
-        # 查找页面中的招投标相关内容
-        content_elements = soup.find_all(['div', 'section', 'article'])
+        # 查找页面中包含招投标关键词的内容区域，只处理最外层区域
+        content_elements = index.outermost(soup.find_all(['div', 'section', 'article']), index.hit)
         for element in content_elements:
-            # 检查元素是否包含招投标关键词
-            text = element.get_text(strip=True)
-            if any(keyword in text for keyword in self.tender_keywords):
+            # 查找该元素内的链接
+            links = element.find_all('a', href=True)
+            for link in links:
+                href = link.get('href', '')
+                link_text = link.get_text(strip=True)
                 
-                # 查找该元素内的链接
-                links = element.find_all('a', href=True)
-                for link in links:
-                    href = link.get('href', '')
-                    link_text = link.get_text(strip=True)
+                if self.tender_matcher.search(link_text) or self.tender_matcher.search(href.lower()):
                     
-                    if any(keyword in link_text or keyword in href.lower() 
-                          for keyword in self.tender_keywords):
-                        
-                        full_url = urljoin(base_url, href)
-                        
-                        tender_columns.append({
-                            'title': link_text,
-                            'url': full_url,
-                            'section': self._identify_section_type(link_text, href),
-                            'source': 'content'
-                        })
+                    full_url = urljoin(base_url, href)
+                    
+                    tender_columns.append({
+                        'title': link_text,
+                        'url': full_url,
+                        'section': self._identify_section_type(link_text, href),
+                        'source': 'content'
+                    })
         
         # 去重并返回
         unique_columns = []
@@ -161,6 +191,75 @@ class TenderExtractor:
         self.logger.info(f"找到 {len(unique_columns)} 个招投标栏目")
         return unique_columns
     
+    def fetch_response(self, url: str, headers: Dict[str, str] = None,
+                       apply_delay: bool = True) -> Optional[requests.Response]:
+        """
+        抓取页面，遵守robots.txt和同一主机的访问间隔
+        
+        Args:
+            url: 页面URL
+            headers: 额外的请求头（如条件请求头）
+            apply_delay: 是否等待主机的礼貌访问间隔（由调用方预约访问时段时为False）
+            
+        Returns:
+            响应对象（包括304），禁止抓取或请求失败时返回None
+        """
+        if self.config['robots_txt_check'] and not robots_cache.can_fetch(url):
+            self.logger.info(f"robots.txt禁止抓取: {url}")
+            return None
+        
+        if apply_delay:
+            politeness_scheduler.wait(url)
+        
+        try:
+            response = http_client.get(
+                url,
+                headers=headers,
+                timeout=self.config['timeout'],
+                stream=True,
+                allow_redirects=True
+            )
+            if response.status_code >= 400:
+                response.close()
+            response.raise_for_status()
+            
+            # 限制单个页面读取的字节数
+            http_client.read_body(response, max_bytes=self.config['max_page_bytes'])
+            page_archive.archive_response(response)
+            return response
+        except requests.RequestException as e:
+            self.logger.error(f"抓取页面失败 {url}: {str(e)}")
+            return None
+    
+    def fetch_page(self, url: str) -> Optional[str]:
+        """
+        抓取页面HTML
+        
+        Args:
+            url: 页面URL
+            
+        Returns:
+            HTML内容，禁止抓取或请求失败时返回None
+        """
+        response = self.fetch_response(url)
+        return response.text if response is not None else None
+    
+    def extract_from_url(self, url: str) -> List[Dict[str, Any]]:
+        """
+        抓取页面并提取招投标信息
+        
+        Args:
+            url: 招投标栏目或列表页URL
+            
+        Returns:
+            提取的招投标信息列表
+        """
+        html_content = self.fetch_page(url)
+        if not html_content:
+            return []
+        
+        return self.extract_tender_info(html_content, url)
+    
     def extract_tender_info(self, html_content: str, url: str) -> List[Dict[str, Any]]:
         """
         从HTML内容中提取招投标信息
@@ -172,57 +271,397 @@ class TenderExtractor:
         Returns:
             提取的招投标信息列表
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content, self.config['html_parser'])
+        return self._extract_from_soup(soup, url)
+    
+    def iter_tenders(self, html_content: str, url: str) -> Iterator[Dict[str, Any]]:
+        """
+        流式提取招投标信息
+        
+        与extract_tender_info的提取规则相同，但每解析出一条即返回，按内容哈希流式去重，
+        不等待整页提取完成，也不按发布日期排序（结果按页面中的出现顺序返回）。
+        
+        Args:
+            html_content: HTML内容
+            url: 来源URL
+            
+        Yields:
+            招投标信息字典
+        """
+        soup = make_soup(html_content, self.config['html_parser'])
+        yield from self._iter_unique(self._iter_from_soup(soup, url))
+    
+    def extract_list_page(self, html_content: str, url: str, page_number: int = 1) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        从栏目列表页提取招投标信息和下一页地址（只解析一次）
+        
+        Args:
+            html_content: HTML内容
+            url: 列表页URL
+            page_number: 当前页码（从1开始）
+            
+        Returns:
+            (招投标信息列表, 下一页URL)，没有下一页时URL为None
+        """
+        soup = make_soup(html_content, self.config['html_parser'])
+        
+        # 翻页脚本在提取前会被移除，需先查找下一页
+        next_url = self.find_next_page(soup, url, page_number)
+        return self._extract_from_soup(soup, url), next_url
+    
+    def extract_column_page(self, html_content: str, url: str, page_number: int = 1,
+                            template: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        使用提取模板解析栏目列表页，模板不再匹配时回退到完整提取并重新学习模板
+        
+        Args:
+            html_content: HTML内容
+            url: 列表页URL
+            page_number: 当前页码（从1开始）
+            template: 已学习的提取模板（见learn_template），为空时完整提取
+            
+        Returns:
+            包含tenders（招投标信息列表）、next_url（下一页URL）、template（使用或新学习的模板，
+            无法学习时为None）、template_matched（是否由模板直接提取）的字典
+        """
+        if template:
+            extracted = self._extract_with_template(html_content, url, template, page_number)
+            if extracted is not None:
+                tenders, next_url = extracted
+                return {'tenders': tenders, 'next_url': next_url, 'template': template, 'template_matched': True}
+            
+            self.logger.info(f"提取模板不再匹配，重新完整提取: {url}")
+        
+        soup = make_soup(html_content, self.config['html_parser'])
+        next_url = self.find_next_page(soup, url, page_number)
+        tenders = self._extract_from_soup(soup, url)
+        
+        return {
+            'tenders': tenders,
+            'next_url': next_url,
+            'template': self.learn_template(soup, url, tenders) if tenders else None,
+            'template_matched': False,
+        }
+    
+    def learn_template(self, soup: BeautifulSoup, url: str, tenders: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        从完整解析的列表页学习提取模板
+        
+        在同一父元素下查找标签和class相同的一组子元素（大部分条目带链接，
+        包含招投标关键词的条目最多），生成定位这组条目的CSS选择器，
+        并确定条目的解析方式（列表、表格或正文，与完整提取对应方法的条目解析相同）。
+        只有按模板提取的记录（内容哈希、来源区域、日期、详情链接）与完整提取完全一致时才使用模板。
+        
+        Args:
+            soup: 完整提取后的BeautifulSoup对象
+            url: 列表页URL
+            tenders: 完整提取的招投标信息列表
+            
+        Returns:
+            包含container_tag（选择器起始元素的标签名）、item_selector、strategy（条目解析方式）、
+            item_count的模板字典，找不到稳定的列表结构或提取结果不一致时返回None
+        """
+        index = DomIndex(soup, self.tender_matcher)
+        min_items = self.config['template_min_items']
+        
+        best = None
+        for parent in soup.find_all(['ul', 'ol', 'dl', 'tbody', 'table', 'div', 'section']):
+            if not index.hit(parent):
+                continue
+            
+            # 导航菜单中的栏目链接不是招投标列表
+            if (self.menu_class_pattern.search(' '.join(parent.get('class') or []))
+                    or parent.find_parent(['nav', 'header', 'footer']) is not None):
+                continue
+            
+            groups: Dict[Tuple[str, Tuple[str, ...]], List[Tag]] = {}
+            for child in parent.find_all(True, recursive=False):
+                groups.setdefault((child.name, tuple(child.get('class') or ())), []).append(child)
+            
+            for children in groups.values():
+                if len(children) < min_items:
+                    continue
+                
+                linked = [child for child in children if child.find('a', href=True)]
+                if len(linked) < max(min_items, len(children) * self.config['template_min_link_ratio']):
+                    continue
+                
+                hits = [child for child in linked if index.hit(child)]
+                if len(hits) < max(2, len(children) * self.config['template_min_hit_ratio']):
+                    continue
+                
+                if best is None or len(hits) > len(best[2]):
+                    best = (parent, children, hits)
+        
+        if best is None:
+            return None
+        
+        parent, children, hits = best
+        
+        # 向上查找带id或class的祖先，最多3层
+        parts = []
+        node = parent
+        while isinstance(node, Tag) and node.name != '[document]' and len(parts) < 3:
+            part = self._css_part(node)
+            parts.insert(0, part)
+            container_tag = node.name
+            if part != node.name:
+                break
+            node = node.parent
+        
+        item_selector = ' > '.join(parts + [self._css_part(children[0], use_id=False)])
+        
+        # 选择器必须恰好定位到这组条目
+        try:
+            selected = soup.select(item_selector)
+        except Exception as e:
+            self.logger.debug(f"提取模板选择器无效 {item_selector}: {str(e)}")
+            return None
+        if {id(tag) for tag in selected} != {id(child) for child in children}:
+            return None
+        
+        # 模板只解析这组条目，页面上其他位置的招投标信息或不同的条目解析结果
+        # 都会使按模板提取的记录与完整提取不一致
+        expected = {self._record_key(tender) for tender in tenders}
+        for strategy in ('list', 'table', 'content'):
+            template_tenders = self._iter_template_items(soup, children, strategy, url, index)
+            if {self._record_key(tender) for tender in template_tenders} == expected:
+                break
+        else:
+            self.logger.debug(f"按提取模板的提取结果与完整提取不一致，不使用模板: {item_selector}")
+            return None
+        
+        return {
+            'container_tag': container_tag,
+            'item_selector': item_selector,
+            'strategy': strategy,
+            'item_count': len(children),
+        }
+    
+    @staticmethod
+    def _record_key(tender: Dict[str, Any]) -> Tuple[Any, ...]:
+        """比较模板提取与完整提取结果时使用的记录字段（内容哈希已包含标题和条目文本）"""
+        return tender['content_hash'], tender['source_section'], tender['publish_date'], tender['detail_url']
+    
+    def _css_part(self, tag: Tag, use_id: bool = True) -> str:
+        """元素的CSS选择器片段：标签名加id或class"""
+        tag_id = tag.get('id')
+        if use_id and isinstance(tag_id, str) and self.css_identifier_pattern.match(tag_id):
+            return f'{tag.name}#{tag_id}'
+        
+        classes = [name for name in tag.get('class') or [] if self.css_identifier_pattern.match(name)]
+        return tag.name + ''.join(f'.{name}' for name in classes)
+    
+    def _extract_with_template(self, html_content: str, url: str, template: Dict[str, Any],
+                               page_number: int = 1) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """
+        按模板提取：只构建选择器起始元素和翻页相关元素，直接定位列表条目
+        
+        条目按模板记录的解析方式解析（与完整提取对应方法的条目解析相同），生成的内容哈希相同。
+        
+        Returns:
+            (招投标信息列表, 下一页URL)，没有条目或条目都不含招投标关键词时返回None
+        """
+        strainer = SoupStrainer([template['container_tag'], 'a', 'link', 'script'])
+        soup = make_soup(html_content, self.config['html_parser'], parse_only=strainer)
+        
+        try:
+            items = soup.select(template['item_selector'])
+        except Exception as e:
+            self.logger.warning(f"提取模板选择器无效 {template['item_selector']}: {str(e)}")
+            return None
+        
+        # 翻页脚本在提取前会被移除，需先查找下一页
+        next_url = self.find_next_page(soup, url, page_number)
         
-        # 移除脚本和样式元素
         for script in soup(["script", "style"]):
             script.decompose()
         
-        tenders = []
+        index = DomIndex(soup, self.tender_matcher)
+        if not any(index.hit(item) for item in items):
+            return None
         
-        # 方法1: 查找列表形式的招投标信息
-        list_tenders = self._extract_from_lists(soup, url)
-        tenders.extend(list_tenders)
+        unique_tenders = self._filter_and_deduplicate(
+            self._iter_template_items(soup, items, template.get('strategy') or 'list', url, index)
+        )
         
-        # 方法2: 查找表格形式的招投标信息
-        table_tenders = self._extract_from_tables(soup, url)
-        tenders.extend(table_tenders)
+        self.logger.info(f"按提取模板从 {url} 提取到 {len(unique_tenders)} 条招投标信息")
+        return unique_tenders, next_url
+    
+    def _iter_template_items(self, soup: BeautifulSoup, items: List[Tag], strategy: str, url: str,
+                             index: DomIndex) -> Iterator[Dict[str, Any]]:
+        """按模板的条目解析方式（list/table/content）从模板定位的条目中提取招投标信息"""
+        if strategy == 'table':
+            for row in items:
+                tender_info = self._parse_table_row(row, url, index)
+                if tender_info:
+                    yield tender_info
+        elif strategy == 'content':
+            for item in items:
+                yield from self._parse_content_block(item, url)
+        else:
+            # 与列表提取一致：条目本身和条目内各层的条目元素都要解析
+            elements = []
+            for item in items:
+                if item.name in self.LIST_ITEM_TAGS:
+                    elements.append(item)
+                elements.extend(item.find_all(self.LIST_ITEM_TAGS))
+            wrappers = self._list_wrappers(self._list_candidates(soup, index), index)
+            yield from self._parse_list_items(elements, url, index, wrappers)
+    
+    def find_next_page(self, soup: BeautifulSoup, url: str, page_number: int = 1) -> Optional[str]:
+        """
+        查找列表页的下一页地址
         
-        # 方法3: 查找页面正文中的招投标信息
-        content_tenders = self._extract_from_content(soup, url)
-        tenders.extend(content_tenders)
+        依次检查：rel="next"链接、“下一页”等链接文字、CMS翻页脚本、
+        页码为下一页的数字链接、当前URL中的页码参数。
+        
+        Args:
+            soup: BeautifulSoup解析的HTML对象
+            url: 当前页URL
+            page_number: 当前页码（从1开始）
+            
+        Returns:
+            下一页URL，不在同一网站或找不到时返回None
+        """
+        candidates = []
+        
+        rel_next = soup.find(['a', 'link'], rel='next', href=True)
+        if rel_next:
+            candidates.append(rel_next['href'])
+        
+        next_number = str(page_number + 1)
+        number_links = []
+        for link in soup.find_all('a', href=True):
+            text = link.get_text(strip=True).lower()
+            if text in self.next_page_texts:
+                candidates.append(link['href'])
+            elif text == next_number:
+                number_links.append(link['href'])
+        
+        for script in soup.find_all('script'):
+            match = self.page_script_pattern.search(script.string or '')
+            if match:
+                total, current, name, ext = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+                if current + 1 < total:
+                    candidates.append(f'{name}_{current + 1}.{ext}')
+                break
+        
+        candidates.extend(number_links)
+        candidates.append(self._increment_page_param(url))
+        
+        host = urlparse(url).netloc
+        for href in candidates:
+            if not href or href.startswith(('javascript:', '#', 'mailto:')):
+                continue
+            
+            next_url = urljoin(url, href)
+            if next_url != url and urlparse(next_url).netloc == host:
+                return next_url
+        
+        return None
+    
+    def _increment_page_param(self, url: str) -> Optional[str]:
+        """当前URL带有页码参数时，返回页码加1的URL"""
+        parsed = urlparse(url)
+        params = parse_qsl(parsed.query, keep_blank_values=True)
+        
+        for i, (key, value) in enumerate(params):
+            if key.lower() in self.page_params and value.isdigit():
+                params[i] = (key, str(int(value) + 1))
+                return parsed._replace(query=urlencode(params)).geturl()
         
+        return None
+    
+    def _extract_from_soup(self, soup: BeautifulSoup, url: str) -> List[Dict[str, Any]]:
+        """从解析后的页面提取招投标信息（会移除页面中的脚本和样式）"""
         # 去重和过滤
-        unique_tenders = self._filter_and_deduplicate(tenders)
+        unique_tenders = self._filter_and_deduplicate(self._iter_from_soup(soup, url))
         
         self.logger.info(f"从 {url} 提取到 {len(unique_tenders)} 条招投标信息")
         return unique_tenders
     
-    def _extract_from_lists(self, soup: BeautifulSoup, url: str) -> List[Dict[str, Any]]:
+    def _iter_from_soup(self, soup: BeautifulSoup, url: str) -> Iterator[Dict[str, Any]]:
+        """依次使用各提取方法从解析后的页面提取招投标信息（未去重，会移除页面中的脚本和样式）"""
+        # 移除脚本和样式元素
+        for script in soup(["script", "style"]):
+            script.decompose()
+        
+        # 一次遍历计算所有元素的关键词命中情况，供各提取方法共用
+        index = DomIndex(soup, self.tender_matcher)
+        
+        # 方法1: 查找列表形式的招投标信息
+        # 方法2: 查找表格形式的招投标信息
+        # 方法3: 查找页面正文中的招投标信息
+        yield from chain(
+            self._iter_from_lists(soup, url, index),
+            self._iter_from_tables(soup, url, index),
+            self._iter_from_content(soup, url, index),
+        )
+    
+    def _extract_from_lists(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> List[Dict[str, Any]]:
         """从列表中提取招投标信息"""
-        tenders = []
+        return list(self._iter_from_lists(soup, url, index))
+    
+    def _iter_from_lists(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> Iterator[Dict[str, Any]]:
+        """从列表中流式提取招投标信息（每个列表批量解析后返回）"""
+        if index is None:
+            index = DomIndex(soup, self.tender_matcher)
         
-        # 查找可能的招投标列表
-        list_containers = soup.find_all(['ul', 'ol', 'div'], class_=re.compile(r'list|item|news|tender|bid'))
+        # 查找可能的招投标列表（嵌套列表的条目已包含在最外层列表中）
+        candidates = self._list_candidates(soup, index)
+        list_containers = index.outermost(candidates)
+        wrappers = self._list_wrappers(candidates, index)
         
         for container in list_containers:
-            items = container.find_all(['li', 'div', 'a'])
-            
-            for item in items:
-                text = item.get_text(strip=True)
-                
-                # 检查是否包含招投标关键词
-                if any(keyword in text for keyword in self.tender_keywords):
-                    tender_info = self._parse_tender_text(text, url)
-                    if tender_info:
-                        tender_info['source_section'] = 'list'
-                        tenders.append(tender_info)
+            yield from self._parse_list_items(container.find_all(self.LIST_ITEM_TAGS), url, index, wrappers)
+    
+    def _list_candidates(self, soup: BeautifulSoup, index: DomIndex) -> List[Tag]:
+        """包含招投标关键词的候选列表元素"""
+        return [
+            container for container in soup.find_all(['ul', 'ol', 'div'], class_=re.compile(r'list|item|news|tender|bid'))
+            if index.hit(container)
+        ]
+    
+    def _list_wrappers(self, candidates: List[Tag], index: DomIndex) -> Set[int]:
+        """
+        包裹其他列表的元素（id集合）
         
-        return tenders
+        这些元素不是列表条目，跳过以免重复生成整段子列表的文本；
+        只包含单个条目的元素（如条目内的div.item-title）不算列表，外层条目照常解析
+        """
+        return index.ancestors(
+            container for container in candidates if self._is_item_list(container, index)
+        )
+    
+    def _parse_list_items(self, items: List[Tag], url: str, index: DomIndex,
+                          wrappers: Set[int]) -> Iterator[Dict[str, Any]]:
+        """解析列表条目（同一列表的条目一次批量解析）"""
+        # 检查是否包含招投标关键词，不包含的条目无需生成文本
+        matched_items = [item for item in items if index.hit(item) and id(item) not in wrappers]
+        texts = [item.get_text(strip=True) for item in matched_items]
+        
+        for item, tender_info in zip(matched_items, self._parse_tender_texts(texts, url)):
+            if tender_info:
+                tender_info['source_section'] = 'list'
+                link = item if item.name == 'a' else item.find('a', href=True)
+                tender_info['detail_url'] = self._detail_url(link, url)
+                yield tender_info
     
-    def _extract_from_tables(self, soup: BeautifulSoup, url: str) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _is_item_list(container: Tag, index: DomIndex) -> bool:
+        """元素是否为条目列表：至少两个子元素是包含招投标关键词的条目"""
+        items = container.find_all(['li', 'div', 'a'], recursive=False)
+        return sum(1 for item in items if index.hit(item)) >= 2
+    
+    def _extract_from_tables(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> List[Dict[str, Any]]:
         """从表格中提取招投标信息"""
-        tenders = []
+        return list(self._iter_from_tables(soup, url, index))
+    
+    def _iter_from_tables(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> Iterator[Dict[str, Any]]:
+        """从表格中流式提取招投标信息（逐行返回）"""
+        if index is None:
+            index = DomIndex(soup, self.tender_matcher)
         
         tables = soup.find_all('table')
         
@@ -230,60 +669,116 @@ class TenderExtractor:
             rows = table.find_all('tr')
             
             for row in rows:
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 2:
-                    # 提取第一列的标题和可能的链接
-                    first_cell = cells[0]
-                    title_text = first_cell.get_text(strip=True)
-                    
-                    # 检查是否包含招投标关键词
-                    if any(keyword in title_text for keyword in self.tender_keywords):
-                        tender_info = self._parse_tender_text(title_text, url)
-                        if tender_info:
-                            tender_info['source_section'] = 'table'
-                            
-                            # 尝试提取其他字段
-                            for i, cell in enumerate(cells[1:], 1):
-                                cell_text = cell.get_text(strip=True)
-                                
-                                # 提取日期
-                                if re.search(r'\d{4}[-年]\d{1,2}[-月]\d{1,2}', cell_text):
-                                    tender_info['publish_date'] = self._extract_date(cell_text)
-                                
-                                # 提取预算
-                                if re.search(r'\d+(?:\.\d+)?\s*万元', cell_text):
-                                    budget_match = re.search(r'(\d+(?:\.\d+)?)\s*万元', cell_text)
-                                    if budget_match:
-                                        tender_info['budget_amount'] = float(budget_match.group(1))
-                                        tender_info['budget_currency'] = 'CNY'
-                            
-                            tenders.append(tender_info)
-        
-        return tenders
-    
-    def _extract_from_content(self, soup: BeautifulSoup, url: str) -> List[Dict[str, Any]]:
-        """从页面正文中提取招投标信息"""
-        tenders = []
+                tender_info = self._parse_table_row(row, url, index)
+                if tender_info:
+                    yield tender_info
+    
+    def _parse_table_row(self, row: Tag, url: str, index: DomIndex) -> Optional[Dict[str, Any]]:
+        """解析表格行：第一列为标题，其他列提取日期和预算"""
+        cells = row.find_all(['td', 'th'])
+        if len(cells) < 2:
+            return None
         
-        # 查找可能包含招投标信息的段落
-        content_divs = soup.find_all(['div', 'p', 'span'], class_=re.compile(r'content|article|news|item'))
+        # 提取第一列的标题和可能的链接
+        first_cell = cells[0]
         
-        for div in content_divs:
-            text = div.get_text(strip=True)
+        # 检查是否包含招投标关键词
+        if not index.hit(first_cell):
+            return None
+        
+        title_text = first_cell.get_text(strip=True)
+        tender_info = self._parse_tender_text(title_text, url)
+        if not tender_info:
+            return None
+        
+        tender_info['source_section'] = 'table'
+        tender_info['detail_url'] = self._detail_url(row.find('a', href=True), url)
+        
+        # 尝试从其他列提取日期和预算
+        cell_texts = [cell.get_text(strip=True) for cell in cells[1:]]
+        for fields in self.field_extractor.extract_many(cell_texts):
+            if fields['publish_date']:
+                tender_info['publish_date'] = fields['publish_date']
             
-            # 检查是否包含招投标关键词
-            if any(keyword in text for keyword in self.tender_keywords):
-                # 尝试提取多个招投标信息
-                sentences = re.split(r'[。！？\n]', text)
-                
-                for sentence in sentences:
-                    if any(keyword in sentence for keyword in self.tender_keywords):
-                        tender_info = self._parse_tender_text(sentence, url)
-                        if tender_info:
-                            tender_info['source_section'] = 'content'
-                            tenders.append(tender_info)
+            if fields['budget_unit'] == '万元':
+                tender_info['budget_amount'] = fields['budget_amount']
+                tender_info['budget_currency'] = 'CNY'
+        
+        return tender_info
+    
+    def _extract_from_content(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> List[Dict[str, Any]]:
+        """从页面正文中提取招投标信息"""
+        return list(self._iter_from_content(soup, url, index))
+    
+    def _iter_from_content(self, soup: BeautifulSoup, url: str, index: DomIndex = None) -> Iterator[Dict[str, Any]]:
+        """从页面正文中流式提取招投标信息（每个段落批量解析后返回）"""
+        if index is None:
+            index = DomIndex(soup, self.tender_matcher)
+        
+        # 查找包含招投标关键词的段落，嵌套段落只处理最外层
+        content_divs = index.outermost(
+            soup.find_all(['div', 'p', 'span'], class_=re.compile(r'content|article|news|item')),
+            index.hit
+        )
         
-        return tenders
+        for div in content_divs:
+            yield from self._parse_content_block(div, url)
+    
+    def _parse_content_block(self, div: Tag, url: str) -> Iterator[Dict[str, Any]]:
+        """按句子解析正文段落中的多个招投标信息"""
+        text = div.get_text(strip=True)
+        
+        # 尝试提取多个招投标信息
+        sentences = [
+            sentence for sentence in re.split(r'[。！？\n]', text)
+            if self.tender_matcher.search(sentence)
+        ]
+        
+        for tender_info in self._parse_tender_texts(sentences, url):
+            if tender_info:
+                tender_info['source_section'] = 'content'
+                yield tender_info
+    
+    def _detail_url(self, link: Optional[Tag], url: str) -> Optional[str]:
+        """条目链接转换为详情页URL（脚本、锚点、邮件链接和指向列表页自身的链接返回None）"""
+        href = (link.get('href') or '').strip() if link is not None else ''
+        if not href or href.startswith(('javascript:', '#', 'mailto:')):
+            return None
+        
+        detail_url = urljoin(url, href)
+        if urlparse(detail_url).scheme not in ('http', 'https') or detail_url == url:
+            return None
+        return detail_url
+    
+    def extract_detail(self, html_content: str, url: str) -> Dict[str, Any]:
+        """
+        从详情页提取公告正文和字段
+        
+        Args:
+            html_content: 详情页HTML内容
+            url: 详情页URL
+            
+        Returns:
+            包含content（正文）、publish_date、deadline_date、budget_amount的字典，未找到的字段为None
+        """
+        soup = make_soup(html_content, self.config['html_parser'])
+        for element in soup(["script", "style", "header", "nav", "footer"]):
+            element.decompose()
+        
+        # 正文区域：文本最长的文章/内容元素，找不到时使用整个页面
+        index = DomIndex(soup, self.tender_matcher)
+        candidates = soup.find_all(['div', 'article', 'section', 'td'], class_=re.compile(r'article|content|detail|main|text'))
+        main = max(candidates, key=index.text_length, default=None) or soup.body or soup
+        
+        text = main.get_text('\n', strip=True)
+        fields = self.field_extractor.extract(text)
+        
+        return {
+            'content': text[:self.config['detail_content_length']],
+            'publish_date': fields['publish_date'],
+            'deadline_date': fields['deadline_date'],
+            'budget_amount': fields['budget_amount'],
+        }
     
     def _parse_tender_text(self, text: str, url: str) -> Optional[Dict[str, Any]]:
         """
@@ -296,143 +791,63 @@ class TenderExtractor:
         Returns:
             解析后的招投标信息字典
         """
-        tender_info = {
-            'title': '',
-            'content': text[:200],  # 简化的内容摘要
-            'source_url': url,
-            'publish_date': None,
-            'deadline_date': None,
-            'budget_amount': None,
-            'budget_currency': 'CNY',
-            'tender_type': 'other',
-            'tender_category': 'other',
-            'content_hash': '',
-            'html_hash': '',
-            'crawl_method': 'auto'
-        }
-        
-        # 提取标题
-        for pattern in self.content_patterns['title']:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                tender_info['title'] = match.group(1).strip()
-                break
-        
-        # 如果没有提取到标题，使用前50个字符作为标题
-        if not tender_info['title']:
-            tender_info['title'] = text[:50].strip()
-        
-        # 提取发布日期
-        for pattern in self.content_patterns['date']:
-            match = re.search(pattern, text)
-            if match:
-                tender_info['publish_date'] = self._extract_date(match.group(1))
-                break
-        
-        # 提取截止日期
-        for pattern in self.content_patterns['deadline']:
-            match = re.search(pattern, text)
-            if match:
-                tender_info['deadline_date'] = self._extract_date(match.group(1))
-                break
-        
-        # 提取预算信息
-        for pattern in self.content_patterns['budget']:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    amount = float(match.group(1))
-                    tender_info['budget_amount'] = amount
-                    tender_info['budget_currency'] = 'CNY'
-                    break
-                except ValueError:
-                    continue
-        
-        # 确定招标类型
-        tender_info['tender_type'] = self._determine_tender_type(text)
-        
-        # 确定招标分类
-        tender_info['tender_category'] = self._determine_tender_category(text)
+        return self._parse_tender_texts([text], url)[0]
+    
+    def _parse_tender_texts(self, texts: List[str], url: str) -> List[Optional[Dict[str, Any]]]:
+        """
+        批量解析招投标文本信息
         
-        # 生成内容哈希
-        content_data = f"{tender_info['title']}|{tender_info['publish_date']}|{text[:500]}"
-        tender_info['content_hash'] = hashlib.sha256(content_data.encode()).hexdigest()
+        Args:
+            texts: 文本内容列表
+            url: 来源URL
+            
+        Returns:
+            与输入顺序一致的招投标信息字典列表，无法解析的文本对应None
+        """
+        results = []
+        for text, fields in zip(texts, self.field_extractor.extract_many(texts)):
+            tender_info = {
+                'title': fields['title'] or text[:50].strip(),  # 没有提取到标题时使用前50个字符
+                'content': text[:200],  # 简化的内容摘要
+                'source_url': url,
+                'publish_date': fields['publish_date'],
+                'deadline_date': fields['deadline_date'],
+                'budget_amount': fields['budget_amount'],
+                'budget_currency': 'CNY',
+                'tender_type': self._determine_tender_type(text),
+                'tender_category': self._determine_tender_category(text),
+                'content_hash': '',
+                'html_hash': '',
+                'crawl_method': 'auto'
+            }
+            
+            # 生成内容哈希
+            content_data = f"{tender_info['title']}|{tender_info['publish_date']}|{text[:500]}"
+            tender_info['content_hash'] = hashlib.sha256(content_data.encode()).hexdigest()
+            
+            results.append(tender_info if tender_info['title'] else None)
         
-        return tender_info if tender_info['title'] else None
+        return results
     
     def _extract_date(self, date_str: str) -> Optional[str]:
         """提取并标准化日期"""
-        try:
-            # 匹配各种日期格式
-            date_patterns = [
-                r'(\d{4})[-年](\d{1,2})[-月](\d{1,2})[日]?',
-                r'(\d{4})/(\d{1,2})/(\d{1,2})',
-                r'(\d{1,2})[-/\.](\d{1,2})[-/\.](\d{4})',
-            ]
-            
-            for pattern in date_patterns:
-                match = re.search(pattern, date_str)
-                if match:
-                    if len(match.groups()) == 3:
-                        year, month, day = match.groups()
-                        if len(year) == 4:  # YYYY-MM-DD 格式
-                            date_obj = datetime(int(year), int(month), int(day))
-                        else:  # MM-DD-YYYY 格式
-                            date_obj = datetime(int(year), int(month), int(day))
-                        
-                        return date_obj.strftime('%Y-%m-%d')
-            
-            return None
-            
-        except (ValueError, TypeError):
-            return None
+        return normalize_date(date_str)
     
     def _determine_tender_type(self, text: str) -> str:
         """确定招投标类型"""
-        text_lower = text.lower()
-        
-        for tender_type, keywords in self.type_keywords.items():
-            if any(keyword in text or keyword in text_lower for keyword in keywords):
-                return tender_type
-        
-        return 'other'
+        return self.type_matcher.first_group(text, text.lower(), default='other')
     
     def _determine_tender_category(self, text: str) -> str:
         """确定招投标分类"""
-        text_lower = text.lower()
-        
-        for category, keywords in self.category_keywords.items():
-            if any(keyword in text or keyword in text_lower for keyword in keywords):
-                return category
-        
-        return 'other'
+        return self.category_matcher.first_group(text, text.lower(), default='other')
     
     def _identify_section_type(self, title: str, url: str) -> str:
         """识别栏目类型"""
-        title_lower = title.lower()
-        
-        if any(keyword in title_lower for keyword in ['招标', '投标']):
-            return '招标公告'
-        elif any(keyword in title_lower for keyword in ['采购']):
-            return '采购公告'
-        elif any(keyword in title_lower for keyword in ['中标', '结果']):
-            return '中标公示'
-        elif any(keyword in title_lower for keyword in ['更正', '修改']):
-            return '更正公告'
-        else:
-            return '其他'
+        return self.section_matcher.first_group(title.lower(), default='其他')
     
-    def _filter_and_deduplicate(self, tenders: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _filter_and_deduplicate(self, tenders: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """过滤和去重招投标信息"""
-        unique_tenders = []
-        seen_hashes = set()
-        
-        for tender in tenders:
-            content_hash = tender.get('content_hash', '')
-            
-            if content_hash and content_hash not in seen_hashes:
-                seen_hashes.add(content_hash)
-                unique_tenders.append(tender)
+        unique_tenders = list(self._iter_unique(tenders))
         
         # 按发布日期排序（最新的在前）
         unique_tenders.sort(
@@ -442,6 +857,17 @@ class TenderExtractor:
         
         return unique_tenders
     
+    @staticmethod
+    def _iter_unique(tenders: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """按内容哈希流式去重（保留第一次出现的记录，只保存哈希）"""
+        seen_hashes = set()
+        for tender in tenders:
+            content_hash = tender.get('content_hash', '')
+            
+            if content_hash and content_hash not in seen_hashes:
+                seen_hashes.add(content_hash)
+                yield tender
+    
     def calculate_content_similarity(self, content1: str, content2: str) -> float:
         """
         计算两个内容之间的相似度
@@ -464,6 +890,24 @@ class TenderExtractor:
         union = words1.union(words2)
         
         return len(intersection) / len(union) if union else 0.0
+    
+    def calculate_similarity_matrix(self, contents: List[str], min_similarity: float = 0.0,
+                                    top_k: int = None) -> sp.csr_matrix:
+        """
+        批量计算内容两两之间的相似度（与calculate_content_similarity相同的关键词重合度）
+        
+        所有内容的关键词一次构建为稀疏矩阵，用矩阵乘法计算交集大小，不逐对比较。
+        
+        Args:
+            contents: 内容列表
+            min_similarity: 只保留不低于该值的相似度
+            top_k: 每条内容最多保留的相似内容数，None表示不限制
+            
+        Returns:
+            内容数×内容数的稀疏矩阵，对角线和没有共同关键词的内容对为0
+        """
+        matrix = TokenMatrix(set(re.findall(r'\w+', (content or '').lower())) for content in contents)
+        return jaccard_similarity(matrix, min_similarity=min_similarity, top_k=top_k)
 
 # 创建全局招投标提取器实例
 tender_extractor = TenderExtractor()
\ No newline at end of file
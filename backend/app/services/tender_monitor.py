@@ -0,0 +1,687 @@
+"""
+招投标监控服务
+
+定期扫描医院官网的招投标栏目并入库，包括：
+- 栏目登记表：发现的招投标栏目持久化，扫描时直接抓取栏目页，
+  仅在超过重新发现间隔、没有可用栏目或栏目连续失败时重新从医院首页发现
+- 按栏目学习提取模板，模板匹配时只解析列表所在子树，不再匹配时完整提取并重新学习
+- 使用条件请求抓取栏目页，未变更页面跳过提取
+- 页面指纹（规范化HTML哈希）未变化时跳过解析、提取和去重
+- 多线程同时扫描多家医院，页面解析在多进程池中执行
+- 新公告抓取详情页补全预算、截止日期和正文（已入库的公告不再抓取）
+- 栏目翻页抓取，遇到全部为已入库公告的列表页即停止
+- 招投标信息提取、去重和入库
+- 扫描统计与扫描历史记录
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Set
+
+from flask import current_app
+
+from app import db
+from app.models import Hospital, TenderRecord, ScanHistory, TenderColumn, ExtractionTemplate
+from app.services.content_deduplicator import content_deduplicator
+from app.services.content_hash_index import content_hash_index
+from app.services.detail_fetcher import detail_fetcher
+from app.services.near_duplicate_index import near_duplicate_index
+from app.services.page_state_store import page_state_store
+from app.services.parse_pool import parse_pool, declared_charset
+from app.services.tender_extractor import tender_extractor
+from app.utils.html_parser import make_soup
+from config import Config
+
+class TenderMonitor:
+    """招投标监控服务"""
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        
+        self.config = {
+            'max_columns_per_hospital': 10,  # 每个医院最多扫描的栏目数
+            'max_pages_per_column': 50,      # 每个栏目最多翻页数
+            'concurrency': Config.CRAWLER_CONFIG['MONITOR_CONCURRENCY'],  # 同时扫描的医院数
+            'conditional_fetch': True,        # 是否使用条件请求
+            'fetch_details': Config.CRAWLER_CONFIG['DETAIL_FETCH_ENABLED'],  # 是否抓取新公告的详情页
+            'link_near_duplicates': True,     # 是否将新公告关联到已入库的近似重复公告
+            'template_max_misses': 3,         # 提取模板连续未命中（且无法重新学习）多少次后停用
+            'column_max_failures': 3,         # 栏目连续失败多少次后重新发现栏目
+            'column_discovery_interval': Config.SCHEDULER_CONFIG['COLUMN_DISCOVERY_INTERVAL'],  # 重新发现栏目的间隔（小时）
+            'store_batch_size': 200,          # 入库时每批处理的招投标数
+        }
+    
+    def run(self, hospital_ids: List[int] = None) -> Dict[str, Any]:
+        """
+        执行一次招投标监控
+        
+        Args:
+            hospital_ids: 需要扫描的医院ID列表，默认扫描所有有官网的在用医院
+        
+        Returns:
+            扫描统计信息
+        """
+        start_time = datetime.utcnow()
+        started = time.monotonic()
+        stats = self._new_stats()
+        
+        query = Hospital.query.filter(
+            Hospital.website_url.isnot(None),
+            Hospital.status == 'active'
+        )
+        if hospital_ids:
+            query = query.filter(Hospital.id.in_(hospital_ids))
+        
+        hospital_ids = [hospital.id for hospital in query.all()]
+        
+        # 为尚无签名的历史记录补建近似重复签名
+        if self.config['link_near_duplicates']:
+            near_duplicate_index.rebuild()
+        
+        self._monitor_concurrently(hospital_ids, stats)
+        
+        # 保存内容哈希过滤器，下次启动时只需同步此后入库的记录
+        content_hash_index.save()
+        
+        duration = time.monotonic() - started
+        stats['execution_time'] = time.strftime('%H:%M:%S', time.gmtime(duration))
+        
+        self._record_scan_history(start_time, duration, stats)
+        
+        self.logger.info(f"招投标监控完成: 医院={stats['hospitals_scanned']}, "
+                         f"页面={stats['pages_fetched']}, "
+                         f"未变更={stats['pages_not_modified'] + stats['pages_unchanged']}, "
+                         f"指纹未变更={stats['pages_html_unchanged']}(节省{stats['extract_ms_saved']}ms), "
+                         f"模板命中={stats['templates_matched']}, "
+                         f"新增={stats['new_tenders']}, "
+                         f"近似重复={stats['near_duplicates_linked']}")
+        return stats
+    
+    def _monitor_concurrently(self, hospital_ids: List[int], stats: Dict[str, Any]):
+        """
+        多线程扫描医院，每个线程使用独立的应用上下文和数据库会话
+        
+        Args:
+            hospital_ids: 医院ID列表
+            stats: 累计的扫描统计
+        """
+        concurrency = max(1, min(self.config['concurrency'], len(hospital_ids)))
+        if concurrency == 1:
+            for hospital_id in hospital_ids:
+                self._monitor_hospital_id(hospital_id, stats)
+            return
+        
+        app = current_app._get_current_object()
+        stats_lock = threading.Lock()
+        
+        def worker(hospital_id: int):
+            with app.app_context():
+                hospital_stats = self._monitor_hospital_id(hospital_id)
+            
+            with stats_lock:
+                for key, value in hospital_stats.items():
+                    if isinstance(value, int):
+                        stats[key] += value
+        
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='tender-monitor') as executor:
+            for future in [executor.submit(worker, hospital_id) for hospital_id in hospital_ids]:
+                future.result()
+    
+    def _monitor_hospital_id(self, hospital_id: int, stats: Dict[str, Any] = None) -> Dict[str, Any]:
+        """按ID扫描医院：扫描期间已删除的医院跳过，意外错误只计为该医院扫描失败，不中断其他医院"""
+        if stats is None:
+            stats = self._new_stats()
+        
+        try:
+            hospital = db.session.get(Hospital, hospital_id)
+            if hospital is None:
+                self.logger.info(f"医院已删除，跳过扫描: {hospital_id}")
+                return stats
+            
+            self.monitor_hospital(hospital, stats)
+        except Exception as e:
+            db.session.rollback()
+            stats['hospitals_failed'] += 1
+            self.logger.error(f"扫描医院失败 {hospital_id}: {str(e)}")
+        
+        return stats
+    
+    def monitor_hospital(self, hospital: Hospital, stats: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        扫描单个医院的招投标栏目
+        
+        Args:
+            hospital: 医院对象
+            stats: 累计的扫描统计，为空时新建
+        
+        Returns:
+            扫描统计信息
+        """
+        if stats is None:
+            stats = self._new_stats()
+        
+        stats['hospitals_scanned'] += 1
+        hospital_name = hospital.name  # 回滚后再访问属性会重新查询，医院已删除时会出错
+        
+        try:
+            hospital.last_scan_time = datetime.utcnow()
+            db.session.commit()
+            
+            columns = self._load_columns(hospital, stats)
+            if columns is None:
+                stats['hospitals_failed'] += 1
+                hospital.scan_failed_count = (hospital.scan_failed_count or 0) + 1
+                db.session.commit()
+                return stats
+            
+            templates = {
+                template.column_url: template
+                for template in ExtractionTemplate.query.filter_by(hospital_id=hospital.id).all()
+            }
+            
+            new_count = 0
+            for column in columns[:self.config['max_columns_per_hospital']]:
+                new_count += self.scan_column(hospital, column.url, stats, column.section,
+                                              templates.get(column.url), column)
+            
+            hospital.tender_count = (hospital.tender_count or 0) + new_count
+            hospital.last_success_scan_time = datetime.utcnow()
+            hospital.scan_success_count = (hospital.scan_success_count or 0) + 1
+            db.session.commit()
+        
+        except Exception as e:
+            db.session.rollback()
+            stats['hospitals_failed'] += 1
+            self.logger.error(f"扫描医院失败 {hospital_name}: {str(e)}")
+        
+        return stats
+    
+    def scan_column(self, hospital: Hospital, url: str, stats: Dict[str, Any],
+                    section: str = None, template: ExtractionTemplate = None,
+                    column: TenderColumn = None) -> int:
+        """
+        按翻页顺序扫描招投标栏目
+        
+        列表页按发布时间倒序排列，遇到以下情况即停止翻页：
+        页面未变更（含页面指纹未变化）、页面没有招投标信息、页面中的公告全部已入库、没有下一页。
+        增量扫描通常只需抓取前一两页。所有列表页使用同一个栏目提取模板。
+        
+        Args:
+            hospital: 医院对象
+            url: 栏目首页URL
+            stats: 扫描统计
+            section: 栏目类型
+            template: 栏目的提取模板，为空时完整提取并学习模板
+            column: 栏目登记记录，根据本次扫描结果更新成功/失败统计
+        
+        Returns:
+            新增记录数
+        """
+        new_count = 0
+        visited = set()
+        page_url = url
+        first_result = None
+        
+        for page_number in range(1, self.config['max_pages_per_column'] + 1):
+            visited.add(page_url)
+            
+            template_data = template.to_template() if template is not None and template.is_active else None
+            result = self._scan_list_page(hospital, page_url, stats, section, page_number, template_data)
+            new_count += result['new_count']
+            if first_result is None:
+                first_result = result
+            
+            if result['parsed']:
+                template = self._update_template(hospital, url, section, template, result, stats)
+            
+            if result['all_known']:
+                stats['columns_stopped_known'] += 1
+            
+            next_url = result['next_url']
+            if result['stop'] or not next_url or next_url in visited:
+                break
+            
+            stats['pages_paginated'] += 1
+            page_url = next_url
+        
+        if column is not None:
+            self._record_column_result(column, first_result, new_count, stats)
+        
+        return new_count
+    
+    def scan_page(self, hospital: Hospital, url: str, stats: Dict[str, Any],
+                  section: str = None) -> int:
+        """
+        扫描单个招投标栏目页并入库新记录（不翻页）
+        
+        Args:
+            hospital: 医院对象
+            url: 栏目页URL
+            stats: 扫描统计
+            section: 栏目类型
+        
+        Returns:
+            新增记录数
+        """
+        return self._scan_list_page(hospital, url, stats, section)['new_count']
+    
+    def _scan_list_page(self, hospital: Hospital, url: str, stats: Dict[str, Any], section: str = None,
+                        page_number: int = 1, template: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        抓取并处理一个列表页
+        
+        Returns:
+            包含new_count（新增记录数）、next_url（下一页）、all_known（公告全部已入库）、
+            stop（是否停止翻页）、failed（抓取失败）、parsed（是否解析了页面）、tenders_count（提取条数）、
+            template（使用或新学习的提取模板）、template_matched（是否由模板直接提取）的字典
+        """
+        result = {
+            'new_count': 0, 'next_url': None, 'all_known': False, 'stop': True,
+            'failed': False, 'parsed': False, 'tenders_count': 0, 'template': None, 'template_matched': False,
+        }
+        
+        headers = page_state_store.get_conditional_headers(url) if self.config['conditional_fetch'] else {}
+        
+        response = tender_extractor.fetch_response(url, headers=headers)
+        if response is None:
+            stats['pages_failed'] += 1
+            result['failed'] = True
+            return result
+        
+        stats['pages_fetched'] += 1
+        
+        # 304：页面未变更，跳过提取
+        if response.status_code == 304:
+            stats['pages_not_modified'] += 1
+            page_state_store.record_not_modified(url)
+            db.session.commit()
+            return result
+        
+        # 服务器未支持条件请求时比较响应体哈希；响应体变化但去除模板、时间戳和计数器后
+        # 相同时，同样跳过解析、提取和去重
+        encoding = declared_charset(response.headers.get('Content-Type'))
+        body_hash = page_state_store.compute_body_hash(response.content)
+        html_hash = page_state_store.compute_html_hash(response.content, encoding)
+        previous = page_state_store.compare(url, body_hash, html_hash)
+        if not previous['body_changed'] or not previous['html_changed']:
+            page_state_store.record_response(url, response, body_hash)
+            if previous['body_changed']:
+                page_state_store.record_html_hash(url, html_hash)
+                stats['pages_html_unchanged'] += 1
+                stats['extract_ms_saved'] += previous['extract_ms'] or 0
+            else:
+                stats['pages_unchanged'] += 1
+            db.session.commit()
+            return result
+        
+        # 解析完成前不写数据库，避免多线程扫描时长时间持有写锁
+        extract_started = time.perf_counter()
+        
+        # 解析在进程池中执行，当前线程等待结果时不占用GIL
+        extracted = parse_pool.extract_column_page(
+            response.content, encoding, url, page_number, template
+        )
+        tenders = extracted['tenders']
+        result['next_url'] = extracted['next_url']
+        result['parsed'] = True
+        result['tenders_count'] = len(tenders)
+        result['template'] = extracted['template']
+        result['template_matched'] = extracted['template_matched']
+        stats['tenders_found'] += len(tenders)
+        for tender in tenders:
+            tender['html_hash'] = html_hash
+        
+        # 页面中的公告全部已入库时，后面的页面只会更旧，无需继续翻页
+        hashes = [t['content_hash'] for t in tenders if t.get('content_hash')]
+        existing_hashes = self._existing_hashes(hashes)
+        result['all_known'] = bool(hashes) and all(h in existing_hashes for h in hashes)
+        
+        # 记录本页解析、提取和去重的耗时，页面指纹未变化时据此统计节省的耗时
+        extract_ms = int((time.perf_counter() - extract_started) * 1000)
+        
+        # 只为新公告抓取详情页（在写数据库之前完成；先结束读事务，抓取期间不持有数据库锁）
+        if self.config['fetch_details'] and not result['all_known']:
+            db.session.commit()
+            new_tenders = [t for t in tenders if t.get('content_hash') not in existing_hashes]
+            detail_counts = detail_fetcher.enrich(new_tenders)
+            stats['details_fetched'] += detail_counts['fetched']
+            stats['details_failed'] += detail_counts['failed']
+        
+        page_state_store.record_response(url, response, body_hash)
+        page_state_store.record_html_hash(url, html_hash)
+        
+        if not result['all_known']:
+            result['new_count'] = self._store_tenders(hospital, tenders, section, existing_hashes, stats)
+            stats['new_tenders'] += result['new_count']
+        
+        stats['extract_ms'] += extract_ms
+        page_state_store.record_extract_time(url, extract_ms)
+        
+        db.session.commit()
+        
+        result['stop'] = not hashes or result['all_known']
+        return result
+    
+    def _update_template(self, hospital: Hospital, column_url: str, section: Optional[str],
+                         template: Optional[ExtractionTemplate], result: Dict[str, Any],
+                         stats: Dict[str, Any]) -> Optional[ExtractionTemplate]:
+        """
+        根据列表页的提取结果更新栏目提取模板
+        
+        模板命中时累计命中次数；未命中时使用重新学习的模板替换，无法学习时累计未命中次数，
+        连续未命中达到上限后停用（之后的扫描完整提取，重新学习到模板时再启用）。
+        
+        Returns:
+            更新后的模板，没有模板时返回None
+        """
+        if result['template_matched']:
+            template.match_count = (template.match_count or 0) + 1
+            template.miss_count = 0
+            template.last_matched_at = datetime.utcnow()
+            stats['templates_matched'] += 1
+            db.session.commit()
+            return template
+        
+        if template is not None and template.is_active:
+            stats['template_misses'] += 1
+        
+        learned = result['template']
+        if learned is None:
+            if template is not None and template.is_active:
+                template.miss_count = (template.miss_count or 0) + 1
+                if template.miss_count >= self.config['template_max_misses']:
+                    template.is_active = False
+                    self.logger.info(f"提取模板连续未命中，已停用: {column_url}")
+                db.session.commit()
+            return template
+        
+        if template is None:
+            template = ExtractionTemplate(hospital_id=hospital.id, column_url=column_url)
+            db.session.add(template)
+        
+        template.section = section
+        template.container_tag = learned['container_tag']
+        template.item_selector = learned['item_selector']
+        template.strategy = learned['strategy']
+        template.item_count = learned['item_count']
+        template.miss_count = 0
+        template.is_active = True
+        stats['templates_learned'] += 1
+        db.session.commit()
+        return template
+    
+    def _load_columns(self, hospital: Hospital, stats: Dict[str, Any]) -> Optional[List[TenderColumn]]:
+        """
+        读取医院的招投标栏目，需要时从首页重新发现并更新栏目登记表
+        
+        Returns:
+            需要扫描的栏目列表，没有登记栏目且首页抓取失败时返回None
+        """
+        columns = TenderColumn.query.filter_by(hospital_id=hospital.id).order_by(TenderColumn.id).all()
+        active_columns = [column for column in columns if column.is_active]
+        
+        if not self._needs_discovery(columns):
+            stats['columns_from_registry'] += len(active_columns)
+            return active_columns
+        
+        discovered = self._discover_columns(hospital)
+        stats['column_discoveries'] += 1
+        if discovered is None:
+            # 首页暂时无法访问时继续扫描已登记的栏目
+            return active_columns or None
+        
+        now = datetime.utcnow()
+        known = {column.url: column for column in columns}
+        discovered_urls = set()
+        for item in discovered:
+            column = known.get(item['url'])
+            if column is None:
+                column = TenderColumn(hospital_id=hospital.id, url=item['url'])
+                db.session.add(column)
+                columns.append(column)
+            
+            column.title = (item.get('title') or '')[:200]
+            column.section = item.get('section')
+            column.source = item.get('source')
+            column.is_active = True
+            column.failure_count = 0
+            column.last_discovered_at = now
+            discovered_urls.add(item['url'])
+        
+        # 首页不再链接的栏目停止扫描
+        for column in columns:
+            if column.url not in discovered_urls:
+                column.is_active = False
+        
+        db.session.commit()
+        return [column for column in columns if column.is_active]
+    
+    def _needs_discovery(self, columns: List[TenderColumn]) -> bool:
+        """是否需要从首页重新发现栏目：没有可用栏目、超过重新发现间隔或有栏目连续失败"""
+        active_columns = [column for column in columns if column.is_active]
+        if not active_columns:
+            return True
+        
+        last_discovered = max(
+            (column.last_discovered_at for column in columns if column.last_discovered_at), default=None
+        )
+        interval = timedelta(hours=self.config['column_discovery_interval'])
+        if last_discovered is None or datetime.utcnow() - last_discovered >= interval:
+            return True
+        
+        return any((column.failure_count or 0) >= self.config['column_max_failures'] for column in active_columns)
+    
+    def _record_column_result(self, column: TenderColumn, result: Optional[Dict[str, Any]], new_count: int,
+                              stats: Dict[str, Any]):
+        """根据栏目首页的扫描结果更新栏目登记记录（条数只在页面变更并解析时更新）"""
+        now = datetime.utcnow()
+        if result is None or result['failed']:
+            column.failure_count = (column.failure_count or 0) + 1
+            column.last_failure_at = now
+            stats['columns_failed'] += 1
+        else:
+            column.failure_count = 0
+            column.success_count = (column.success_count or 0) + 1
+            column.last_success_at = now
+            if result['parsed']:
+                column.item_count = result['tenders_count']
+        
+        column.total_new_items = (column.total_new_items or 0) + new_count
+        db.session.commit()
+    
+    def _discover_columns(self, hospital: Hospital) -> Optional[List[Dict[str, Any]]]:
+        """从医院首页发现招投标栏目"""
+        html_content = tender_extractor.fetch_page(hospital.website_url)
+        if not html_content:
+            return None
+        
+        soup = make_soup(html_content, tender_extractor.config['html_parser'])
+        return tender_extractor.find_tender_columns(soup, hospital.website_url)
+    
+    def _existing_hashes(self, hashes: List[str]) -> Set[str]:
+        """
+        查询已入库的内容哈希
+        
+        已确认入库的哈希直接返回，内容哈希过滤器判定一定未入库的哈希不查询数据库，
+        只有可能已入库的哈希批量查询确认。
+        """
+        if not hashes:
+            return set()
+        
+        known, probable = content_hash_index.classify(hashes)
+        if not probable:
+            return known
+        
+        confirmed = set(
+            row[0] for row in db.session.query(TenderRecord.content_hash)
+            .filter(TenderRecord.content_hash.in_(probable)).all()
+        )
+        content_hash_index.mark_existing(confirmed)
+        return known | confirmed
+    
+    def _store_tenders(self, hospital: Hospital, tenders: Iterable[Dict[str, Any]], section: str = None,
+                       existing_hashes: Set[str] = None, stats: Dict[str, Any] = None) -> int:
+        """
+        去重并保存新的招投标记录
+        
+        按批次消费招投标信息（可直接传入TenderExtractor.iter_tenders生成器），每批查询已入库的哈希
+        并写入数据库，内存中只保留一个批次的记录和已保存的哈希。写入后在近似重复索引中查找
+        以前入库的近似重复公告（其他网站转载、修改后重新发布），关联到规范记录。
+        
+        Args:
+            hospital: 医院对象
+            tenders: 招投标信息列表或生成器
+            section: 栏目类型
+            existing_hashes: 已查询的入库哈希，为空时按批次查询
+            stats: 扫描统计，记录关联的近似重复数
+        
+        Returns:
+            新增记录数
+        """
+        stored_hashes = set(existing_hashes or ())
+        new_count = 0
+        
+        iterator = iter(tenders)
+        while True:
+            batch = list(islice(iterator, self.config['store_batch_size']))
+            if not batch:
+                break
+            
+            unique_tenders, _ = content_deduplicator.deduplicate_tender_list(batch)
+            
+            if existing_hashes is None:
+                stored_hashes |= self._existing_hashes(
+                    [t['content_hash'] for t in unique_tenders if t.get('content_hash')]
+                )
+            
+            records = []
+            for tender in unique_tenders:
+                content_hash = tender.get('content_hash')
+                if not content_hash or content_hash in stored_hashes:
+                    continue
+                
+                record = self._build_record(hospital, tender, section)
+                db.session.add(record)
+                records.append((record, tender))
+                stored_hashes.add(content_hash)
+                content_hash_index.add(content_hash)
+                new_count += 1
+            
+            # 写入本批记录，已写入的记录不再由会话持有
+            db.session.flush()
+            
+            # 近似重复关联需要写入后生成的记录ID
+            if self.config['link_near_duplicates'] and records:
+                linked = near_duplicate_index.link_records(records)
+                if stats is not None:
+                    stats['near_duplicates_linked'] += linked
+        
+        return new_count
+    
+    def _build_record(self, hospital: Hospital, tender: Dict[str, Any], section: str = None) -> TenderRecord:
+        """根据提取结果构建招投标记录"""
+        return TenderRecord(
+            hospital_id=hospital.id,
+            title=(tender.get('title') or '')[:500],
+            content=tender.get('content'),
+            tender_type=tender.get('tender_type') or 'other',
+            tender_category=tender.get('tender_category') or 'other',
+            budget_amount=tender.get('budget_amount'),
+            budget_currency=tender.get('budget_currency') or 'CNY',
+            publish_date=self._parse_date(tender.get('publish_date')),
+            deadline_date=self._parse_date(tender.get('deadline_date')),
+            source_url=tender.get('source_url'),
+            detail_url=tender.get('detail_url'),
+            content_hash=tender['content_hash'],
+            html_hash=tender.get('html_hash') or None,
+            source_section=section or tender.get('source_section'),
+            crawl_method=tender.get('crawl_method') or 'auto'
+        )
+    
+    @staticmethod
+    def _parse_date(value) -> Optional[datetime]:
+        """将提取的日期字符串转换为datetime"""
+        if not value:
+            return None
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.strptime(value, '%Y-%m-%d')
+        except (ValueError, TypeError):
+            return None
+    
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        """创建扫描统计"""
+        return {
+            'hospitals_scanned': 0,
+            'hospitals_failed': 0,
+            'pages_fetched': 0,
+            'pages_paginated': 0,
+            'pages_failed': 0,
+            'pages_not_modified': 0,
+            'pages_unchanged': 0,
+            'pages_html_unchanged': 0,
+            'extract_ms': 0,
+            'extract_ms_saved': 0,
+            'tenders_found': 0,
+            'new_tenders': 0,
+            'near_duplicates_linked': 0,
+            'details_fetched': 0,
+            'details_failed': 0,
+            'columns_stopped_known': 0,
+            'templates_matched': 0,
+            'templates_learned': 0,
+            'template_misses': 0,
+            'columns_from_registry': 0,
+            'column_discoveries': 0,
+            'columns_failed': 0,
+            'execution_time': '00:00:00',
+        }
+    
+    def _record_scan_history(self, start_time: datetime, duration: float, stats: Dict[str, Any]):
+        """记录扫描历史"""
+        try:
+            failed = stats['hospitals_failed']
+            total = stats['hospitals_scanned']
+            if total and failed == total:
+                status = 'failed'
+            elif failed:
+                status = 'partial'
+            else:
+                status = 'success'
+            
+            history = ScanHistory(
+                task_id=str(uuid.uuid4())[:8],
+                task_name='招投标监控',
+                scan_type='tender_monitor',
+                target_type='hospital',
+                target_description=f'扫描医院{total}家',
+                start_time=start_time,
+                end_time=datetime.utcnow(),
+                duration_seconds=int(duration),
+                status=status,
+                total_count=total,
+                success_count=total - failed,
+                failed_count=failed,
+                new_records=stats['new_tenders'],
+                records_found=stats['tenders_found'],
+                tenders_found=stats['tenders_found']
+            )
+            db.session.add(history)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self.logger.error(f"记录扫描历史失败: {str(e)}")
+
+# 创建全局招投标监控服务实例
+tender_monitor = TenderMonitor()
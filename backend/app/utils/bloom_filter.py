@@ -0,0 +1,115 @@
+"""
+布隆过滤器
+
+固定大小的位数组集合，判断元素“一定不存在”或“可能存在”，包括：
+- 按预期元素数和误判率计算位数组大小和哈希函数个数
+- 双重哈希（blake2b的两个64位分量）生成各哈希函数的位置
+- 序列化为字节（文件头记录参数和元素数），可持久化和重新加载
+
+不存在误报“不存在”：add过的元素总是返回可能存在；元素数超过预期时误判率上升，
+应按更大的容量重建。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import hashlib
+import math
+import struct
+from typing import Iterable, List
+
+# 文件头：魔数、预期元素数、误判率、哈希函数个数、已加入元素数、附加数据（如已同步的记录ID）
+HEADER = struct.Struct('<4sQdIQQ')
+MAGIC = b'BLM1'
+
+class BloomFilter:
+    """布隆过滤器"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: 预期元素数
+            error_rate: 达到预期元素数时的误判率
+        """
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        
+        num_bits = math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_bits = (num_bits + 7) // 8 * 8
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self.extra = 0
+        
+        self._bits = bytearray(self.num_bits // 8)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    @property
+    def is_full(self) -> bool:
+        """元素数是否已超过预期（误判率高于设定值）"""
+        return self.count > self.capacity
+    
+    def _positions(self, item: str) -> List[int]:
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        hash1 = int.from_bytes(digest[:8], 'little')
+        hash2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(hash1 + i * hash2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item: str) -> bool:
+        """
+        加入元素
+        
+        Returns:
+            元素此前是否一定不存在（有位从0变为1）
+        """
+        added = False
+        bits = self._bits
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        
+        if added:
+            self.count += 1
+        return added
+    
+    def update(self, items: Iterable[str]) -> int:
+        """批量加入元素，返回此前一定不存在的元素数"""
+        return sum(1 for item in items if self.add(item))
+    
+    def to_bytes(self) -> bytes:
+        """序列化为字节"""
+        header = HEADER.pack(MAGIC, self.capacity, self.error_rate, self.num_hashes, self.count, self.extra)
+        return header + bytes(self._bits)
+    
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BloomFilter':
+        """
+        从字节加载
+        
+        Raises:
+            ValueError: 数据格式错误或与参数计算出的大小不一致
+        """
+        if len(data) < HEADER.size:
+            raise ValueError('布隆过滤器数据不完整')
+        
+        magic, capacity, error_rate, num_hashes, count, extra = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError('布隆过滤器数据格式错误')
+        
+        bloom = cls(capacity, error_rate)
+        bits = data[HEADER.size:]
+        if num_hashes != bloom.num_hashes or len(bits) != len(bloom._bits):
+            raise ValueError('布隆过滤器数据与参数不一致')
+        
+        bloom._bits = bytearray(bits)
+        bloom.count = count
+        bloom.extra = extra
+        return bloom
@@ -0,0 +1,151 @@
+"""
+DOM关键词索引
+
+自底向上一次遍历文档，为每个元素计算关键词命中情况，供招投标提取复用，包括：
+- 元素文本（与get_text(strip=True)一致）是否包含关键词，无需生成元素文本
+- 跨子节点边界的关键词检测（只保留每个元素文本首尾各“最长关键词长度-1”个字符）
+- 按文档顺序筛选最外层元素，嵌套元素不再重复处理
+- 标记包裹其他元素的祖先元素（如包裹整个子列表的列表项）
+
+深层嵌套的页面上，对每一层元素调用get_text会重复生成相同的文本（平方复杂度），
+本索引的构建和查询耗时与文档大小成线性关系。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+from bs4 import NavigableString, Tag
+
+from app.utils.keyword_matcher import KeywordMatcher
+
+class DomIndex:
+    """DOM关键词索引"""
+    
+    def __init__(self, root: Tag, matcher: KeywordMatcher):
+        """
+        Args:
+            root: 文档或元素（构建后不应再修改文档结构）
+            matcher: 关键词匹配器
+        """
+        self.matcher = matcher
+        self.window = max((len(keyword) for keyword in matcher.keywords), default=1) - 1
+        
+        # id(元素) -> (是否命中, 文本长度, 文本开头, 文本结尾, 先序编号, 子树结束编号)
+        self._nodes: Dict[int, Tuple[bool, int, str, str, int, int]] = {}
+        self._build(root)
+    
+    def _build(self, root: Tag):
+        """迭代式后序遍历，子元素的结果合并到父元素"""
+        window = self.window
+        search = self.matcher.search
+        nodes = self._nodes
+        
+        order = 0
+        starts: Dict[int, int] = {}
+        stack: List[Tuple[Tag, bool]] = [(root, False)]
+        
+        while stack:
+            tag, visited = stack.pop()
+            
+            if not visited:
+                starts[id(tag)] = order
+                order += 1
+                stack.append((tag, True))
+                # 逆序入栈，保证先序编号与文档顺序一致
+                for child in reversed(tag.contents):
+                    if isinstance(child, Tag):
+                        stack.append((child, False))
+                continue
+            
+            hit = False
+            length = 0
+            head = ''
+            tail = ''
+            for child in tag.contents:
+                if isinstance(child, Tag):
+                    child_hit, child_length, child_head, child_tail = nodes[id(child)][:4]
+                    if not child_length:
+                        continue
+                elif type(child) is NavigableString:
+                    # get_text只包含普通文本节点（不含注释、CDATA、脚本等）
+                    text = child.strip()
+                    if not text:
+                        continue
+                    child_length = len(text)
+                    child_hit = search(text)
+                    child_head = text[:window]
+                    child_tail = text[-window:] if window else ''
+                else:
+                    continue
+                
+                # 关键词可能跨越前一段文本的结尾和当前子节点的开头
+                if not hit and (child_hit or (tail and search(tail + child_head))):
+                    hit = True
+                
+                if len(head) < window:
+                    head = (head + child_head)[:window]
+                if window:
+                    tail = (tail + child_tail)[-window:]
+                length += child_length
+            
+            nodes[id(tag)] = (hit, length, head, tail, starts.pop(id(tag)), order)
+    
+    def hit(self, tag: Tag) -> bool:
+        """元素文本是否包含关键词"""
+        node = self._nodes.get(id(tag))
+        return node[0] if node else False
+    
+    def text_length(self, tag: Tag) -> int:
+        """元素文本长度（与len(get_text(strip=True))一致）"""
+        node = self._nodes.get(id(tag))
+        return node[1] if node else 0
+    
+    def outermost(self, tags: Iterable[Tag], predicate: Callable[[Tag], bool] = None) -> List[Tag]:
+        """
+        筛选最外层元素
+        
+        Args:
+            tags: 按文档顺序排列的元素（如find_all的结果）
+            predicate: 筛选条件，只在满足条件的元素之间判断嵌套
+        
+        Returns:
+            不被其他已选元素包含的元素列表
+        """
+        selected = []
+        current_end = -1
+        for tag in tags:
+            if predicate is not None and not predicate(tag):
+                continue
+            
+            node = self._nodes.get(id(tag))
+            if node is None:
+                continue
+            
+            start, end = node[4], node[5]
+            if start < current_end:
+                continue
+            
+            selected.append(tag)
+            current_end = end
+        
+        return selected
+    
+    def ancestors(self, tags: Iterable[Tag]) -> Set[int]:
+        """
+        标记所有包含给定元素的祖先元素
+        
+        每个祖先只访问一次，总耗时与文档大小成线性关系。
+        
+        Returns:
+            祖先元素的id集合
+        """
+        marked: Set[int] = set()
+        for tag in tags:
+            parent = tag.parent
+            while parent is not None and id(parent) not in marked:
+                marked.add(id(parent))
+                parent = parent.parent
+        return marked
@@ -0,0 +1,147 @@
+"""
+招投标字段提取引擎
+
+使用预编译的组合正则表达式，一次扫描文本提取所有字段，包括：
+- 标题（招标项目/采购项目/项目名称/标题标签）
+- 发布日期（YYYY-MM-DD、YYYY年MM月DD日、YYYY/MM/DD、MM-DD-YYYY）
+- 截止日期（“截止”“投标”之后的第一个日期）
+- 预算金额（优先取以万元标注的金额，数值按原样保存，budget_amount的单位为万元）
+- 日期标准化结果缓存（列表页中大量重复的日期字符串只解析一次）
+- 批量提取接口，列表页的数百行文本一次调用处理
+
+各字段的优先级与逐个模式搜索的结果一致：先按模式顺序，再按出现位置。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+# 组合扫描模式中各字段对应的捕获组（组内按优先顺序排列）
+DATE_GROUPS = (0, 1, 2)
+BUDGET_GROUPS = ((3, '万元'), (4, '元'))
+TITLE_GROUPS = (5, 6, 7, 8)
+DEADLINE_GROUPS = (9, 10)
+
+DATE_YMD = r'\d{4}[-年]\d{1,2}[-月]\d{1,2}日?'
+TITLE_TAIL = r'[:：]?\s*(.+?)(?:\r?\n|$)'
+DEADLINE_TAIL = r'.*?[:：]?\s*(' + DATE_YMD + r')'
+
+# 组合扫描模式：日期、金额直接捕获，引导词之后的内容用前瞻捕获（不消耗字符，
+# 标题中的日期和金额仍会被扫描到）
+TOKEN_PATTERN = re.compile(
+    r'(' + DATE_YMD + r')'
+    r'|(\d{4}/\d{1,2}/\d{1,2})'
+    r'|(\d{1,2}[-/.]\d{1,2}[-/.]\d{4})'
+    r'|(\d+(?:\.\d+)?)\s*万元'
+    r'|(\d+(?:\.\d+)?)\s*元'
+    r'|招标项目(?=' + TITLE_TAIL + r')'
+    r'|采购项目(?=' + TITLE_TAIL + r')'
+    r'|项目名称(?=' + TITLE_TAIL + r')'
+    r'|(?i:<h[1-6](?=[^>]*>([^<]*(?:招标|采购|项目)[^<]*)</h[1-6]>))'
+    r'|截止(?=' + DEADLINE_TAIL + r')'
+    r'|投标(?=' + DEADLINE_TAIL + r')'
+)
+
+# 日期字符串解析
+DATE_PARTS = re.compile(
+    r'(\d{4})[-年](\d{1,2})[-月](\d{1,2})'
+    r'|(\d{4})/(\d{1,2})/(\d{1,2})'
+    r'|(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})'
+)
+
+@lru_cache(maxsize=4096)
+def normalize_date(date_str: str) -> Optional[str]:
+    """
+    日期字符串标准化为YYYY-MM-DD
+    
+    MM-DD-YYYY格式的月份大于12时按DD-MM-YYYY解析。
+    
+    Returns:
+        标准化的日期，无法解析时返回None
+    """
+    if not date_str:
+        return None
+    
+    match = DATE_PARTS.search(date_str)
+    if not match:
+        return None
+    
+    groups = match.groups()
+    try:
+        if match.group(1):
+            year, month, day = groups[0:3]
+        elif match.group(4):
+            year, month, day = groups[3:6]
+        else:
+            month, day, year = groups[6:9]
+            if int(month) > 12:
+                month, day = day, month
+        return datetime(int(year), int(month), int(day)).strftime('%Y-%m-%d')
+    except ValueError:
+        return None
+
+class FieldExtractor:
+    """招投标字段提取器"""
+    
+    def extract(self, text: str) -> Dict[str, Any]:
+        """
+        一次扫描提取文本中的所有字段
+        
+        Returns:
+            包含title、publish_date、deadline_date、budget_amount、budget_unit（金额标注的单位）的字典，
+            未找到的字段为None
+        """
+        tokens = TOKEN_PATTERN.findall(text) if text else []
+        
+        publish_date = self._first(tokens, DATE_GROUPS)
+        title = self._first(tokens, TITLE_GROUPS)
+        deadline_date = self._first(tokens, DEADLINE_GROUPS)
+        
+        budget_amount = None
+        budget_unit = None
+        for group, unit in BUDGET_GROUPS:
+            amount = self._first(tokens, (group,))
+            if amount:
+                budget_amount = float(amount)
+                budget_unit = unit
+                break
+        
+        return {
+            'title': title.strip() if title is not None else None,
+            'publish_date': normalize_date(publish_date) if publish_date else None,
+            'deadline_date': normalize_date(deadline_date) if deadline_date else None,
+            'budget_amount': budget_amount,
+            'budget_unit': budget_unit,
+        }
+    
+    def extract_many(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """
+        批量提取（同一批次中重复的文本只扫描一次）
+        
+        Returns:
+            与输入顺序一致的字段字典列表
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        fields = []
+        for text in texts:
+            if text not in results:
+                results[text] = self.extract(text)
+            fields.append(dict(results[text]))
+        return fields
+    
+    @staticmethod
+    def _first(tokens: List[tuple], groups: Iterable[int]) -> Optional[str]:
+        """按捕获组优先顺序取第一次出现的值（即该模式单独搜索的结果）"""
+        for group in groups:
+            for token in tokens:
+                if token[group]:
+                    return token[group]
+        return None
+
+# 创建全局字段提取器实例
+field_extractor = FieldExtractor()
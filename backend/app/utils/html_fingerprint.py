@@ -0,0 +1,79 @@
+"""
+HTML页面指纹
+
+不解析DOM，仅用预编译的正则表达式规范化HTML后计算哈希，包括：
+- 去除脚本、样式、注释、<head>和页头/导航/页脚等模板区域
+- 去除时刻（如09:30:15）、URL查询参数中的Unix时间戳和缓存参数
+  （正文中的10位、13位项目编号、标段编号保留）
+- 去除访问量、点击数等计数器
+- 去除标签属性中的随机令牌（nonce、csrf等）
+- 合并空白字符
+
+列表页的公告内容不变、只有模板或计数器变化时，指纹保持不变。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import hashlib
+import re
+from typing import Optional, Union
+
+from app.utils.html_parser import decode_html
+
+# 整段去除的区域
+BOILERPLATE_PATTERN = re.compile(
+    r'<!--.*?-->'
+    r'|<(script|style|noscript|head|header|nav|footer)\b.*?</\1\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# 计数器：浏览次数：123、点击(45)、阅读量 678等
+COUNTER_PATTERN = re.compile(
+    r'(浏览|访问|点击|阅读|查看)(次数|量|数)?\s*[:：(（]?\s*\d+\s*[)）次]?'
+    r'|\b(views?|hits|clicks)\s*[:(]?\s*\d+\)?',
+    re.IGNORECASE
+)
+
+# 时刻、URL查询参数中的Unix时间戳（2017-2039年的10位秒或13位毫秒，如app.js?1712345678）和缓存参数
+TIMESTAMP_PATTERN = re.compile(
+    r'\d{1,2}:\d{2}(?::\d{2})?'
+    r'|(?<=[?&=])(?:1[5-9]|2[01])\d{8}(?:\d{3})?(?!\d)'
+    r'|[?&](?:_|t|v|ts|timestamp|rnd|rand|random)=[\w.-]*',
+    re.IGNORECASE
+)
+
+# 随机令牌属性
+TOKEN_ATTR_PATTERN = re.compile(
+    r'\s(?:nonce|csrf[\w-]*|data-[\w-]*(?:token|time|timestamp))\s*=\s*("[^"]*"|\'[^\']*\'|\S+)',
+    re.IGNORECASE
+)
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+def normalize_html(html: Union[str, bytes], encoding: Optional[str] = None) -> str:
+    """
+    规范化HTML
+    
+    Args:
+        html: HTML文本或字节（字节按声明或检测到的字符集解码，见decode_html）
+        encoding: 响应头声明的字符集，未声明时为None
+    
+    Returns:
+        规范化后的文本
+    """
+    if isinstance(html, bytes):
+        html = decode_html(html, encoding)
+    if not html:
+        return ''
+    
+    text = BOILERPLATE_PATTERN.sub(' ', html)
+    text = TOKEN_ATTR_PATTERN.sub('', text)
+    text = COUNTER_PATTERN.sub(' ', text)
+    text = TIMESTAMP_PATTERN.sub(' ', text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+def compute_html_hash(html: Union[str, bytes], encoding: Optional[str] = None) -> str:
+    """计算规范化HTML的哈希（参数同normalize_html）"""
+    return hashlib.sha256(normalize_html(html, encoding).encode('utf-8')).hexdigest()
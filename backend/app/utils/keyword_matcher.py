@@ -0,0 +1,133 @@
+"""
+多关键词匹配工具
+
+基于Aho-Corasick自动机，一次线性扫描找出文本中的所有关键词，包括：
+- 是否包含任一关键词
+- 命中的关键词集合
+- 每个关键词的出现次数（与str.count一致，不重叠计数）
+- 关键词分组（如招投标类型、分类）的命中判断
+
+扫描耗时只与文本长度有关，不随关键词数量增长。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+from typing import Dict, Iterable, List, Optional, Set
+
+import ahocorasick
+
+class KeywordMatcher:
+    """多关键词匹配器"""
+    
+    def __init__(self, keywords: Iterable[str], ignore_case: bool = False):
+        """
+        Args:
+            keywords: 关键词列表（保持顺序，重复项忽略）
+            ignore_case: 是否忽略大小写
+        """
+        self.ignore_case = ignore_case
+        self.keywords: List[str] = []
+        self.groups: Dict[str, List[str]] = {}
+        self._keyword_groups: Dict[str, List[str]] = {}
+        
+        self._automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            self._add(keyword)
+        
+        if self.keywords:
+            self._automaton.make_automaton()
+    
+    @classmethod
+    def from_groups(cls, groups: Dict[str, Iterable[str]], ignore_case: bool = False) -> 'KeywordMatcher':
+        """
+        按分组创建匹配器
+        
+        Args:
+            groups: 分组名 -> 关键词列表，分组顺序即判断优先级
+            ignore_case: 是否忽略大小写
+        """
+        matcher = cls([], ignore_case=ignore_case)
+        for group, keywords in groups.items():
+            matcher.groups[group] = []
+            for keyword in keywords:
+                key = matcher._add(keyword)
+                if key is not None:
+                    matcher.groups[group].append(key)
+                    matcher._keyword_groups[key].append(group)
+        
+        if matcher.keywords:
+            matcher._automaton.make_automaton()
+        return matcher
+    
+    def _add(self, keyword: str) -> Optional[str]:
+        """加入关键词，返回规范化后的关键词"""
+        if not keyword:
+            return None
+        
+        key = keyword.lower() if self.ignore_case else keyword
+        if key not in self._keyword_groups:
+            self._keyword_groups[key] = []
+            self.keywords.append(key)
+            self._automaton.add_word(key, key)
+        return key
+    
+    def _prepare(self, text: str) -> str:
+        if not text:
+            return ''
+        return text.lower() if self.ignore_case else text
+    
+    def search(self, text: str) -> bool:
+        """文本是否包含任一关键词"""
+        text = self._prepare(text)
+        if not text or not self.keywords:
+            return False
+        
+        for _ in self._automaton.iter(text):
+            return True
+        return False
+    
+    def find(self, text: str) -> Set[str]:
+        """文本中出现的关键词集合"""
+        text = self._prepare(text)
+        if not text or not self.keywords:
+            return set()
+        
+        return {keyword for _, keyword in self._automaton.iter(text)}
+    
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        统计每个关键词的出现次数
+        
+        与对每个关键词调用str.count的结果一致：同一关键词不重叠计数，
+        不同关键词之间互不影响（如“设备采购”同时计入“设备采购”和“采购”）。
+        
+        Returns:
+            关键词 -> 出现次数，仅包含出现过的关键词
+        """
+        text = self._prepare(text)
+        if not text or not self.keywords:
+            return {}
+        
+        counts: Dict[str, int] = {}
+        last_end: Dict[str, int] = {}
+        for end, keyword in self._automaton.iter(text):
+            # 自动机按结束位置顺序返回，跳过与上一次命中重叠的位置
+            if end - len(keyword) < last_end.get(keyword, -1):
+                continue
+            last_end[keyword] = end
+            counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+    
+    def match_groups(self, *texts: str) -> List[str]:
+        """按分组顺序返回命中的分组（可同时检查多个文本）"""
+        found = set()
+        for text in texts:
+            found |= self.find(text)
+        return [group for group, keywords in self.groups.items() if any(k in found for k in keywords)]
+    
+    def first_group(self, *texts: str, default: str = None) -> Optional[str]:
+        """返回第一个命中的分组"""
+        groups = self.match_groups(*texts)
+        return groups[0] if groups else default
@@ -0,0 +1,203 @@
+"""
+MinHash签名与LSH候选索引
+
+用于近似重复检测的候选筛选，只有落入同一分桶的文档才需要精确计算相似度，包括：
+- 词集合的MinHash签名（NumPy向量化计算，词哈希使用crc32，跨进程稳定，可持久化）
+- 按Jaccard下限自动选择分段数和每段行数，保证相似文档的召回率
+- 分段（banding）LSH索引：插入、删除、查询候选，并在签名矩阵上向量化估计候选的相似度
+
+两个词集合的MinHash签名中相同位置取值相等的概率等于它们的Jaccard相似度。
+签名分为b段、每段r行，至少一段完全相同的文档成为候选，
+Jaccard为s的文档对成为候选的概率为 1-(1-s^r)^b。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import zlib
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    """Jaccard相似度为similarity的文档对成为候选的概率"""
+    return 1.0 - (1.0 - similarity ** rows) ** bands
+
+def choose_bands(num_perm: int, min_similarity: float, recall: float = 0.999) -> Tuple[int, int]:
+    """
+    选择分段参数：在Jaccard为min_similarity的文档对召回率不低于recall的前提下，
+    每段行数尽量多（不相似的文档更少成为候选）
+    
+    Returns:
+        (分段数, 每段行数)
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if candidate_probability(min_similarity, bands, rows) >= recall:
+            best = (bands, rows)
+        else:
+            break
+    return best
+
+class MinHasher:
+    """MinHash签名生成器"""
+    
+    def __init__(self, num_perm: int = 128, seed: int = 1):
+        """
+        Args:
+            num_perm: 哈希函数（签名长度）数量
+            seed: 随机种子，相同参数生成的签名可以相互比较
+        """
+        self.num_perm = num_perm
+        self.seed = seed
+        
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+    
+    def signature(self, tokens: Iterable[str]) -> np.ndarray:
+        """
+        计算词集合的MinHash签名
+        
+        Returns:
+            长度为num_perm的uint32数组，空集合的签名为全部最大值
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode('utf-8')) for token in set(tokens)),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        
+        # (a*x+b) mod p 取低32位；uint64乘法溢出按模2^64回绕
+        with np.errstate(over='ignore'):
+            permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+    
+    @staticmethod
+    def jaccard(signature1: np.ndarray, signature2: np.ndarray) -> float:
+        """由签名估计Jaccard相似度"""
+        return float(np.count_nonzero(signature1 == signature2)) / len(signature1)
+
+class LSHIndex:
+    """分段LSH候选索引"""
+    
+    def __init__(self, min_similarity: float, num_perm: int = 128, recall: float = 0.999):
+        """
+        Args:
+            min_similarity: 需要保证召回的最低Jaccard相似度
+            num_perm: 签名长度（与MinHasher一致）
+            recall: Jaccard为min_similarity的文档对的召回率
+        """
+        self.num_perm = num_perm
+        self.bands, self.rows = choose_bands(num_perm, min_similarity, recall)
+        
+        # 分桶中保存签名矩阵的行号，候选的相似度估计在矩阵上向量化计算
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._rows: Dict[Hashable, int] = {}
+        self._row_keys: List[Optional[Hashable]] = []
+        self._row_bands: List[Optional[List[bytes]]] = []
+        self._free_rows: List[int] = []
+        self._signatures = np.empty((16, num_perm), dtype=np.uint32)
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+    
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+    
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        
+        row = len(self._row_keys)
+        if row == len(self._signatures):
+            grown = np.empty((len(self._signatures) * 2, self.num_perm), dtype=np.uint32)
+            grown[:row] = self._signatures
+            self._signatures = grown
+        
+        self._row_keys.append(None)
+        self._row_bands.append(None)
+        return row
+    
+    def insert(self, key: Hashable, signature: np.ndarray):
+        """加入文档（同一key重复加入时先删除旧签名）"""
+        if key in self._rows:
+            self.remove(key)
+        
+        row = self._allocate_row()
+        band_keys = self._band_keys(signature)
+        for buckets, band_key in zip(self._buckets, band_keys):
+            buckets.setdefault(band_key, []).append(row)
+        
+        self._signatures[row] = signature
+        self._rows[key] = row
+        self._row_keys[row] = key
+        self._row_bands[row] = band_keys
+    
+    def remove(self, key: Hashable):
+        """删除文档"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        
+        for buckets, band_key in zip(self._buckets, self._row_bands[row]):
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                continue
+            bucket.remove(row)
+            if not bucket:
+                del buckets[band_key]
+        
+        self._row_keys[row] = None
+        self._row_bands[row] = None
+        self._free_rows.append(row)
+    
+    def get_signature(self, key: Hashable) -> Optional[np.ndarray]:
+        """获取文档的签名，不存在时返回None"""
+        row = self._rows.get(key)
+        return self._signatures[row].copy() if row is not None else None
+    
+    def _candidate_rows(self, signature: np.ndarray) -> Set[int]:
+        rows: Set[int] = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket:
+                rows.update(bucket)
+        return rows
+    
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        """查询至少一段签名相同的候选文档"""
+        return {self._row_keys[row] for row in self._candidate_rows(signature)}
+    
+    def query_similar(self, signature: np.ndarray, min_similarity: float = 0.0) -> Dict[Hashable, float]:
+        """
+        查询候选文档并由签名估计Jaccard相似度（在签名矩阵上向量化计算）
+        
+        Args:
+            signature: 查询文档的签名
+            min_similarity: 估计相似度下限，低于该值的候选不返回
+        
+        Returns:
+            {文档key: 估计相似度}
+        """
+        candidate_rows = self._candidate_rows(signature)
+        if not candidate_rows:
+            return {}
+        
+        candidate_rows = np.fromiter(candidate_rows, dtype=np.intp, count=len(candidate_rows))
+        similarities = np.count_nonzero(self._signatures[candidate_rows] == signature, axis=1) / self.num_perm
+        selected = similarities >= min_similarity
+        return {
+            self._row_keys[row]: similarity
+            for row, similarity in zip(candidate_rows[selected].tolist(), similarities[selected].tolist())
+        }
@@ -0,0 +1,188 @@
+"""
+稀疏矩阵批量相似度
+
+将一批文档的词构建为文档-词稀疏矩阵，用矩阵运算批量计算所有文档对的相似度，包括：
+- 一次遍历构建文档-词矩阵（CSR格式，词表在构建时分配）
+- 词集合Jaccard相似度（交集大小为二值矩阵的乘积）和TF-IDF加权的余弦相似度
+- 按行分块计算，每块只保留达到最低相似度的元素，可选每行只保留相似度最高的k个
+- 不限制每行个数时只计算上三角，再对称补全
+- 按相似度图的连通分量聚类
+
+模板化公告的常用词几乎出现在所有文档中，纯稀疏矩阵乘法的计算量接近文档数的平方乘以常用词数。
+文档频率高的词拆出来用稠密矩阵乘法（BLAS）计算，稀疏矩阵乘法只处理其余的低频词。
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+DENSE_MIN_DF_RATIO = 0.01  # 文档频率达到文档数该比例的词用稠密矩阵乘法
+MAX_DENSE_TERMS = 512  # 稠密矩阵乘法的最大词数（按文档频率从高到低选择）
+BLOCK_CELLS = 1 << 23  # 每块相似度矩阵的最大元素数
+
+class TokenMatrix:
+    """文档-词矩阵"""
+    
+    def __init__(self, documents: Iterable[Iterable[Hashable]]):
+        """
+        Args:
+            documents: 每个文档的词序列（重复的词累计词频，传入词集合时词频均为1）
+        """
+        self.vocabulary: Dict[Hashable, int] = {}
+        
+        indptr = [0]
+        indices: List[int] = []
+        for tokens in documents:
+            for token in tokens:
+                indices.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+            indptr.append(len(indices))
+        
+        self.counts = sp.csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+            shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+        self.counts.sum_duplicates()
+    
+    def __len__(self) -> int:
+        return self.counts.shape[0]
+    
+    def binary(self) -> sp.csr_matrix:
+        """二值矩阵（文档包含该词为1）"""
+        matrix = self.counts.copy()
+        matrix.data[:] = 1
+        return matrix
+    
+    def document_frequency(self) -> np.ndarray:
+        """每个词出现的文档数"""
+        return np.bincount(self.counts.indices, minlength=self.counts.shape[1])
+    
+    def tfidf(self) -> sp.csr_matrix:
+        """TF-IDF矩阵（平滑IDF：ln((1+n)/(1+df))+1，行向量L2归一化）"""
+        idf = np.log((1 + len(self)) / (1 + self.document_frequency())) + 1
+        matrix = self.counts.multiply(idf.astype(np.float32)).tocsr()
+        
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return (sp.diags((1 / norms).astype(np.float32)) @ matrix).tocsr()
+
+def jaccard_similarity(matrix: TokenMatrix, min_similarity: float = 0.0,
+                       top_k: Optional[int] = None) -> sp.csr_matrix:
+    """
+    所有文档对的词集合Jaccard相似度
+    
+    Args:
+        matrix: 文档-词矩阵
+        min_similarity: 只保留不低于该值的相似度（单精度计算，边界附近的文档对可能多保留）
+        top_k: 每行最多保留的元素数，None表示不限制
+    
+    Returns:
+        文档数×文档数的稀疏矩阵，对角线和没有共同词的文档对为0
+    
+    Raises:
+        ValueError: top_k小于1
+    """
+    binary = matrix.binary()
+    sizes = np.diff(binary.indptr).astype(np.float32)
+    
+    def score(products: np.ndarray, rows: slice, columns: slice) -> np.ndarray:
+        union = sizes[rows, None] + sizes[None, columns]
+        union -= products
+        np.maximum(union, 1, out=union)
+        return np.divide(products, union, out=products)
+    
+    return _pairwise_similarity(binary, score, min_similarity, top_k)
+
+def cosine_similarity(matrix: TokenMatrix, min_similarity: float = 0.0,
+                      top_k: Optional[int] = None) -> sp.csr_matrix:
+    """
+    所有文档对的TF-IDF余弦相似度（参数和返回值同jaccard_similarity）
+    
+    模板用语出现在大部分文档中，IDF权重低，余弦相似度更突出各公告特有的词。
+    """
+    return _pairwise_similarity(matrix.tfidf(), lambda products, rows, columns: products, min_similarity, top_k)
+
+def connected_groups(similarity: sp.spmatrix, min_size: int = 2) -> List[List[int]]:
+    """
+    按相似度图的连通分量聚类（相似度矩阵的非零元素为边）
+    
+    Returns:
+        文档下标分组（组内按下标排序），按组大小降序排列
+    """
+    _, labels = connected_components(similarity, directed=False)
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    
+    groups = [group.tolist() for group in np.split(order, boundaries) if len(group) >= min_size]
+    groups.sort(key=len, reverse=True)
+    return groups
+
+def _pairwise_similarity(weights: sp.csr_matrix, score: Callable[[np.ndarray, slice, slice], np.ndarray],
+                         min_similarity: float, top_k: Optional[int]) -> sp.csr_matrix:
+    """
+    按行分块计算文档对的加权词内积，由score换算为相似度并筛选
+    
+    Args:
+        weights: 文档-词权重矩阵
+        score: 由内积块及其对应的行、列范围计算相似度块（可以原地修改内积块）
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError(f'top_k必须大于0: {top_k}')
+    
+    count = weights.shape[0]
+    if count == 0:
+        return sp.csr_matrix((0, 0), dtype=np.float32)
+    
+    # 高频词的稠密权重和其余词的稀疏权重
+    frequency = np.bincount(weights.indices, minlength=weights.shape[1])
+    frequent = np.flatnonzero(frequency >= max(2, DENSE_MIN_DF_RATIO * count))
+    frequent = frequent[np.argsort(-frequency[frequent], kind='stable')[:MAX_DENSE_TERMS]]
+    is_dense = np.zeros(weights.shape[1], dtype=bool)
+    is_dense[frequent] = True
+    
+    dense = weights[:, frequent].toarray()
+    dense_t = np.ascontiguousarray(dense.T)
+    rare = weights[:, np.flatnonzero(~is_dense)].tocsr()
+    rare_t = rare.T.tocsr()
+    
+    # 不限制每行个数时，每块只计算本块起始行之后的列（上三角）
+    triangular = top_k is None or top_k >= count
+    block_rows = max(1, BLOCK_CELLS // count)
+    rows, columns, values = [], [], []
+    for start in range(0, count, block_rows):
+        stop = min(start + block_rows, count)
+        first = start if triangular else 0
+        
+        products = dense[start:stop] @ dense_t[:, first:]
+        extra = (rare[start:stop] @ rare_t).tocoo()
+        in_block = extra.col >= first
+        products[extra.row[in_block], extra.col[in_block] - first] += extra.data[in_block]
+        
+        block = score(products, slice(start, stop), slice(first, count))
+        if triangular:
+            square = block[:, :stop - start]
+            square[np.tril_indices(stop - start)] = 0
+        else:
+            block[np.arange(stop - start), np.arange(start, stop)] = 0
+        
+        keep = block >= min_similarity if min_similarity > 0 else block > 0
+        if not triangular:
+            top = np.argpartition(block, count - top_k, axis=1)[:, count - top_k:]
+            in_top = np.zeros_like(keep)
+            in_top[np.arange(stop - start)[:, None], top] = True
+            keep &= in_top
+        
+        block_row, block_column = np.nonzero(keep)
+        rows.append(block_row + start)
+        columns.append(block_column + first)
+        values.append(block[block_row, block_column].astype(np.float32))
+    
+    similarity = sp.csr_matrix(
+        (np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))), shape=(count, count)
+    )
+    return (similarity + similarity.T).tocsr() if triangular else similarity
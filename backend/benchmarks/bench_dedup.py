@@ -0,0 +1,182 @@
+"""
+招投标批量去重基准测试
+
+生成合成招投标列表（含一定比例的近似重复：转载、更正、少量改字），比较几种去重方式，包括：
+- 逐一比较（旧方式，每条新公告与所有已保留公告计算完整相似度，平方复杂度）
+- MinHash/LSH候选索引（只对同一分桶且相似度上界达到阈值的候选计算完整相似度）
+- 稀疏矩阵候选筛选（整批一次计算两两Jaccard，只对相似度上界达到阈值的候选计算完整相似度）
+- 各方式在同一批数据上的结果是否一致
+- 近似重复聚类报告（整批两两相似度和连通分量分组）的耗时
+
+逐一比较在大批量上耗时过长，只在不超过--baseline-max的规模上运行。
+
+使用方法（在backend目录下）：
+    python -m benchmarks.bench_dedup --sizes 1000,10000,100000 --baseline-max 2000
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parser import timed
+from benchmarks.site_farm import CITIES, HOSPITAL_NAMES, TENDER_ITEMS, TENDER_TYPES
+
+# 采购需求描述的组成部分（不同公告的需求描述各不相同，模板部分相同）
+REQUIREMENT_PARTS = [
+    '数量{n}台', '质保期{n}年', '交货期{n}日', '含{n}次免费培训', '配套软件{n}套', '售后响应{n}小时',
+    '分{n}个包采购', '供应商须具备医疗器械经营许可证', '接受进口产品', '不接受联合体投标',
+    '须提供近三年同类项目业绩', '须现场踏勘', '采用综合评分法', '采用最低评标价法', '需提供样品',
+    '安装调试及验收', '旧设备回收处置', '与医院信息系统对接', '提供备品备件清单', '专家论证通过',
+]
+DEPARTMENTS = ['放射科', '检验科', '手术室', '重症医学科', '心内科', '信息中心', '后勤保障部', '药剂科',
+               '超声科', '病理科', '康复医学科', '急诊科', '体检中心', '口腔科', '眼科', '儿科']
+
+def generate_tenders(count: int, seed: int = 42, duplicate_ratio: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    生成合成招投标列表
+    
+    Args:
+        count: 招投标数
+        seed: 随机种子
+        duplicate_ratio: 近似重复公告的比例（复制已生成的公告并做少量修改）
+    """
+    rng = random.Random(seed)
+    tenders = []
+    for number in range(count):
+        if tenders and rng.random() < duplicate_ratio:
+            original = rng.choice(tenders)
+            tender = dict(original)
+            edit = rng.choice(['更正', '转载', '改字'])
+            if edit == '更正':
+                tender['title'] = original['title'] + '（更正）'
+            elif edit == '转载':
+                tender['content'] = '转载自省级采购平台：' + original['content']
+            else:
+                tender['content'] = original['content'].replace('联系人', '联 系 人', 1)
+            tenders.append(tender)
+            continue
+        
+        hospital = f'{rng.choice(CITIES)}市{rng.choice(HOSPITAL_NAMES)}'
+        item = rng.choice(TENDER_ITEMS)
+        tender_type = rng.choice(TENDER_TYPES)
+        publish_date = date(2025, 11, 18) - timedelta(days=rng.randint(0, 365))
+        title = f'{hospital}{item}{tender_type}（编号{number:06d}）'
+        requirements = '，'.join(
+            part.format(n=rng.randint(1, 60)) for part in rng.sample(REQUIREMENT_PARTS, rng.randint(4, 8))
+        )
+        content = (
+            f'项目名称：{title}。采购单位：{hospital}{rng.choice(DEPARTMENTS)}。'
+            f'采购需求：{requirements}。预算金额：{rng.randint(5, 5000)}万元。'
+            f'投标截止时间：{(publish_date + timedelta(days=rng.randint(7, 30))).isoformat()}。'
+            f'联系人：采购办{rng.randint(1, 99)}号 电话：010-{rng.randint(60000000, 69999999)}'
+        )
+        tenders.append({
+            'title': title,
+            'content': content,
+            'publish_date': publish_date.isoformat(),
+        })
+    return tenders
+
+def run_dedup(tenders: List[Dict[str, Any]], candidate_method: str) -> Dict[str, Any]:
+    """运行一次批量去重（清空文本分析缓存，各方式都包含分词耗时）"""
+    from app.services.content_deduplicator import content_deduplicator
+    
+    content_deduplicator.clear_analysis_cache()
+    content_deduplicator.config['candidate_method'] = candidate_method
+    elapsed, (unique, statistics) = timed(content_deduplicator.deduplicate_tender_list, tenders)
+    return {
+        'seconds': round(elapsed, 3),
+        'unique_count': statistics['unique_count'],
+        'duplicates_removed': statistics['duplicates_removed'],
+        'similar_merged': statistics['similar_merged'],
+        'kept': [id(tender) for tender in unique],
+    }
+
+def run_report(tenders: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """运行一次近似重复聚类"""
+    from app.services.content_deduplicator import content_deduplicator
+    
+    content_deduplicator.clear_analysis_cache()
+    elapsed, groups = timed(content_deduplicator.find_similar_groups, [tender['content'] for tender in tenders])
+    return {
+        'seconds': round(elapsed, 3),
+        'groups': len(groups),
+        'grouped': sum(len(group['indices']) for group in groups),
+    }
+
+def same_result(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+    """两次去重保留的招投标和相似合并数是否一致"""
+    return first['kept'] == second['kept'] and first['similar_merged'] == second['similar_merged']
+
+def bench_size(size: int, seed: int, duplicate_ratio: float, baseline_max: int) -> Dict[str, Any]:
+    """测试单个规模"""
+    tenders = generate_tenders(size, seed, duplicate_ratio)
+    
+    matrix = run_dedup(tenders, 'matrix')
+    lsh = run_dedup(tenders, 'lsh')
+    report = run_report(tenders)
+    result = {
+        'size': size,
+        'matrix_seconds': matrix['seconds'],
+        'lsh_seconds': lsh['seconds'],
+        'unique_count': matrix['unique_count'],
+        'similar_merged': matrix['similar_merged'],
+        'lsh_match': same_result(matrix, lsh),
+        'report_seconds': report['seconds'],
+        'report_groups': report['groups'],
+        'report_grouped': report['grouped'],
+        'baseline_seconds': None,
+        'results_match': None,
+    }
+    
+    if size <= baseline_max:
+        baseline = run_dedup(tenders, 'none')
+        result['baseline_seconds'] = baseline['seconds']
+        result['results_match'] = same_result(baseline, matrix)
+    
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description='招投标批量去重基准测试')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='逗号分隔的批量大小')
+    parser.add_argument('--baseline-max', type=int, default=2000, help='运行逐一比较的最大批量')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.1, help='近似重复公告的比例')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    import jieba
+    jieba.setLogLevel(logging.WARNING)
+    jieba.initialize()
+    
+    results = []
+    for size in args.sizes.split(','):
+        result = bench_size(int(size), args.seed, args.duplicate_ratio, args.baseline_max)
+        results.append(result)
+        
+        baseline = f"{result['baseline_seconds']:>8.2f}s" if result['baseline_seconds'] is not None else '       -'
+        print(f"n={result['size']:<7} 逐一比较={baseline}  LSH={result['lsh_seconds']:>8.2f}s  "
+              f"稀疏矩阵={result['matrix_seconds']:>8.2f}s  聚类报告={result['report_seconds']:>7.2f}s  "
+              f"保留={result['unique_count']}  相似合并={result['similar_merged']}  "
+              f"分组={result['report_groups']}  与逐一比较一致={result['results_match']}  "
+              f"与LSH一致={result['lsh_match']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'params': vars(args), 'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+深层嵌套页面DOM遍历基准测试
+
+生成不同嵌套深度的招投标页面，比较两种关键词检测方式的耗时，包括：
+- 逐个元素调用get_text后检测关键词（旧方式，嵌套越深重复生成的文本越多）
+- DomIndex一次自底向上遍历（新方式，耗时与文档大小成线性关系）
+- 招投标提取和栏目发现（TenderExtractor）的整体耗时
+- 列表提取回归样例：与旧方式（逐个条目生成文本后解析）提取的内容哈希是否一致
+- 提取模板回归样例：按学习的模板提取的记录是否与完整提取一致
+
+使用方法（在backend目录下）：
+    python -m benchmarks.bench_dom --depths 50,100,200,400,800
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from typing import Dict, List, Any, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_parser import timed
+
+CANDIDATE_CLASS = re.compile(r'list|item|news|tender|bid|content|article')
+LIST_CLASS = re.compile(r'list|item|news|tender|bid')
+
+# 列表提取回归样例（不含嵌套子列表，新旧方式的提取结果应一致）
+LIST_CASES = {
+    'plain_list': (
+        '<html><body><ul class="news-list">'
+        '<li><a href="/zbgg/1.html">某市人民医院CT设备采购公告</a><span>2025-10-01</span></li>'
+        '<li><a href="/zbgg/2.html">某市人民医院病房楼改造工程招标公告</a><span>2025-10-02</span></li>'
+        '</ul></body></html>'
+    ),
+    'item_title_div': (
+        '<html><body><div id="main"><ul class="list">'
+        '<li><div class="item-title"><a href="/zbgg/1.html">某市人民医院CT设备采购公告</a></div>'
+        '<span class="date">2025-10-01</span></li>'
+        '<li><div class="item-title"><a href="/zbgg/2.html">某市人民医院病房楼改造工程招标公告</a></div>'
+        '<span class="date">2025-10-02</span></li>'
+        '</ul></div></body></html>'
+    ),
+    'div_items': (
+        '<html><body><div class="tender-list">'
+        '<div class="item"><a href="/zbgg/1.html">某市人民医院CT设备采购公告</a><em>2025-10-01</em></div>'
+        '<div class="item"><a href="/zbgg/2.html">某市人民医院物业服务竞争性磋商公告</a><em>2025-10-02</em></div>'
+        '</div></body></html>'
+    ),
+}
+
+# 提取模板回归样例（列表、表格，按模板提取的内容哈希和标题应与完整提取一致）
+TEMPLATE_CASES = {
+    'news_list': (
+        '<html><body><div class="main"><ul class="news-list">'
+        + ''.join(
+            f'<li><a href="/zbgg/{n}.html">某市人民医院第{n}批医疗设备采购公告</a><span class="date">2025-10-0{n}</span></li>'
+            for n in range(1, 5)
+        )
+        + '</ul></div></body></html>'
+    ),
+    'item_title_div': (
+        '<html><body><div id="main"><ul class="list">'
+        + ''.join(
+            f'<li><div class="item-title"><a href="/zbgg/{n}.html">某市人民医院第{n}批医疗设备采购公告</a></div>'
+            f'<span class="date">2025-10-0{n}</span></li>'
+            for n in range(1, 5)
+        )
+        + '</ul></div></body></html>'
+    ),
+    'table_rows': (
+        '<html><body><div id="main"><table class="lst"><tbody>'
+        + ''.join(
+            f'<tr><td><a href="/zbgg/{n}.html">某市人民医院第{n}批医疗设备采购公告</a></td><td>2025-10-0{n}</td></tr>'
+            for n in range(1, 5)
+        )
+        + '</tbody></table></div></body></html>'
+    ),
+}
+
+def generate_nested_page(depth: int, items_per_level: int = 2) -> str:
+    """生成每一层都带有招投标条目的嵌套页面"""
+    parts = ['<html><head><title>深层嵌套测试页</title></head><body><div class="nav"><a href="/zbgg/">招标公告</a></div>']
+    for level in range(depth):
+        css = 'content' if level % 2 else 'news-list'
+        parts.append(f'<div class="{css}"><ul class="list">')
+        for n in range(items_per_level):
+            parts.append(
+                f'<li><a href="/zbgg/detail_{level}_{n}.html">第{level}层第{n}号医疗设备采购项目招标公告</a>'
+                f'<span>2025-11-{n % 28 + 1:02d}</span></li>'
+            )
+        parts.append('</ul><p>医院新闻动态</p>')
+    parts.append('</div>' * depth)
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+def legacy_scan(soup, matcher) -> int:
+    """旧方式：对每个候选元素生成文本后检测关键词"""
+    hits = 0
+    for element in soup.find_all(['div', 'section', 'article', 'ul', 'ol', 'p', 'span', 'li'], class_=CANDIDATE_CLASS):
+        if matcher.search(element.get_text(strip=True)):
+            hits += 1
+    return hits
+
+def index_scan(soup, matcher) -> int:
+    """新方式：一次遍历后查询命中情况"""
+    from app.utils.dom_index import DomIndex
+    
+    index = DomIndex(soup, matcher)
+    elements = soup.find_all(['div', 'section', 'article', 'ul', 'ol', 'p', 'span', 'li'], class_=CANDIDATE_CLASS)
+    return sum(1 for element in elements if index.hit(element))
+
+def legacy_list_hashes(html: str, url: str) -> Set[str]:
+    """旧方式：所有候选列表中包含关键词的条目逐个生成文本后解析"""
+    from app.services.tender_extractor import tender_extractor
+    from app.utils.html_parser import make_soup
+    
+    hashes = set()
+    for container in make_soup(html).find_all(['ul', 'ol', 'div'], class_=LIST_CLASS):
+        for item in container.find_all(['li', 'div', 'a']):
+            text = item.get_text(strip=True)
+            if tender_extractor.tender_matcher.search(text):
+                tender_info = tender_extractor._parse_tender_text(text, url)
+                if tender_info:
+                    hashes.add(tender_info['content_hash'])
+    return hashes
+
+def check_list_cases() -> Dict[str, bool]:
+    """列表提取回归样例的内容哈希是否与旧方式一致"""
+    from app.services.tender_extractor import tender_extractor
+    from app.utils.html_parser import make_soup
+    
+    url = 'http://cases.test/zbgg/'
+    results = {}
+    for name, html in LIST_CASES.items():
+        tenders = tender_extractor._extract_from_lists(make_soup(html), url)
+        results[name] = {tender['content_hash'] for tender in tenders} == legacy_list_hashes(html, url)
+    return results
+
+def check_template_cases() -> Dict[str, bool]:
+    """提取模板回归样例：学习模板后按模板提取，内容哈希和标题是否与完整提取一致"""
+    from app.services.tender_extractor import tender_extractor
+    
+    url = 'http://cases.test/zbgg/'
+    results = {}
+    for name, html in TEMPLATE_CASES.items():
+        full = tender_extractor.extract_column_page(html, url)
+        if not full['template']:
+            results[name] = False
+            continue
+        
+        templated = tender_extractor.extract_column_page(html, url, template=full['template'])
+        
+        def records(tenders: List[Dict[str, Any]]) -> Set[tuple]:
+            return {(tender['content_hash'], tender['title'], tender['source_section']) for tender in tenders}
+        
+        results[name] = templated['template_matched'] and records(templated['tenders']) == records(full['tenders'])
+    return results
+
+def bench_depth(depth: int, repeat: int) -> Dict[str, Any]:
+    """测试单个嵌套深度"""
+    from app.services.tender_extractor import tender_extractor
+    from app.utils.html_parser import make_soup
+    
+    html = generate_nested_page(depth)
+    soup = make_soup(html)
+    matcher = tender_extractor.tender_matcher
+    
+    legacy_times, index_times, extract_times, columns_times = [], [], [], []
+    for _ in range(repeat):
+        elapsed, legacy_hits = timed(legacy_scan, soup, matcher)
+        legacy_times.append(elapsed)
+        elapsed, index_hits = timed(index_scan, soup, matcher)
+        index_times.append(elapsed)
+        elapsed, tenders = timed(tender_extractor.extract_tender_info, html, 'http://nested.test/zbgg/')
+        extract_times.append(elapsed)
+        elapsed, columns = timed(tender_extractor.find_tender_columns, make_soup(html), 'http://nested.test/')
+        columns_times.append(elapsed)
+    
+    def best_ms(values: List[float]) -> float:
+        return round(min(values) * 1000, 2)
+    
+    return {
+        'depth': depth,
+        'page_kb': round(len(html.encode('utf-8')) / 1024, 1),
+        'legacy_scan_ms': best_ms(legacy_times),
+        'index_scan_ms': best_ms(index_times),
+        'hits_match': legacy_hits == index_hits,
+        'extract_ms': best_ms(extract_times),
+        'find_columns_ms': best_ms(columns_times),
+        'tenders_found': len(tenders),
+        'columns_found': len(columns),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='深层嵌套页面DOM遍历基准测试')
+    parser.add_argument('--depths', default='50,100,200,400', help='逗号分隔的嵌套深度')
+    parser.add_argument('--repeat', type=int, default=3, help='每个深度重复次数（取最小值）')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    
+    results = [bench_depth(int(depth), args.repeat) for depth in args.depths.split(',')]
+    list_cases = check_list_cases()
+    template_cases = check_template_cases()
+    
+    for result in results:
+        print(f"depth={result['depth']:<5} {result['page_kb']:>7.1f}KB  "
+              f"get_text逐层={result['legacy_scan_ms']:>9.2f}ms  DomIndex={result['index_scan_ms']:>7.2f}ms  "
+              f"一致={result['hits_match']}  extract={result['extract_ms']:>8.2f}ms  "
+              f"find_columns={result['find_columns_ms']:>8.2f}ms  提取={result['tenders_found']}")
+    print('列表提取回归: ' + '  '.join(f'{name}={matched}' for name, matched in list_cases.items()))
+    print('提取模板回归: ' + '  '.join(f'{name}={matched}' for name, matched in template_cases.items()))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'list_cases': list_cases, 'template_cases': template_cases},
+                      f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
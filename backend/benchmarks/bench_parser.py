@@ -0,0 +1,172 @@
+"""
+HTML解析器基准测试
+
+在同一批页面上比较各解析器的耗时，包括：
+- 仅解析（make_soup）
+- 网站验证的内容分析（CrawlerService._analyze_content）
+- 解析+招投标提取（TenderExtractor.extract_tender_info）
+- 各解析器与html.parser提取结果数量的差异
+
+页面来源（按优先顺序）：
+- --archive：页面归档目录（真实抓取的医院页面）
+- --corpus：存放.html文件的目录
+- 默认：模拟站点集群生成的首页和列表页
+
+使用方法（在backend目录下）：
+    python -m benchmarks.bench_parser --archive ../data/page_archive --limit 500
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from benchmarks.bench_pipeline import percentile
+from benchmarks.site_farm import FarmConfig, VirtualHospital, COLUMNS
+
+def load_archive_pages(archive_dir: str, limit: int) -> List[Tuple[str, bytes]]:
+    """从页面归档读取每个URL最近一次抓取的页面"""
+    from app.services.page_archive import PageArchive
+    
+    archive = PageArchive(archive_dir)
+    pages = []
+    for snapshot in archive.iter_snapshots(latest_only=True):
+        if snapshot['content']:
+            pages.append((snapshot['url'], snapshot['content']))
+        if len(pages) >= limit:
+            break
+    return pages
+
+def load_corpus_pages(corpus_dir: str, limit: int) -> List[Tuple[str, bytes]]:
+    """从目录读取.html文件"""
+    pages = []
+    for root, _, files in os.walk(corpus_dir):
+        for name in sorted(files):
+            if name.endswith(('.html', '.htm')):
+                with open(os.path.join(root, name), 'rb') as f:
+                    pages.append((f'file://{os.path.join(root, name)}', f.read()))
+                if len(pages) >= limit:
+                    return pages
+    return pages
+
+def generate_pages(limit: int, seed: int) -> List[Tuple[str, bytes]]:
+    """使用模拟站点集群生成首页和栏目列表页"""
+    config = FarmConfig(hospitals=limit, seed=seed)
+    pages = []
+    index = 1
+    while len(pages) < limit:
+        site = VirtualHospital(index, config)
+        for path in ['/'] + [f'/{column}/index.html' for column, _ in COLUMNS]:
+            _, _, text = site.render(path)
+            pages.append((f'http://{site.host}{path}', text.encode('utf-8')))
+        index += 1
+    return pages[:limit]
+
+def timed(func, *args) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+def bench_parser(parser: str, pages: List[Tuple[str, bytes]], repeat: int) -> Dict[str, Any]:
+    """测试单个解析器"""
+    from app.services.crawler_service import crawler_service
+    from app.services.tender_extractor import tender_extractor
+    from app.utils.html_parser import make_soup
+    
+    crawler_service.config['html_parser'] = parser
+    tender_extractor.config['html_parser'] = parser
+    
+    parse_times, analyze_times, extract_times = [], [], []
+    tender_counts = []
+    for url, content in pages:
+        response = requests.Response()
+        response._content = content
+        response.encoding = None
+        html_content = response.text
+        
+        for _ in range(repeat):
+            parse_times.append(timed(make_soup, content, parser)[0])
+            analyze_times.append(timed(crawler_service._analyze_content, response)[0])
+            elapsed, tenders = timed(tender_extractor.extract_tender_info, html_content, url)
+            extract_times.append(elapsed)
+        tender_counts.append(len(tenders))
+    
+    def stats(values: List[float]) -> Dict[str, float]:
+        return {
+            'mean_ms': round(sum(values) / len(values) * 1000, 2),
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+        }
+    
+    return {
+        'parser': parser,
+        'parse': stats(parse_times),
+        'analyze': stats(analyze_times),
+        'extract': stats(extract_times),
+        'pages_per_second': round(len(extract_times) / sum(extract_times), 1),
+        'tender_counts': tender_counts,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML解析器基准测试')
+    parser.add_argument('--archive', help='页面归档目录')
+    parser.add_argument('--corpus', help='.html文件目录')
+    parser.add_argument('--limit', type=int, default=200, help='最多测试的页面数')
+    parser.add_argument('--repeat', type=int, default=1, help='每个页面重复次数')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--parsers', help='逗号分隔的解析器列表，默认测试所有已安装的解析器')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    
+    from app.utils.html_parser import available_parsers
+    
+    if args.archive:
+        pages, source = load_archive_pages(args.archive, args.limit), args.archive
+    elif args.corpus:
+        pages, source = load_corpus_pages(args.corpus, args.limit), args.corpus
+    else:
+        pages, source = generate_pages(args.limit, args.seed), 'site_farm'
+    
+    if not pages:
+        print('没有可测试的页面')
+        return
+    
+    parsers = args.parsers.split(',') if args.parsers else available_parsers()
+    results = [bench_parser(name, pages, args.repeat) for name in parsers]
+    
+    # 与html.parser的提取结果对比
+    baseline = next((r['tender_counts'] for r in results if r['parser'] == 'html.parser'), None)
+    for result in results:
+        counts = result.pop('tender_counts')
+        result['tenders_found'] = sum(counts)
+        if baseline is not None:
+            result['pages_differing_from_html_parser'] = sum(1 for a, b in zip(counts, baseline) if a != b)
+    
+    total_bytes = sum(len(content) for _, content in pages)
+    print(f'页面来源: {source}  页面数: {len(pages)}  平均大小: {total_bytes / len(pages) / 1024:.1f}KB')
+    for result in results:
+        print(f"{result['parser']:<12} parse={result['parse']['mean_ms']:>7.2f}ms  "
+              f"analyze={result['analyze']['mean_ms']:>7.2f}ms  "
+              f"parse+extract={result['extract']['mean_ms']:>7.2f}ms "
+              f"(p95 {result['extract']['p95_ms']:.2f}ms)  "
+              f"{result['pages_per_second']:>6.1f} 页/秒  提取={result['tenders_found']}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'source': source, 'pages': len(pages), 'results': results}, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+抓取流水线基准测试
+
+启动模拟医院站点集群，将爬虫的所有请求指向它，测量以下阶段的吞吐量和延迟：
+- 网站批量验证（CrawlerService.verify_websites）
+- 招投标监控首次扫描：抓取→提取→去重→入库（TenderMonitor）
+- 招投标监控再次扫描：条件请求命中304，动态页面按页面指纹跳过提取
+- 招投标监控按医院多线程扫描，页面解析在多进程池中执行（--monitor-concurrency、--parse-workers）
+- 招投标监控增量扫描：每个栏目发布少量新公告后，翻页遇到已入库公告即停止
+
+使用方法（在backend目录下）：
+    python -m benchmarks.bench_pipeline --hospitals 100 --concurrency 20
+    python -m benchmarks.bench_pipeline --output bench.json
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.site_farm import FarmConfig, SiteFarm
+
+def percentile(values: List[float], percent: float) -> float:
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+def summarize(name: str, count: int, elapsed: float, latencies: List[float], **extra) -> Dict[str, Any]:
+    """汇总一个阶段的测试结果"""
+    result = {
+        'stage': name,
+        'count': count,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_per_second': round(count / elapsed, 2) if elapsed else 0,
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 1),
+    }
+    result.update(extra)
+    return result
+
+def configure_environment(farm: SiteFarm, work_dir: str):
+    """在导入应用模块之前设置爬虫模式（配置在导入时读取环境变量）"""
+    os.environ['CRAWLER_PROXY'] = farm.proxy_url
+    os.environ['PAGE_ARCHIVE_DIR'] = os.path.join(work_dir, 'page_archive')
+    os.environ['CONTENT_HASH_FILTER_PATH'] = os.path.join(work_dir, 'content_hashes.bloom')
+
+def create_benchmark_app(work_dir: str):
+    """创建使用临时SQLite数据库的应用（不启动调度器）"""
+    from flask import Flask
+    from app import db
+    from app.models import Region
+    
+    app = Flask('benchmark')
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(work_dir, 'benchmark.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    
+    with app.app_context():
+        db.create_all()
+        db.session.add(Region(name='基准测试', code='000000', level='province'))
+        db.session.commit()
+    
+    return app
+
+def bench_verify(farm: SiteFarm, concurrency: int) -> Dict[str, Any]:
+    """网站批量验证"""
+    from app.services.crawler_service import crawler_service
+    
+    urls = [site.website_url for site in farm.hospitals]
+    started = time.perf_counter()
+    results = crawler_service.verify_websites(urls, concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+    
+    latencies = [r['response_time'] / 1000 for r in results if r.get('response_time') is not None]
+    return summarize(
+        'verify_websites', len(urls), elapsed, latencies,
+        valid=sum(1 for r in results if r.get('is_valid')),
+        failed=sum(1 for r in results if r.get('errors'))
+    )
+
+def bench_monitor(app, farm: SiteFarm, name: str) -> Dict[str, Any]:
+    """招投标监控（抓取→提取→去重→入库）"""
+    from app import db
+    from app.models import Hospital, TenderRecord
+    from app.services.tender_monitor import tender_monitor
+    
+    with app.app_context():
+        if Hospital.query.count() == 0:
+            for site in farm.hospitals:
+                db.session.add(Hospital(name=site.name, website_url=site.website_url, region_id=1, status='active'))
+            db.session.commit()
+        
+        # 记录每家医院的扫描耗时
+        latencies = []
+        monitor_hospital = type(tender_monitor).monitor_hospital
+        
+        def timed_monitor_hospital(hospital, stats=None):
+            hospital_started = time.perf_counter()
+            try:
+                return monitor_hospital(tender_monitor, hospital, stats)
+            finally:
+                latencies.append(time.perf_counter() - hospital_started)
+        
+        tender_monitor.monitor_hospital = timed_monitor_hospital
+        try:
+            stats = tender_monitor._new_stats()
+            started = time.perf_counter()
+            tender_monitor._monitor_concurrently([h.id for h in Hospital.query.all()], stats)
+            elapsed = time.perf_counter() - started
+        finally:
+            del tender_monitor.monitor_hospital
+        
+        return summarize(
+            name, len(latencies), elapsed, latencies,
+            pages_per_second=round(stats['pages_fetched'] / elapsed, 2) if elapsed else 0,
+            pages_fetched=stats['pages_fetched'],
+            pages_paginated=stats['pages_paginated'],
+            columns_stopped_known=stats['columns_stopped_known'],
+            pages_not_modified=stats['pages_not_modified'],
+            pages_unchanged=stats['pages_unchanged'],
+            pages_html_unchanged=stats['pages_html_unchanged'],
+            extract_ms=stats['extract_ms'],
+            extract_ms_saved=stats['extract_ms_saved'],
+            templates_matched=stats['templates_matched'],
+            templates_learned=stats['templates_learned'],
+            template_misses=stats['template_misses'],
+            columns_from_registry=stats['columns_from_registry'],
+            column_discoveries=stats['column_discoveries'],
+            tenders_found=stats['tenders_found'],
+            new_tenders=stats['new_tenders'],
+            near_duplicates_linked=stats['near_duplicates_linked'],
+            details_fetched=stats['details_fetched'],
+            details_failed=stats['details_failed'],
+            tenders_stored=TenderRecord.query.count()
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description='抓取流水线基准测试')
+    parser.add_argument('--hospitals', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--concurrency', type=int, default=20, help='批量验证并发数')
+    parser.add_argument('--monitor-concurrency', type=int, default=8, help='招投标监控同时扫描的医院数')
+    parser.add_argument('--parse-workers', type=int, default=0, help='解析进程数，0为CPU核数，1为不使用进程池')
+    parser.add_argument('--delay', type=float, default=0.0, help='同一主机的请求间隔（秒）')
+    parser.add_argument('--slow-ratio', type=float, default=0.1)
+    parser.add_argument('--slow-delay', type=float, default=0.2)
+    parser.add_argument('--failing-ratio', type=float, default=0.05)
+    parser.add_argument('--redirect-ratio', type=float, default=0.05)
+    parser.add_argument('--dynamic-ratio', type=float, default=0.2, help='动态页面主机比例')
+    parser.add_argument('--latency', type=float, default=0.0, help='所有响应的基础延迟（秒）')
+    parser.add_argument('--list-pages', type=int, default=3, help='每个栏目的列表页数')
+    parser.add_argument('--publish', type=int, default=3, help='增量扫描前每个栏目新发布的公告数')
+    parser.add_argument('--output', help='将结果写入JSON文件')
+    args = parser.parse_args()
+    
+    farm = SiteFarm(FarmConfig(
+        hospitals=args.hospitals,
+        seed=args.seed,
+        slow_ratio=args.slow_ratio,
+        slow_delay=args.slow_delay,
+        failing_ratio=args.failing_ratio,
+        redirect_ratio=args.redirect_ratio,
+        base_latency=args.latency,
+        dynamic_ratio=args.dynamic_ratio,
+        list_pages=args.list_pages
+    )).start()
+    
+    with tempfile.TemporaryDirectory(prefix='hospitalscan-bench-') as work_dir:
+        configure_environment(farm, work_dir)
+        
+        from app.services.politeness_scheduler import politeness_scheduler
+        from app.services.detail_fetcher import detail_fetcher
+        from app.services.parse_pool import parse_pool
+        from app.services.tender_monitor import tender_monitor
+        politeness_scheduler.delay_range = (args.delay, args.delay)
+        parse_pool.max_workers = args.parse_workers or os.cpu_count() or 1
+        tender_monitor.config['concurrency'] = args.monitor_concurrency
+        
+        app = create_benchmark_app(work_dir)
+        results = [
+            bench_verify(farm, args.concurrency),
+            bench_monitor(app, farm, 'tender_monitor_initial'),
+            bench_monitor(app, farm, 'tender_monitor_rescan'),
+        ]
+        
+        farm.publish(args.publish)
+        results.append(bench_monitor(app, farm, 'tender_monitor_incremental'))
+    
+    farm.stop()
+    parse_pool.shutdown(wait=True)
+    detail_fetcher.shutdown(wait=True)
+    
+    report = {
+        'params': vars(args),
+        'results': results,
+        'farm_responses': farm.stats,
+    }
+    
+    for result in results:
+        print(f"{result['stage']:<26} n={result['count']:<5} {result['elapsed_seconds']:>8.2f}s "
+              f"{result['throughput_per_second']:>8.2f}/s  p50={result['latency_p50_ms']:.1f}ms  "
+              f"p95={result['latency_p95_ms']:.1f}ms")
+    print(f"站点集群响应: {farm.stats}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+if __name__ == '__main__':
+    main()
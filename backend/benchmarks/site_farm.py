@@ -0,0 +1,367 @@
+"""
+模拟医院站点集群
+
+在本地以HTTP代理的形式提供大量虚拟医院网站，用于离线基准测试，包括：
+- 按随机种子生成的医院首页、招投标栏目列表页（分页）和详情页
+- 模拟发布新公告（新公告出现在列表首页，旧公告依次后移）
+- 按比例配置的慢速、故障和重定向主机
+- 按比例配置的动态页面主机（每次请求的访问计数和时间不同）
+- 支持ETag条件请求
+- 回放模式：按URL提供页面归档中最近一次抓取的原始页面
+
+爬虫设置CRAWLER_PROXY=http://127.0.0.1:<端口>后，所有抓取请求都会发往本集群。
+单独运行：python -m benchmarks.site_farm --port 8900 --hospitals 200
+
+作者：MiniMax Agent
+版本：v1.0
+日期：2025-11-18
+"""
+
+import argparse
+import hashlib
+import itertools
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlparse
+
+HOST_SUFFIX = 'hospital.test'
+
+CITIES = ['北京', '上海', '广州', '深圳', '杭州', '南京', '武汉', '成都', '西安', '长沙', '郑州', '济南']
+HOSPITAL_NAMES = ['第一人民医院', '第二人民医院', '中心医院', '中医医院', '妇幼保健院', '儿童医院',
+                  '肿瘤医院', '口腔医院', '人民医院', '附属医院']
+TENDER_ITEMS = ['CT设备', '核磁共振设备', '彩色多普勒超声诊断仪', '医用耗材', '信息化系统建设',
+                '物业管理服务', '食堂餐饮服务', '医疗废物处置服务', '病房楼装修工程', '检验试剂']
+TENDER_TYPES = ['采购公告', '招标公告', '中标公告', '询价公告', '竞争性磋商公告', '结果公示']
+COLUMNS = [('zbgg', '招标公告'), ('cggg', '采购公告')]
+
+class FarmConfig:
+    """站点集群配置"""
+    
+    def __init__(self, hospitals: int = 100, seed: int = 42, list_pages: int = 3, items_per_page: int = 15,
+                 slow_ratio: float = 0.1, slow_delay: float = 0.5, failing_ratio: float = 0.05,
+                 redirect_ratio: float = 0.05, base_latency: float = 0.0, published: int = 0,
+                 dynamic_ratio: float = 0.0):
+        self.hospitals = hospitals            # 医院数量
+        self.seed = seed                      # 随机种子，相同种子生成相同站点
+        self.list_pages = list_pages          # 每个栏目的列表页数
+        self.items_per_page = items_per_page  # 每个列表页的公告数
+        self.slow_ratio = slow_ratio          # 慢速主机比例
+        self.slow_delay = slow_delay          # 慢速主机每次响应的延迟（秒）
+        self.failing_ratio = failing_ratio    # 故障主机（返回503）比例
+        self.redirect_ratio = redirect_ratio  # 首页重定向到www主机的比例
+        self.base_latency = base_latency      # 所有响应的基础延迟（秒）
+        self.published = published            # 每个栏目在初始公告之后新发布的公告数
+        self.dynamic_ratio = dynamic_ratio    # 动态页面主机比例
+
+class VirtualHospital:
+    """单个虚拟医院站点"""
+    
+    def __init__(self, index: int, config: FarmConfig):
+        rng = random.Random(config.seed * 100003 + index)
+        
+        self.index = index
+        self.host = f'h{index:04d}.{HOST_SUFFIX}'
+        self.name = f'{rng.choice(CITIES)}市{rng.choice(HOSPITAL_NAMES)}'
+        self.config = config
+        self.seed = rng.randrange(1 << 30)
+        
+        roll = rng.random()
+        if roll < config.failing_ratio:
+            self.kind = 'failing'
+        elif roll < config.failing_ratio + config.slow_ratio:
+            self.kind = 'slow'
+        elif roll < config.failing_ratio + config.slow_ratio + config.redirect_ratio:
+            self.kind = 'redirect'
+        else:
+            self.kind = 'normal'
+        
+        # 动态页面：正文中带有访问计数和当前时间，每次响应体都不同
+        self.dynamic = rng.random() < config.dynamic_ratio
+        self._visits = itertools.count(1000 + index)
+    
+    @property
+    def website_url(self) -> str:
+        return f'http://{self.host}/'
+    
+    @property
+    def newest_number(self) -> int:
+        """最新公告的编号（新发布的公告编号依次为0、-1、-2……）"""
+        return 1 - self.config.published
+    
+    def tender(self, column: str, number: int) -> Dict[str, Any]:
+        """生成编号对应的公告（同一编号总是生成相同内容）"""
+        rng = random.Random(f'{self.seed}-{column}-{number}')
+        publish_date = date(2025, 11, 18) - timedelta(days=number)
+        return {
+            'number': number,
+            'title': f'{self.name}{rng.choice(TENDER_ITEMS)}{rng.choice(TENDER_TYPES)}（编号{self.index:04d}-{column}-{number:04d}）',
+            'publish_date': publish_date.isoformat(),
+            'deadline_date': (publish_date + timedelta(days=rng.randint(7, 30))).isoformat(),
+            'budget': rng.randint(5, 5000),
+            'path': f'/{column}/detail_{number}.html',
+        }
+    
+    def render(self, path: str) -> Tuple[int, Dict[str, str], str]:
+        """
+        渲染页面
+        
+        Returns:
+            (状态码, 响应头, 页面内容)
+        """
+        if path == '/robots.txt':
+            return 200, {'Content-Type': 'text/plain'}, 'User-agent: *\nDisallow: /admin/\n'
+        if path in ('/', '/index.html'):
+            return 200, {}, self._render_home()
+        
+        parts = path.strip('/').split('/')
+        if len(parts) == 2 and parts[0] in dict(COLUMNS):
+            column, page_name = parts
+            if page_name == 'index.html' or (page_name.startswith('index_') and page_name.endswith('.html')):
+                page = 1 if page_name == 'index.html' else int(page_name[6:-5] or 0)
+                if 1 <= page <= self.config.list_pages:
+                    return 200, {}, self._render_list(column, page)
+            if page_name.startswith('detail_') and page_name.endswith('.html'):
+                number = int(page_name[7:-5] or 0)
+                newest = self.newest_number
+                if newest <= number < newest + self.config.list_pages * self.config.items_per_page:
+                    return 200, {}, self._render_detail(column, number)
+        
+        return 404, {}, '<html><body><h1>404 页面不存在</h1></body></html>'
+    
+    def _layout(self, title: str, body: str) -> str:
+        nav = ''.join(f'<li><a href="/{column}/index.html">{name}</a></li>' for column, name in COLUMNS)
+        return (
+            f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{title}</title>'
+            f'<meta name="description" content="{self.name}官方网站，提供门诊挂号、科室介绍、专家团队等医疗服务信息">'
+            f'<style>body{{font-family:sans-serif}}</style><script>var siteId={self.index};</script></head><body>'
+            f'<header><h1>{self.name}</h1></header>'
+            f'<nav><ul class="nav"><li><a href="/">首页</a></li><li><a href="/yygk/">医院概况</a></li>'
+            f'<li><a href="/ksdh/">科室导航</a></li>{nav}</ul></nav>'
+            f'{body}{self._render_visits()}'
+            f'<footer><p>地址：{self.name[:2]}市健康路{self.index % 500 + 1}号{self.name}门诊楼</p>'
+            f'<p>电话：010-{60000000 + self.index}</p><p>版权所有 {self.name}</p></footer>'
+            f'</body></html>'
+        )
+    
+    def _render_visits(self) -> str:
+        if not self.dynamic:
+            return ''
+        return (f'<div class="stat">本站访问量：{next(self._visits)}次 '
+                f'当前时间：{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</div>')
+    
+    def _render_home(self) -> str:
+        news = ''.join(
+            f'<li><a href="{t["path"]}">{t["title"]}</a><span>{t["publish_date"]}</span></li>'
+            for t in (self.tender('zbgg', n) for n in range(self.newest_number, self.newest_number + 5))
+        )
+        body = (
+            '<div class="intro"><p>本院是一所集医疗、教学、科研、预防、保健为一体的综合性医院，'
+            '开设急诊、门诊、住院、体检中心等科室，提供预约挂号、医保结算等服务。</p></div>'
+            f'<div class="news"><h2>最新公告</h2><ul>{news}</ul></div>'
+        )
+        return self._layout(f'{self.name}-首页', body)
+    
+    def _render_list(self, column: str, page: int) -> str:
+        per_page = self.config.items_per_page
+        first = self.newest_number + (page - 1) * per_page
+        items = ''.join(
+            f'<li><a href="{t["path"]}" title="{t["title"]}">{t["title"]}</a><span class="date">{t["publish_date"]}</span></li>'
+            for t in (self.tender(column, n) for n in range(first, first + per_page))
+        )
+        
+        pager = []
+        if page > 1:
+            prev_name = 'index.html' if page == 2 else f'index_{page - 1}.html'
+            pager.append(f'<a href="/{column}/{prev_name}">上一页</a>')
+        pager.append(f'<span>第{page}页/共{self.config.list_pages}页</span>')
+        if page < self.config.list_pages:
+            pager.append(f'<a href="/{column}/index_{page + 1}.html">下一页</a>')
+        
+        body = (
+            f'<div class="main"><div class="location">当前位置：首页 &gt; {dict(COLUMNS)[column]}</div>'
+            f'<ul class="news-list">{items}</ul><div class="pager">{"".join(pager)}</div></div>'
+        )
+        return self._layout(f'{dict(COLUMNS)[column]}-{self.name}', body)
+    
+    def _render_detail(self, column: str, number: int) -> str:
+        tender = self.tender(column, number)
+        body = (
+            f'<div class="article"><h2 class="title">{tender["title"]}</h2>'
+            f'<div class="info">发布时间：{tender["publish_date"]}</div>'
+            f'<div class="content"><p>项目名称：{tender["title"]}</p>'
+            f'<p>采购单位：{self.name}</p>'
+            f'<p>预算金额：{tender["budget"]}万元</p>'
+            f'<p>投标截止时间：{tender["deadline_date"]} 09:30</p>'
+            f'<p>联系人：采购办 电话：010-{60000000 + self.index}</p></div></div>'
+        )
+        return self._layout(tender['title'], body)
+
+class SiteFarm:
+    """模拟医院站点集群（HTTP代理形式）"""
+    
+    def __init__(self, config: FarmConfig = None, host: str = '127.0.0.1', port: int = 0, archive=None):
+        self.config = config or FarmConfig()
+        self.archive = archive
+        
+        self.sites: Dict[str, VirtualHospital] = {}
+        for index in range(1, self.config.hospitals + 1):
+            site = VirtualHospital(index, self.config)
+            self.sites[site.host] = site
+        
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def proxy_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    @property
+    def hospitals(self) -> List[VirtualHospital]:
+        return list(self.sites.values())
+    
+    def start(self) -> 'SiteFarm':
+        """在后台线程中启动"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name='site-farm', daemon=True)
+        self._thread.start()
+        return self
+    
+    def publish(self, count: int = 1):
+        """每个医院的每个栏目发布count条新公告"""
+        self.config.published += count
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+    
+    def handle(self, url: str, headers) -> Tuple[int, Dict[str, str], bytes]:
+        """处理一次请求，返回(状态码, 响应头, 响应体)"""
+        parsed = urlparse(url)
+        host = (parsed.netloc or headers.get('Host', '')).lower()
+        path = parsed.path or '/'
+        
+        if self.archive is not None:
+            return self._handle_archive(url)
+        
+        # www主机与主站内容相同
+        site = self.sites.get(host[4:] if host.startswith('www.') else host)
+        if site is None:
+            return 502, {}, b'unknown host'
+        
+        delay = self.config.base_latency + (self.config.slow_delay if site.kind == 'slow' else 0)
+        if delay:
+            time.sleep(delay)
+        
+        if site.kind == 'failing':
+            return 503, {'Retry-After': '120'}, b'<html><body>Service Unavailable</body></html>'
+        if site.kind == 'redirect' and not host.startswith('www.'):
+            return 301, {'Location': f'http://www.{host}{path}'}, b''
+        
+        status, extra_headers, text = site.render(path)
+        body = text.encode('utf-8')
+        response_headers = {'Content-Type': 'text/html; charset=utf-8'}
+        response_headers.update(extra_headers)
+        
+        if status == 200:
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            response_headers['ETag'] = etag
+            if headers.get('If-None-Match') == etag:
+                return 304, {'ETag': etag}, b''
+        
+        return status, response_headers, body
+    
+    def _handle_archive(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """回放模式：返回页面归档中该URL最近一次抓取的内容"""
+        snapshot = self.archive.get_latest(url)
+        if snapshot is None:
+            return 404, {}, b''
+        
+        content = self.archive.load(snapshot['content_hash'])
+        response_headers = {'Content-Type': snapshot['content_type'] or 'text/html'}
+        return 200, response_headers, content or b''
+    
+    def _make_handler(self):
+        farm = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def do_GET(self):
+                status, headers, body = farm.handle(self.path, self.headers)
+                farm.count(str(status))
+                
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+            
+            def do_CONNECT(self):
+                # HTTPS隧道不支持，集群内所有站点均为HTTP
+                farm.count('501')
+                self.send_error(501, 'CONNECT not supported')
+            
+            def log_message(self, format, *args):
+                pass
+        
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='模拟医院站点集群')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--hospitals', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--list-pages', type=int, default=3)
+    parser.add_argument('--slow-ratio', type=float, default=0.1)
+    parser.add_argument('--slow-delay', type=float, default=0.5)
+    parser.add_argument('--failing-ratio', type=float, default=0.05)
+    parser.add_argument('--redirect-ratio', type=float, default=0.05)
+    parser.add_argument('--dynamic-ratio', type=float, default=0.0)
+    parser.add_argument('--replay-archive', help='回放模式：从该页面归档目录提供页面')
+    args = parser.parse_args()
+    
+    archive = None
+    if args.replay_archive:
+        from app.services.page_archive import PageArchive
+        archive = PageArchive(args.replay_archive)
+    
+    config = FarmConfig(
+        hospitals=args.hospitals,
+        seed=args.seed,
+        list_pages=args.list_pages,
+        slow_ratio=args.slow_ratio,
+        slow_delay=args.slow_delay,
+        failing_ratio=args.failing_ratio,
+        redirect_ratio=args.redirect_ratio,
+        dynamic_ratio=args.dynamic_ratio
+    )
+    farm = SiteFarm(config, host=args.host, port=args.port, archive=archive)
+    
+    print(f'模拟站点集群已启动: CRAWLER_PROXY={farm.proxy_url}')
+    if archive is None:
+        print(f'医院站点: http://h0001.{HOST_SUFFIX}/ ~ http://h{config.hospitals:04d}.{HOST_SUFFIX}/')
+    
+    try:
+        farm.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        farm.server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -44,7 +44,28 @@ class Config:
         'MAX_RETRY': 3,         # 最大重试次数
         'DELAY_RANGE': (1, 5),  # 请求延迟范围（秒）
         'MAX_CONCURRENT': 5,    # 最大并发数
+        'POOL_CONNECTIONS': 100,     # 连接池缓存的主机数
+        'PER_HOST_CONNECTIONS': 4,   # 每个主机的最大连接数
+        'HTTP2_ENABLED': os.environ.get('CRAWLER_HTTP2', '').lower() in ('1', 'true', 'yes'),  # 启用HTTP/2（需安装httpx[http2]）
+        'MAX_PAGE_BYTES': 2 * 1024 * 1024,  # 单个页面最多读取的字节数（解压后）
+        'HTML_PARSER': os.environ.get('CRAWLER_HTML_PARSER') or 'lxml',  # HTML解析器：lxml、html5lib或html.parser
+        'PARSE_WORKERS': int(os.environ.get('CRAWLER_PARSE_WORKERS') or 0),  # 解析进程数：0为CPU核数，1为在当前进程解析
+        'MONITOR_CONCURRENCY': int(os.environ.get('CRAWLER_MONITOR_CONCURRENCY') or 8),  # 招投标监控同时扫描的医院数
+        'DETAIL_FETCH_ENABLED': os.environ.get('CRAWLER_DETAIL_FETCH', 'true').lower() in ('1', 'true', 'yes'),  # 抓取新公告的详情页补全字段
+        'DETAIL_CONCURRENCY': int(os.environ.get('CRAWLER_DETAIL_CONCURRENCY') or 16),  # 详情页同时抓取的总数
+        'DETAIL_PER_HOST': 2,          # 同一主机同时抓取的详情页数（不超过PER_HOST_CONNECTIONS）
+        'PROXY_URL': os.environ.get('CRAWLER_PROXY'),  # 所有抓取请求经由的HTTP代理（如本地模拟医院站点集群）
         'ROBOTS_TXT_CHECK': True,  # 是否检查robots.txt
+        'ROBOTS_CACHE_TTL': 86400,     # robots.txt缓存时间（秒）
+        'ROBOTS_NEGATIVE_TTL': 21600,  # robots.txt不存在或禁止访问的缓存时间（秒）
+        'ROBOTS_ERROR_TTL': 1800,      # robots.txt获取失败的缓存时间（秒）
+        'ROBOTS_CACHE_SIZE': 10000,    # robots.txt缓存的最大主机数
+        'PAGE_ARCHIVE_ENABLED': os.environ.get('PAGE_ARCHIVE_ENABLED', 'true').lower() in ('1', 'true', 'yes'),  # 归档抓取到的原始页面
+        'PAGE_ARCHIVE_DIR': os.environ.get('PAGE_ARCHIVE_DIR') or \
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'page_archive'),  # 页面归档目录
+        'PAGE_ARCHIVE_LEVEL': 3,       # 页面归档zstd压缩级别
+        'CONTENT_HASH_FILTER_PATH': os.environ.get('CONTENT_HASH_FILTER_PATH') or \
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'content_hashes.bloom'),  # 已入库内容哈希的布隆过滤器文件
     }
     
     # 搜索引擎API配置
@@ -58,6 +79,7 @@ class Config:
     SCHEDULER_CONFIG = {
         'TENDER_SCAN_INTERVAL': 6,  # 招投标扫描间隔（小时）
         'HOSPITAL_SCAN_INTERVAL': 24,  # 医院扫描间隔（小时）
+        'COLUMN_DISCOVERY_INTERVAL': 168,  # 从医院首页重新发现招投标栏目的间隔（小时）
         'DAILY_REPORT_TIME': '02:00',  # 每日报告时间
     }
     